@@ -7,6 +7,7 @@ from typing import Any, Dict, List, Optional
 from src.agents.base.memory import BaseMemory, ShortTermMemory
 from src.agents.base.tool import BaseTool
 from src.config.logging_config import get_logger
+from src.tools.llm.base import LLMProvider
 from src.utils.exceptions import AgentExecutionError
 
 
@@ -19,15 +20,26 @@ class BaseAgent(ABC):
         role: str,
         capabilities: List[str],
         memory: Optional[BaseMemory] = None,
+        llm: Optional[LLMProvider] = None,
     ) -> None:
         self.name = name
         self.role = role
         self.capabilities = capabilities
         self.tools: Dict[str, BaseTool] = {}
         self.memory = memory or ShortTermMemory()
+        self._llm = llm
         self.metrics: Dict[str, float] = {"invocations": 0, "last_latency_ms": 0.0}
         self.logger = get_logger(agent_name=self.name, agent_role=self.role)
 
+    @property
+    def llm(self) -> LLMProvider:
+        """Provider for LLM-backed agents; defaults to the one selected by LLM_PROVIDER."""
+        if self._llm is None:
+            from src.tools.llm.providers import get_llm_provider
+
+            return get_llm_provider()
+        return self._llm
+
     def register_tool(self, tool: BaseTool) -> None:
         self.tools[tool.name] = tool
         self.logger.debug("registered tool", tool=tool.name)
@@ -0,0 +1,168 @@
+"""Local, rule-based intent classification for orchestrator requests."""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from src.config.logging_config import get_logger
+
+logger = get_logger(component="intent")
+
+WEATHER = "weather"
+WRITING = "writing"
+GENERAL = "general"
+
+# A clear weather question, anchored at the start of the request. Only time
+# phrases and one "in/for/at <place>" may follow (see _weather_place), so
+# "forecast revenue for Q3" or "explain weather patterns" don't match.
+_WEATHER_QUESTION = re.compile(
+    r"(?:please\s+)?"
+    r"(?:"
+    r"(?:(?:what|how)(?:'s|\s+is|\s+will\s+be)?\s+|(?:show|tell|give)\s+me\s+|check\s+|get\s+)?"
+    r"(?:the\s+)?(?:current\s+|local\s+)?"
+    r"(?:weather|forecast|temperature|humidity|precipitation)(?:\s+(?:like|forecast|report))?"
+    r"|(?:will|is|does)\s+it\s+(?:be\s+|get\s+|going\s+to\s+(?:be\s+)?)?"
+    r"(?:rain(?:ing|y)?|snow(?:ing|y)?|hail(?:ing)?|storm(?:ing|y)?|sunny|windy|cloudy|foggy|"
+    r"cold|hot|warm|humid|freezing)"
+    r"|how\s+(?:hot|cold|warm)\s+is\s+it"
+    r"|do\s+i\s+need\s+an?\s+umbrella"
+    r")\b",
+    re.IGNORECASE,
+)
+_WRITING_VERBS = re.compile(
+    r"^\s*(?:please\s+)?(write|draft|compose|rewrite|reword|summari[sz]e|translate|proofread|edit|"
+    r"paraphrase|polish)\b",
+    re.IGNORECASE,
+)
+_PLANNING_TERMS = re.compile(
+    r"\b(plan|planning|schedule|organi[sz]e|itinerary|steps|roadmap|prepare|arrange|book|trip|"
+    r"strategy)\b",
+    re.IGNORECASE,
+)
+_PLACE_PREPOSITIONS = frozenset({"in", "for", "at"})
+# Words of a time phrase: "today", "on Saturday", "in the morning"
+_TIME_WORDS = frozenset(
+    "now today tonight tomorrow yesterday morning afternoon evening night noon midnight "
+    "weekend week "
+    "monday tuesday wednesday thursday friday saturday sunday "
+    "january february march april may june july august september october november december".split()
+)
+_TIME_CONNECTORS = frozenset({"on", "this", "next", "right", "the", "in", "at"})
+# A "place" containing one of these is more than one place ("Paris and
+# London") or not a place at all ("Apple stock in May")
+_PLACE_BREAKS = frozenset({"in", "for", "at", "and", "or", "vs", "versus", "&", "with", "than"})
+_NOT_LOCATIONS = frozenset({"ai", "ml", "it", "i", "the", "my", "our", "your"})
+MAX_PLACE_WORDS = 5
+
+# Looks a place name up; returns its match, or None if there is no such place
+Geocoder = Callable[[str], Awaitable[Optional[Dict[str, Any]]]]
+
+
+@dataclass(frozen=True)
+class Intent:
+    """What a request needs. ``location`` is set for weather queries."""
+
+    kind: str
+    location: Optional[str] = None
+
+    @property
+    def needs_planner(self) -> bool:
+        return self.kind == GENERAL
+
+    @property
+    def needs_writer(self) -> bool:
+        return self.kind != WEATHER
+
+    @property
+    def needs_synthesis(self) -> bool:
+        return self.kind == GENERAL
+
+
+def _is_time_phrase(words: List[str]) -> bool:
+    if not all(word in _TIME_WORDS or word in _TIME_CONNECTORS for word in words):
+        return False
+    return not words or any(word in _TIME_WORDS for word in words)
+
+
+def _weather_place(task: str) -> Tuple[bool, Optional[str]]:
+    """Whether ``task`` is a clear weather question, and the place it names.
+
+    The question has to be the whole request: a weather question, time
+    phrases, and at most one "in/for/at <place>" with nothing after the
+    place but another time phrase.
+    """
+    task = task.strip()
+    match = _WEATHER_QUESTION.match(task)
+    if match is None:
+        return False, None
+    words = [word.strip(",") for word in task[match.end() :].strip(" ?.!").split()]
+    lowered = [word.lower() for word in words]
+    # The place follows the last preposition that isn't part of a time phrase
+    at = next(
+        (
+            index
+            for index in range(len(words) - 1, -1, -1)
+            if lowered[index] in _PLACE_PREPOSITIONS and not _is_time_phrase(lowered[index + 1 :])
+        ),
+        None,
+    )
+    if at is None:
+        return _is_time_phrase(lowered), None
+    if not _is_time_phrase(lowered[:at]):
+        return False, None
+    place = words[at + 1 :]
+    # Drop a trailing time phrase: "Porto on Saturday", "New York tomorrow"
+    end = next(
+        (
+            end
+            for end in range(1, len(place))
+            if _is_time_phrase([word.lower() for word in place[end:]])
+        ),
+        len(place),
+    )
+    place = place[:end]
+    if (
+        len(place) > MAX_PLACE_WORDS
+        or any(word.lower() in _PLACE_BREAKS for word in place)
+        or " ".join(place).lower() in _NOT_LOCATIONS
+    ):
+        return False, None
+    return True, " ".join(place)
+
+
+def classify_intent(task: str, location: Optional[str] = None) -> Intent:
+    """Classify ``task`` without calling an LLM.
+
+    A request that opens with a writing verb and doesn't ask for planning is
+    ``writing``, even if it mentions weather or a place. A request that is
+    only a weather question, about one place (given, or named in the task),
+    is ``weather``. Everything else is ``general`` and runs every stage.
+    The place isn't checked here; see resolve_intent().
+    """
+    if _PLANNING_TERMS.search(task) is not None:
+        return Intent(GENERAL)
+    if _WRITING_VERBS.search(task):
+        return Intent(WRITING)
+    is_weather, place = _weather_place(task)
+    if is_weather and (location or place):
+        return Intent(WEATHER, location or place)
+    return Intent(GENERAL)
+
+
+async def resolve_intent(task: str, location: Optional[str], geocode: Geocoder) -> Intent:
+    """classify_intent(), with a weather location confirmed by ``geocode``.
+
+    A weather question about something that doesn't geocode ("forecast for
+    Apple stock") is ``general``, and so is one whose lookup fails.
+    """
+    intent = classify_intent(task, location)
+    if intent.kind != WEATHER:
+        return intent
+    try:
+        place = await geocode(intent.location)
+    except Exception as exc:  # noqa: BLE001
+        logger.warning("Geocoding failed during intent routing", error=str(exc))
+        place = None
+    return intent if place else Intent(GENERAL)
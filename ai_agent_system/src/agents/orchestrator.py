@@ -1,88 +1,590 @@
 from __future__ import annotations
 
-from typing import Any, Dict, List
+import asyncio
+import contextlib
+import functools
+import time
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+    TypeVar,
+)
 
 from src.agents.base.agent import BaseAgent
-from src.agents.planner import PlannerAgent
-from src.agents.specialized import WriterAgent
+from src.agents.intent import GENERAL, WEATHER, WRITING, Intent, resolve_intent
+from src.agents.planner import PlannerAgent, is_fallback_plan
+from src.agents.specialized import WRITER_FALLBACK_PREFIX, WriterAgent
+from src.agents.stage_cache import StageCache
 from src.agents.weather import WeatherAgent
-from src.tools.llm import get_gemini_client
+from src.tools.llm.autotune import tuned_max_tokens
+from src.tools.llm.base import LLMProvider
+from src.tools.llm.tokens import PromptSection, fit_sections, fragments_tokens, stage_token_budget
 from src.config.logging_config import get_logger
+from src.config.settings import settings
+from src.utils.metrics import (
+    orchestrator_degraded,
+    orchestrator_intents,
+    orchestrator_map_reduce_steps,
+    orchestrator_pipeline_overlap,
+    orchestrator_prefetch,
+    orchestrator_stage_latency,
+    orchestrator_stage_skips,
+    orchestrator_stage_timeouts,
+)
+
+T = TypeVar("T")
+
+# Receives (event, data) as orchestration stages finish
+ProgressSink = Callable[[str, Any], Awaitable[None]]
+
+_STREAM_END = object()
+
+# Key under which think() hands stages it started early to act()
+PREFETCH_KEY = "_prefetched"
+
+
+class _Prefetch(NamedTuple):
+    """A stage started early, and the input it was started for (if it matters)."""
+
+    task: asyncio.Task[Any]
+    key: Any = None
+
+
+SYNTHESIS_SYSTEM_INSTRUCTION = (
+    "Blend multi-agent insights into one coherent answer with bullet points and a short summary."
+)
+
+SYNTHESIS_TEMPLATE = """You are an expert orchestrator combining multiple agents' insights.
+
+Original Task: {task}
+
+Plan:
+{plan}
+
+Writer Insight:
+{writer}
+
+Weather Insight (if relevant):
+{weather}
+
+Compose a single response that blends the best of the plan, writer, and weather (if present). Keep it concise, actionable, and clearly attributed to agent perspectives."""
+
+
+def _cancel_unused(prefetched: Dict[str, _Prefetch]) -> None:
+    for stage, entry in prefetched.items():
+        if not entry.task.done():
+            entry.task.cancel()
+            orchestrator_prefetch.labels(stage=stage, outcome="cancelled").inc()
+    prefetched.clear()
+
+
+_DEGRADED_SUMMARY = "Degraded mode: answer assembled locally from the stages that completed."
+
+_COORDINATION_SUMMARIES = {
+    GENERAL: "Multi-agent answer blended from planner, writer, and weather (when provided).",
+    WRITING: "Writing request answered directly by the writer agent.",
+    WEATHER: "Weather request answered from the weather agent.",
+}
+
+
+def _weather_answer(location: Optional[str], weather: Any) -> str:
+    """Templated reply to a pure weather query."""
+    if not weather:
+        return f"Weather for {location} is unavailable right now."
+    return f"Weather for {location}:\n{_weather_summary(weather)}"
+
+
+def _finished_result(task: Optional[asyncio.Task[Any]]) -> Any:
+    """Result of a stage task that completed successfully, else None."""
+    if task is None or not task.done() or task.cancelled() or task.exception() is not None:
+        return None
+    return task.result()
+
+
+def _local_synthesis(task: str, steps: List[str], writer: Any, weather: Any) -> str:
+    """Plain-text answer built from available stage results, without the LLM."""
+    parts = [f"Task: {task}"]
+    if steps:
+        parts.append("Plan:\n" + "\n".join(f"- {step}" for step in steps))
+    if writer and not str(writer).startswith(WRITER_FALLBACK_PREFIX):
+        parts.append(f"Writer insight:\n{writer}")
+    if weather:
+        parts.append(f"Weather:\n{_weather_summary(weather)}")
+    if len(parts) == 1:
+        parts.append("No agent results were available; please retry shortly.")
+    return "\n\n".join(parts)
+
+
+def _weather_summary(weather: Any) -> str:
+    """One-line-per-day rendering of a WeatherAgent result for prompts."""
+    if not weather:
+        return "(not requested)"
+    if not isinstance(weather, dict):
+        return str(weather)
+    if weather.get("error"):
+        return f"{weather.get('location')}: unavailable ({weather['error']})"
+    lines = [
+        f"{weather.get('location')}: now {weather.get('temperature_c')}°C, "
+        f"precipitation {weather.get('precipitation_mm')} mm, "
+        f"wind {weather.get('wind_speed_kmh')} km/h"
+    ]
+    for day in weather.get("daily") or []:
+        lines.append(
+            f"{day.get('date')}: {day.get('temp_min_c')}–{day.get('temp_max_c')}°C, "
+            f"precipitation {day.get('precip_mm')} mm"
+        )
+    return "\n".join(lines)
 
 
 class OrchestratorAgent(BaseAgent):
     """Coordinates planner and specialized agents using Gemini for orchestration."""
 
-    def __init__(self, planner: PlannerAgent, writer: WriterAgent | None = None, weather: WeatherAgent | None = None) -> None:
+    def __init__(
+        self,
+        planner: PlannerAgent,
+        writer: WriterAgent | None = None,
+        weather: WeatherAgent | None = None,
+        llm: LLMProvider | None = None,
+    ) -> None:
         super().__init__(
             name="orchestrator",
             role="Coordinator",
             capabilities=["plan", "delegate", "synthesize"],
+            llm=llm,
         )
         self.planner = planner
         self.writer = writer
         self.weather = weather
         self.logger = get_logger(agent_name=self.name, agent_role=self.role)
+        self.stage_cache: Optional[StageCache] = (
+            StageCache(
+                maxsize=settings.ORCHESTRATOR_STAGE_CACHE_SIZE,
+                ttl=settings.ORCHESTRATOR_STAGE_CACHE_TTL,
+            )
+            if settings.ORCHESTRATOR_STAGE_CACHE_ENABLED
+            else None
+        )
+
+    def _skip_stage(self, stage: str, intent: Intent) -> None:
+        orchestrator_stage_skips.labels(stage=stage, intent=intent.kind).inc()
+        self.logger.debug("Skipping stage", stage=stage, intent=intent.kind)
+
+    async def _geocode(self, location: str) -> Optional[Dict[str, Any]]:
+        return await self.weather.geocode(location) if self.weather else None
+
+    @staticmethod
+    def _join_prefetched(
+        prefetched: Dict[str, _Prefetch], stage: str, key: Any = None
+    ) -> Optional[asyncio.Task[Any]]:
+        """The early-started ``stage``, if it was started for ``key``."""
+        entry = prefetched.pop(stage, None)
+        if entry is None:
+            return None
+        if entry.key != key:
+            # Started for other inputs (e.g. another location); start over
+            entry.task.cancel()
+            orchestrator_prefetch.labels(stage=stage, outcome="mismatched").inc()
+            return None
+        orchestrator_prefetch.labels(stage=stage, outcome="used").inc()
+        return entry.task
+
+    async def _run_stage(
+        self,
+        stage: str,
+        coro: Awaitable[T],
+        fallback: Optional[T] = None,
+        progress: Optional[ProgressSink] = None,
+    ) -> Optional[T]:
+        """Await one contributor stage under its timeout; ``fallback`` if it runs out."""
+        timeout = settings.ORCHESTRATOR_STAGE_TIMEOUTS.get(stage)
+        start = time.perf_counter()
+        try:
+            result = await asyncio.wait_for(coro, timeout)
+        except asyncio.TimeoutError:
+            orchestrator_stage_timeouts.labels(stage=stage).inc()
+            self.logger.warning("Orchestrator stage timed out", stage=stage, timeout=timeout)
+            result = fallback
+        orchestrator_stage_latency.labels(stage=stage).observe(time.perf_counter() - start)
+        if progress is not None:
+            await progress(stage, result)
+        return result
+
+    async def _synthesize(
+        self,
+        task: str,
+        plan_text: str,
+        writer_result: Any,
+        weather_result: Any,
+        progress: Optional[ProgressSink],
+        map_reduce: bool = False,
+    ) -> Dict[str, Any]:
+        """Blend the contributions into one answer with the LLM (memoized).
+
+        With ``map_reduce`` the writer input is the per-step expansions; it is
+        its own stage, with its own prompt budget, output cap and memo key.
+        """
+        llm = self.llm
+        stage = "synthesis_map_reduce" if map_reduce else "synthesis"
+        # Sections are trimmed to the stage budget, lowest priority first.
+        sections = fit_sections(
+            [
+                PromptSection("task", task, priority=None),
+                PromptSection(
+                    "writer", str(writer_result or "(not provided)"), priority=2, min_tokens=200
+                ),
+                PromptSection("plan", plan_text, priority=1, min_tokens=100),
+                PromptSection(
+                    "weather", _weather_summary(weather_result), priority=0, min_tokens=40
+                ),
+            ],
+            budget=stage_token_budget(stage),
+            stage=stage,
+            overhead=fragments_tokens([SYNTHESIS_TEMPLATE, SYNTHESIS_SYSTEM_INSTRUCTION]),
+        )
+        synthesis_prompt = SYNTHESIS_TEMPLATE.format(**sections)
+
+        synthesis_args = dict(
+            prompt=synthesis_prompt,
+            temperature=0.35,
+            max_tokens=tuned_max_tokens(stage, 1500 if map_reduce else 700),
+            system_instruction=SYNTHESIS_SYSTEM_INSTRUCTION,
+            stage=stage,
+        )
+        # The prompt already encodes task, plan, writer and weather inputs
+        synthesis_inputs = {**synthesis_args, "model": llm.model_for(stage)}
+        response = self.stage_cache.get(stage, synthesis_inputs) if self.stage_cache else None
+        memo_hit = response is not None
+        if memo_hit:
+            if progress is not None:
+                await progress("synthesis", {"text": response.get("text", "")})
+        elif progress is None:
+            response = await llm.generate_content(**synthesis_args)
+        else:
+            # Forward synthesis tokens to the listener as they arrive
+            chunks: List[str] = []
+            async for chunk in llm.stream_content(**synthesis_args):
+                chunks.append(chunk)
+                await progress("synthesis", {"text": chunk})
+            response = {"text": "".join(chunks), "model": llm.model_for(stage)}
+        if self.stage_cache is not None and not memo_hit and response.get("text"):
+            self.stage_cache.set(stage, synthesis_inputs, response)
+
+        return response
+
+    async def stream(self, task: str, **kwargs: Any) -> AsyncIterator[Tuple[str, Any]]:
+        """Run think() and act() and yield ``(event, data)`` as stages finish.
+
+        Events are ``plan``, ``writer``, ``weather``, ``synthesis`` (one per
+        text chunk) and finally ``done`` with the same result act() returns,
+        or ``error``. Events pass through a queue of
+        ORCHESTRATOR_EVENT_QUEUE_SIZE entries: a consumer that falls behind
+        pauses the run rather than letting events pile up. Closing the
+        generator cancels the run.
+        """
+        kwargs.pop("task", None)
+        queue: asyncio.Queue[Tuple[Any, Any]] = asyncio.Queue(
+            maxsize=settings.ORCHESTRATOR_EVENT_QUEUE_SIZE
+        )
+
+        async def emit(event: str, data: Any) -> None:
+            await queue.put((event, data))
+
+        async def run() -> None:
+            try:
+                plan = await self.think(task, **kwargs)
+                await emit(
+                    "plan", {key: value for key, value in plan.items() if not key.startswith("_")}
+                )
+                await emit("done", await self.act(plan, task=task, progress=emit, **kwargs))
+            except Exception as exc:  # noqa: BLE001
+                self.logger.error("OrchestratorAgent stream failed", error=str(exc))
+                await emit("error", {"error": str(exc)})
+            # Not in a finally: once cancelled nobody reads the queue, and
+            # waiting on a full one would park this task forever
+            await queue.put((_STREAM_END, None))
+
+        producer = asyncio.create_task(run())
+        try:
+            while True:
+                event, data = await queue.get()
+                if event is _STREAM_END:
+                    return
+                yield event, data
+        finally:
+            if not producer.done():
+                producer.cancel()
+                with contextlib.suppress(asyncio.CancelledError):
+                    await producer
+
+    async def _memoized(
+        self,
+        stage: str,
+        inputs: Dict[str, Any],
+        compute: Callable[[], Awaitable[T]],
+        cacheable: Callable[[T], bool] = bool,
+    ) -> T:
+        if self.stage_cache is None:
+            return await compute()
+        return await self.stage_cache.get_or_compute(stage, inputs, compute, cacheable)
+
+    async def _write(self, task: str, plan_text: str) -> Any:
+        writer_prompt = (
+            task
+            if not plan_text
+            else (
+                f"Task: {task}\n"
+                f"Plan summary: {plan_text}\n"
+                "Write a concise, user-friendly output that blends planning insights "
+                "with actionable guidance."
+            )
+        )
+        # Own stage so its short answers are tuned apart from /agents/writer's
+        stage = "orchestrator_writer"
+        max_tokens = tuned_max_tokens(stage, 400)
+        return await self._memoized(
+            "writer",
+            {
+                "prompt": writer_prompt,
+                "model": self.writer.llm.model_for(stage),
+                "temperature": 0.4,
+                "max_tokens": max_tokens,
+            },
+            lambda: self.writer.act(
+                task, prompt=writer_prompt, temperature=0.4, max_tokens=max_tokens, stage=stage
+            ),
+            cacheable=lambda text: bool(text) and not str(text).startswith(WRITER_FALLBACK_PREFIX),
+        )
+
+    async def _write_steps(self, task: str, steps: List[str]) -> str:
+        """Expand every plan step with its own writer call (map-reduce mode).
+
+        At most ORCHESTRATOR_MAP_REDUCE_CONCURRENCY calls run at once. The
+        expansions are returned in plan order; synthesis does the reduce.
+        """
+        limit = asyncio.Semaphore(max(1, settings.ORCHESTRATOR_MAP_REDUCE_CONCURRENCY))
+        max_tokens = tuned_max_tokens("writer_step", 300)
+        orchestrator_map_reduce_steps.observe(len(steps))
+
+        async def expand(index: int, step: str) -> Any:
+            step_prompt = (
+                f"Task: {task}\n"
+                f"Step {index} of {len(steps)}: {step}\n"
+                "Expand this step into concrete, actionable guidance. Cover only this step."
+            )
+            async with limit:
+                return await self._memoized(
+                    "writer_step",
+                    {
+                        "prompt": step_prompt,
+                        "model": self.writer.llm.model_for("writer_step"),
+                        "temperature": 0.4,
+                        "max_tokens": max_tokens,
+                    },
+                    lambda: self.writer.act(
+                        task,
+                        prompt=step_prompt,
+                        temperature=0.4,
+                        max_tokens=max_tokens,
+                        stage="writer_step",
+                    ),
+                    cacheable=lambda text: bool(text)
+                    and not str(text).startswith(WRITER_FALLBACK_PREFIX),
+                )
+
+        async with asyncio.TaskGroup() as group:
+            expansions = [
+                group.create_task(expand(index, step)) for index, step in enumerate(steps, start=1)
+            ]
+        return "\n\n".join(
+            f"Step {index}: {step}\n{expansion.result()}"
+            for index, (step, expansion) in enumerate(zip(steps, expansions), start=1)
+        )
+
+    async def _plan_pipelined(self, task: str, prefetched: Dict[str, _Prefetch]) -> Dict[str, Any]:
+        """Stream the plan and start the writer once enough steps have arrived.
+
+        The writer works from the first ORCHESTRATOR_PIPELINE_MIN_STEPS steps
+        while the planner is still generating the rest.
+        """
+        steps: List[str] = []
+        writer_started: Optional[float] = None
+        async for step in self.planner.stream_steps(task):
+            steps.append(step)
+            if (
+                self.writer
+                and writer_started is None
+                and len(steps) >= settings.ORCHESTRATOR_PIPELINE_MIN_STEPS
+            ):
+                prefetched["writer"] = _Prefetch(
+                    asyncio.create_task(self._write(task, "\n".join(steps)))
+                )
+                writer_started = time.perf_counter()
+        if writer_started is not None:
+            orchestrator_pipeline_overlap.observe(time.perf_counter() - writer_started)
+        return {
+            "task": task,
+            "steps": steps,
+            "plan_details": "\n".join(steps),
+            "status": "completed",
+        }
 
     async def think(self, task: str, **kwargs: Any) -> Dict[str, Any]:
+        # Stages that don't need the finished plan are started early and
+        # handed to act(), which joins them instead of starting its own
+        prefetched: Dict[str, _Prefetch] = {}
+        location = kwargs.get("location") or kwargs.get("city")
+        intent = (
+            await resolve_intent(task, location, self._geocode)
+            if settings.ORCHESTRATOR_INTENT_ROUTING
+            else Intent(GENERAL)
+        )
+        orchestrator_intents.labels(intent=intent.kind).inc()
+        location = location or intent.location
+        if self.weather and location:
+            # The weather lookup doesn't depend on the plan at all
+            prefetched["weather"] = _Prefetch(
+                asyncio.create_task(self.weather.act(task, location=location)), key=location
+            )
+        try:
+            if not intent.needs_planner:
+                # Writing and weather requests have nothing to plan
+                self._skip_stage("planner", intent)
+                plan = {"task": task, "steps": [], "plan_details": "", "status": "completed"}
+            else:
+                if kwargs.get("pipelined", settings.ORCHESTRATOR_PIPELINED):
+                    compute = functools.partial(self._plan_pipelined, task, prefetched)
+                else:
+                    compute = functools.partial(self.planner.act, task, task=task)
+                plan = await self._memoized(
+                    "planner",
+                    {
+                        "task": task,
+                        "model": self.planner.llm.model_for("planner"),
+                        "max_tokens": tuned_max_tokens("planner", 600),
+                    },
+                    compute,
+                    cacheable=lambda plan: isinstance(plan, dict) and not is_fallback_plan(plan),
+                )
+        except BaseException:
+            _cancel_unused(prefetched)
+            raise
         # Include original task in planner output so act() can access it
-        plan = await self.planner.act(task, task=task)
         if isinstance(plan, dict):
             plan.setdefault("original_task", task)
+            plan["intent"] = intent.kind
+            if intent.location:
+                plan.setdefault("location", intent.location)
+            if prefetched:
+                plan[PREFETCH_KEY] = prefetched
+        else:
+            _cancel_unused(prefetched)
         return plan
 
-    async def act(self, chain_of_thought: Dict[str, Any], **kwargs: Any) -> Dict[str, Any]:
+    async def act(
+        self,
+        chain_of_thought: Dict[str, Any],
+        *,
+        progress: Optional[ProgressSink] = None,
+        **kwargs: Any,
+    ) -> Dict[str, Any]:
+        """Run the contributor stages and synthesize the answer.
+
+        ``progress`` is awaited with ``(event, data)`` as each stage finishes
+        (``writer``, ``weather``) and for every synthesis chunk, which makes
+        synthesis stream instead of returning in one piece.
+        """
         task = kwargs.get("task") or chain_of_thought.get("original_task") or chain_of_thought.get("task", "")
-        
-        try:
-            gemini = get_gemini_client()
+        prefetched: Dict[str, _Prefetch] = (
+            (chain_of_thought.pop(PREFETCH_KEY, None) or {})
+            if isinstance(chain_of_thought, dict)
+            else {}
+        )
+        # Stage results so far; a degraded answer is built from whatever exists
+        stage = "plan"
+        plan_text = ""
+        plan_steps: list[str] = []
+        writer_result = weather_result = None
+        writer_task: Optional[asyncio.Task[Any]] = None
+        weather_task: Optional[asyncio.Task[Any]] = None
+        intent = Intent(
+            chain_of_thought.get("intent", GENERAL)
+            if isinstance(chain_of_thought, dict)
+            else GENERAL
+        )
 
+        try:
             # Gather plan
             plan_result = chain_of_thought or {}
             plan_text = plan_result.get("plan_details", "") if isinstance(plan_result, dict) else str(plan_result)
-            plan_steps: list[str] = []
             if isinstance(plan_result, dict):
                 steps = plan_result.get("steps") or plan_result.get("plan", {}).get("steps")
                 if isinstance(steps, list):
                     plan_steps = steps[:10]
 
-            # Collect contributions from available agents
-            writer_result = None
-            if self.writer:
-                writer_prompt = (
-                    f"Task: {task}\n"
-                    f"Plan summary: {plan_text}\n"
-                    "Write a concise, user-friendly output that blends planning insights with actionable guidance."
-                )
-                writer_result = await self.writer.act(task, prompt=writer_prompt, temperature=0.4, max_tokens=400)
-
-            weather_result = None
-            location = kwargs.get("location") or kwargs.get("city")
-            if self.weather and location:
-                weather_result = await self.weather.act(task, location=location)
-
-            # Synthesize final answer using Gemini, referencing other agents' outputs
-            synthesis_prompt = f"""You are an expert orchestrator combining multiple agents' insights.
-
-Original Task: {task}
-
-Plan:
-{plan_text}
-
-Writer Insight:
-{writer_result or "(not provided)"}
-
-Weather Insight (if relevant):
-{weather_result or "(not requested)"}
-
-Compose a single response that blends the best of the plan, writer, and weather (if present). Keep it concise, actionable, and clearly attributed to agent perspectives."""
+            # Collect contributions from available agents. Writer and weather
+            # don't depend on each other, so they run concurrently.
+            stage = "contributors"
+            location = kwargs.get("location") or kwargs.get("city") or plan_result.get("location")
+            map_reduce = False
+            async with asyncio.TaskGroup() as group:
+                if self.writer and not intent.needs_writer:
+                    self._skip_stage("writer", intent)
+                elif self.writer:
+                    write = self._join_prefetched(prefetched, "writer")
+                    if write is None:
+                        map_reduce = bool(
+                            kwargs.get("map_reduce", settings.ORCHESTRATOR_MAP_REDUCE)
+                            and plan_steps
+                        )
+                        write = (
+                            self._write_steps(task, plan_steps)
+                            if map_reduce
+                            else self._write(task, plan_text)
+                        )
+                    writer_task = group.create_task(
+                        self._run_stage("writer", write, progress=progress)
+                    )
+                if self.weather and location:
+                    weather_task = group.create_task(
+                        self._run_stage(
+                            "weather",
+                            self._join_prefetched(prefetched, "weather", key=location)
+                            or self.weather.act(task, location=location),
+                            fallback={
+                                "location": location,
+                                "error": "Weather lookup timed out",
+                                "provider": "open-meteo",
+                            },
+                            progress=progress,
+                        )
+                    )
+            writer_result = writer_task.result() if writer_task else None
+            weather_result = weather_task.result() if weather_task else None
 
-            response = await gemini.generate_content(
-                prompt=synthesis_prompt,
-                temperature=0.35,
-                max_tokens=700,
-                system_instruction="Blend multi-agent insights into one coherent answer with bullet points and a short summary."
-            )
+            # Synthesize final answer using Gemini, referencing other agents' outputs.
+            stage = "synthesis"
+            if intent.needs_synthesis:
+                response = await self._synthesize(
+                    task, plan_text, writer_result, weather_result, progress, map_reduce
+                )
+            else:
+                # A single contributor answers the request; no blending needed
+                self._skip_stage("synthesis", intent)
+                text = (
+                    _weather_answer(location, weather_result)
+                    if intent.kind == WEATHER
+                    else str(writer_result or "")
+                )
+                response = {"text": text}
+                if progress is not None:
+                    await progress("synthesis", {"text": text})
 
             synthesis_text = response.get("text", "")
 
@@ -107,16 +609,38 @@ Compose a single response that blends the best of the plan, writer, and weather
                 "writer": writer_result,
                 "weather": weather_result,
                 "synthesis": synthesis_text,
-                "coordination_summary": "Multi-agent answer blended from planner, writer, and weather (when provided).",
+                "coordination_summary": _COORDINATION_SUMMARIES[intent.kind],
+                "intent": intent.kind,
             }
 
         except Exception as exc:
-            self.logger.error("OrchestratorAgent failed", error=str(exc))
-            await self.memory.add({"task": task, "error": str(exc)})
+            # Degraded mode: reuse the stages that finished and synthesize
+            # locally, without another upstream call
+            self.logger.error(
+                "OrchestratorAgent failed, answering in degraded mode", error=str(exc), stage=stage
+            )
+            orchestrator_degraded.labels(stage=stage).inc()
+            writer_result = writer_result or _finished_result(writer_task)
+            weather_result = weather_result or _finished_result(weather_task)
+            synthesis_text = _local_synthesis(task, plan_steps, writer_result, weather_result)
+            await self.memory.add(
+                {"task": task, "error": str(exc), "degraded": True, "synthesis": synthesis_text}
+            )
             return {
                 "status": "completed",
                 "task": task,
-                "plan": await self.planner.act(task, task=task),
-                "synthesis": f"Fallback orchestration (Gemini unavailable): Coordinating agents for: {task}",
-                "coordination_summary": "Fallback coordination mode",
+                "plan": {
+                    "task": task,
+                    "steps": plan_steps,
+                    "plan_details": plan_text,
+                },
+                "writer": writer_result,
+                "weather": weather_result,
+                "synthesis": synthesis_text,
+                "coordination_summary": _DEGRADED_SUMMARY,
+                "intent": intent.kind,
+                "degraded": True,
             }
+        finally:
+            # Speculative work the request ended up not using
+            _cancel_unused(prefetched)
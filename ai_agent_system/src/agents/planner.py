@@ -1,13 +1,65 @@
 from __future__ import annotations
 
-from typing import Any, List, Dict
+import asyncio
+import json
+from typing import Any, AsyncIterator, List, Dict, Optional
 
 from src.agents.base.agent import BaseAgent
-from src.tools.llm import get_gemini_client
+from src.tools.llm.autotune import tuned_max_tokens
 from src.config.logging_config import get_logger
+from src.config.settings import settings
 
 logger = get_logger(component="planner_agent")
 
+PLANNER_SYSTEM_INSTRUCTION = "You are an expert task decomposition agent. Break down complex tasks into clear, actionable steps."
+
+PLANNING_TEMPLATE = """You are an expert task planner. Break down the following task into concise, numbered bullet points.
+Return at most 8 steps. Keep each step short and actionable.
+
+Task: {task}
+
+Provide a concise breakdown of steps needed to accomplish this task."""
+
+
+FALLBACK_PLAN_DETAILS = "Fallback plan (Gemini unavailable)"
+
+
+def is_fallback_plan(plan: Dict[str, Any]) -> bool:
+    """True for the canned plan returned when Gemini could not be reached."""
+    return plan.get("plan_details") == FALLBACK_PLAN_DETAILS or plan.get(
+        "steps"
+    ) == _fallback_steps(plan.get("task", ""))
+
+
+def _fallback_steps(task: str) -> List[str]:
+    return [f"Analyze: {task}", f"Plan: {task}", f"Execute: {task}", f"Review: {task}"]
+
+
+def _parse_batch_plans(text: str, count: int) -> Dict[int, List[str]]:
+    """Map task index to steps from a batched planner reply; drop malformed slices."""
+    body = text.strip()
+    if body.startswith("```"):
+        body = body.split("\n", 1)[-1].rsplit("```", 1)[0]
+    start, end = body.find("["), body.rfind("]")
+    if start == -1 or end <= start:
+        return {}
+    try:
+        items = json.loads(body[start : end + 1])
+    except json.JSONDecodeError:
+        return {}
+
+    plans: Dict[int, List[str]] = {}
+    for item in items if isinstance(items, list) else []:
+        if not isinstance(item, dict):
+            continue
+        index, steps = item.get("index"), item.get("steps")
+        if not isinstance(index, int) or not 0 <= index < count or not isinstance(steps, list):
+            continue
+        cleaned = [str(step).strip() for step in steps if str(step).strip()]
+        if cleaned:
+            plans[index] = cleaned[:8]
+    return plans
+
 
 class PlannerAgent(BaseAgent):
     """Task decomposition agent using Google Gemini for intelligent planning."""
@@ -22,21 +74,17 @@ class PlannerAgent(BaseAgent):
             task = task.split(":", 1)[-1].strip()
         
         try:
-            gemini = get_gemini_client()
+            llm = self.llm
             
             # Use Gemini to intelligently decompose the task
-            planning_prompt = f"""You are an expert task planner. Break down the following task into concise, numbered bullet points.
-Return at most 8 steps. Keep each step short and actionable.
-
-Task: {task}
-
-Provide a concise breakdown of steps needed to accomplish this task."""
+            planning_prompt = PLANNING_TEMPLATE.format(task=task)
             
-            response = await gemini.generate_content(
+            response = await llm.generate_content(
                 prompt=planning_prompt,
                 temperature=0.25,  # Lower temperature for deterministic planning
-                max_tokens=600,
-                system_instruction="You are an expert task decomposition agent. Break down complex tasks into clear, actionable steps."
+                max_tokens=tuned_max_tokens("planner", 600),
+                system_instruction=PLANNER_SYSTEM_INSTRUCTION,
+                stage="planner",
             )
             
             plan_text = response.get("text", "")
@@ -62,12 +110,7 @@ Provide a concise breakdown of steps needed to accomplish this task."""
         except Exception as exc:
             logger.error("PlannerAgent failed", error=str(exc))
             # Fallback to simple decomposition
-            simple_steps = [
-                f"Analyze: {task}",
-                f"Plan: {task}",
-                f"Execute: {task}",
-                f"Review: {task}"
-            ]
+            simple_steps = _fallback_steps(task)
             await self.memory.add({
                 "task": task,
                 "original_task": task,
@@ -78,6 +121,144 @@ Provide a concise breakdown of steps needed to accomplish this task."""
             return {
                 "task": task,
                 "steps": simple_steps,
-                "plan_details": "Fallback plan (Gemini unavailable)",
+                "plan_details": FALLBACK_PLAN_DETAILS,
                 "status": "completed"
             }
+
+    async def stream_steps(self, task: str) -> AsyncIterator[str]:
+        """Yield plan steps as soon as each line of the planner answer is complete.
+
+        Steps are the same non-empty lines act() would produce. If Gemini
+        fails before any step arrives the fallback plan is yielded instead;
+        a failure mid-stream ends the plan with the steps received so far.
+        """
+        steps: List[str] = []
+        buffer = ""
+        error: Optional[Exception] = None
+        try:
+            async for chunk in self.llm.stream_content(
+                prompt=PLANNING_TEMPLATE.format(task=task),
+                temperature=0.25,
+                max_tokens=tuned_max_tokens("planner", 600),
+                system_instruction=PLANNER_SYSTEM_INSTRUCTION,
+                stage="planner",
+            ):
+                buffer += chunk
+                *lines, buffer = buffer.split("\n")
+                for line in lines:
+                    if line.strip():
+                        steps.append(line.strip())
+                        yield line.strip()
+            if buffer.strip():
+                steps.append(buffer.strip())
+                yield buffer.strip()
+        except Exception as exc:
+            logger.error("PlannerAgent stream failed", error=str(exc), steps_received=len(steps))
+            error = exc
+
+        if error is not None and not steps:
+            steps = _fallback_steps(task)
+            for step in steps:
+                yield step
+        await self.memory.add(
+            {
+                "task": task,
+                "original_task": task,
+                "plan": steps,
+                "streamed": True,
+                **({"error": str(error)} if error is not None else {}),
+            }
+        )
+
+    async def plan_batch(
+        self, tasks: List[str], batch_size: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """Plan many tasks with one Gemini request per batch.
+
+        Tasks are packed into a single prompt asking for a JSON array, and the
+        reply is split back into per-task plans shaped like act() results.
+        Batches run concurrently. Tasks whose slice is missing or malformed
+        are re-planned individually; if the batch request itself fails, its
+        tasks get the fallback plan rather than one more request each.
+        """
+        batch_size = batch_size or settings.PLANNER_BATCH_SIZE
+        groups = await asyncio.gather(
+            *(
+                self._plan_group(tasks[offset : offset + batch_size])
+                for offset in range(0, len(tasks), batch_size)
+            )
+        )
+        return [plan for group in groups for plan in group]
+
+    async def _plan_group(self, tasks: List[str]) -> List[Dict[str, Any]]:
+        if len(tasks) == 1:
+            return [await self.act(tasks[0], task=tasks[0])]
+
+        numbered = "\n".join(f"{index}: {json.dumps(task)}" for index, task in enumerate(tasks))
+        planning_prompt = f"""You are an expert task planner.
+Break down each of the following tasks into concise, actionable steps.
+Return at most 8 short steps per task.
+
+Tasks (index: task):
+{numbered}
+
+Respond with only a JSON array, one object per task, in this form:
+[{{"index": 0, "steps": ["1. ...", "2. ..."]}}]"""
+
+        try:
+            llm = self.llm
+            response = await llm.generate_content(
+                prompt=planning_prompt,
+                temperature=0.25,
+                max_tokens=min(tuned_max_tokens("planner", 600) * len(tasks), 8192),
+                system_instruction=PLANNER_SYSTEM_INSTRUCTION,
+                stage="planner_batch",
+            )
+        except Exception as exc:
+            # Circuit open or retries exhausted: planning each task on its own
+            # would only pile more requests onto a failing upstream
+            logger.error("PlannerAgent batch failed", error=str(exc), batch_size=len(tasks))
+            return [await self._fallback_plan(task, exc) for task in tasks]
+        model = response.get("model")
+        plans = _parse_batch_plans(response.get("text", ""), len(tasks))
+
+        missing = [index for index in range(len(tasks)) if index not in plans]
+        if missing:
+            logger.warning(
+                "Batch plan slices unusable, planning individually", missing=len(missing)
+            )
+        fallbacks = await asyncio.gather(
+            *(self.act(tasks[index], task=tasks[index]) for index in missing)
+        )
+        results: Dict[int, Dict[str, Any]] = dict(zip(missing, fallbacks))
+
+        for index, steps in plans.items():
+            task = tasks[index]
+            await self.memory.add(
+                {
+                    "task": task,
+                    "original_task": task,
+                    "plan": steps,
+                    "model": model,
+                    "batched": True,
+                }
+            )
+            results[index] = {
+                "task": task,
+                "steps": steps,
+                "plan_details": "\n".join(steps),
+                "status": "completed",
+            }
+        return [results[index] for index in range(len(tasks))]
+
+    async def _fallback_plan(self, task: str, exc: BaseException) -> Dict[str, Any]:
+        steps = _fallback_steps(task)
+        await self.memory.add(
+            {"task": task, "original_task": task, "plan": steps, "error": str(exc), "batched": True}
+        )
+        return {
+            "task": task,
+            "steps": steps,
+            "plan_details": FALLBACK_PLAN_DETAILS,
+            "status": "completed",
+        }
@@ -1,13 +1,37 @@
 from __future__ import annotations
 
-from typing import Any, Dict, Optional
+import asyncio
+from typing import Any, AsyncIterable, AsyncIterator, Dict, Iterable, List, Optional, Tuple, Union
 
 from src.agents.base.agent import BaseAgent
-from src.tools.llm import get_gemini_client
+from src.tools.llm.autotune import tuned_max_tokens
+from src.tools.llm.tokens import achunk_text
 from src.config.logging_config import get_logger
+from src.config.settings import settings
+from src.utils.metrics import writer_document_chunks
 
 logger = get_logger(component="specialized_agents")
 
+WRITER_FALLBACK_PREFIX = "[Gemini unavailable]"
+
+# A document short enough for one call is sent whole, like any writer prompt
+DOCUMENT_TEMPLATE = """{instruction}
+
+{document}"""
+
+CHUNK_TEMPLATE = """{instruction}
+
+The input is too long to handle at once. This is part {index} of it; work only from this part.
+
+{chunk}"""
+
+REDUCE_TEMPLATE = """{instruction}
+
+The input was processed in parts. Below are the results for consecutive parts, in order.
+Merge them into a single result without repeating yourself.
+
+{partials}"""
+
 
 class WriterAgent(BaseAgent):
     """Content generation agent using Google Gemini."""
@@ -15,16 +39,34 @@ class WriterAgent(BaseAgent):
     async def act(self, chain_of_thought: str, **kwargs: Any) -> str:
         prompt = kwargs.get("prompt", chain_of_thought)
         temperature = kwargs.get("temperature", 0.7)
-        max_tokens = kwargs.get("max_tokens", 1024)
+        stage = kwargs.get("stage", "writer")
+        max_tokens = kwargs.get("max_tokens") or tuned_max_tokens(stage, 1024)
         system_instruction = kwargs.get("system_instruction")
         
         try:
-            gemini = get_gemini_client()
-            response = await gemini.generate_content(
+            document = kwargs.get("document")
+            if document is not None:
+                result, chunks = await self._process_document(
+                    document,
+                    prompt,
+                    temperature=temperature,
+                    max_tokens=max_tokens,
+                    system_instruction=system_instruction,
+                    stage=stage,
+                    chunk_tokens=kwargs.get("chunk_tokens") or settings.WRITER_CHUNK_TOKENS,
+                    fan_out=kwargs.get("fan_out") or settings.WRITER_MAX_FAN_OUT,
+                )
+                await self.memory.add({"generated": result, "prompt": prompt, "chunks": chunks})
+                return result
+
+            llm = self.llm
+            response = await llm.generate_content(
                 prompt=prompt,
                 temperature=temperature,
                 max_tokens=max_tokens,
                 system_instruction=system_instruction,
+                stage=stage,
+                hedge=kwargs.get("hedge"),
             )
             
             result = response.get("text", "")
@@ -39,10 +81,178 @@ class WriterAgent(BaseAgent):
         except Exception as exc:
             logger.error("WriterAgent failed", error=str(exc))
             # Fallback to mock response
-            result = f"[Gemini unavailable] Generated content for: {prompt}"
+            result = f"{WRITER_FALLBACK_PREFIX} Generated content for: {prompt}"
             await self.memory.add({"generated": result, "error": str(exc)})
             return result
 
+    async def _process_document(
+        self,
+        document: Union[str, Iterable[str], AsyncIterable[str]],
+        instruction: str,
+        *,
+        temperature: float,
+        max_tokens: int,
+        system_instruction: Optional[str],
+        stage: str,
+        chunk_tokens: int,
+        fan_out: int,
+    ) -> Tuple[str, int]:
+        """Apply ``instruction`` to a long input by map-reduce over its chunks.
+
+        ``document`` is a string, an iterable of lines or an async stream of
+        text such as a request body. Chunks of ``chunk_tokens`` are read
+        lazily and processed concurrently, with at most ``fan_out`` LLM calls
+        in flight; reading pauses while every slot is taken. Partial outputs
+        are merged WRITER_REDUCE_FAN_IN at a time as soon as a group is
+        complete, so the reduction tree is built while the input is still
+        being read and memory stays bounded by the fan-out and tree depth,
+        not input size. An input that fits in a single chunk skips map-reduce
+        and is sent whole as a ``stage`` call.
+        Returns the result and the number of chunks.
+        """
+        llm = self.llm
+        limit = asyncio.Semaphore(max(1, fan_out))
+        fan_in = max(2, settings.WRITER_REDUCE_FAN_IN)
+        chunk_max_tokens = tuned_max_tokens("writer_chunk", 512)
+
+        async def generate(prompt: str, stage: str, tokens: int) -> str:
+            response = await llm.generate_content(
+                prompt=prompt,
+                temperature=temperature,
+                max_tokens=tokens,
+                system_instruction=system_instruction,
+                stage=stage,
+            )
+            return response.get("text", "")
+
+        async def map_chunk(index: int, chunk: str) -> str:
+            # The slot was taken by the reader before this chunk was read
+            try:
+                return await generate(
+                    CHUNK_TEMPLATE.format(instruction=instruction, index=index, chunk=chunk),
+                    "writer_chunk",
+                    chunk_max_tokens,
+                )
+            finally:
+                limit.release()
+
+        async def reduce(parts: List[asyncio.Task[str]]) -> str:
+            texts = await asyncio.gather(*parts)
+            partials = "\n\n".join(f"Part {n}:\n{text}" for n, text in enumerate(texts, start=1))
+            async with limit:
+                return await generate(
+                    REDUCE_TEMPLATE.format(instruction=instruction, partials=partials),
+                    "writer_reduce",
+                    max_tokens,
+                )
+
+        # levels[n] holds results not yet merged at tree depth n; deeper levels
+        # cover earlier parts of the input
+        levels: List[List[asyncio.Task[str]]] = []
+        chunks = 0
+        async with asyncio.TaskGroup() as group:
+
+            def push(task: asyncio.Task[str], level: int) -> None:
+                if len(levels) == level:
+                    levels.append([])
+                levels[level].append(task)
+                if len(levels[level]) == fan_in:
+                    parts, levels[level] = levels[level], []
+                    push(group.create_task(reduce(parts)), level + 1)
+
+            # The first chunk waits until a second one shows the input needs splitting
+            first: Optional[str] = None
+            async for chunk in achunk_text(document, chunk_tokens):
+                chunks += 1
+                if chunks == 1:
+                    first = chunk
+                    continue
+                if first is not None:
+                    await limit.acquire()
+                    push(group.create_task(map_chunk(1, first)), 0)
+                    first = None
+                await limit.acquire()
+                push(group.create_task(map_chunk(chunks, chunk)), 0)
+
+            if first is not None:
+                remaining = [
+                    group.create_task(
+                        generate(
+                            DOCUMENT_TEMPLATE.format(instruction=instruction, document=first),
+                            stage,
+                            max_tokens,
+                        )
+                    )
+                ]
+            else:
+                remaining = [task for level in reversed(levels) for task in level]
+            while len(remaining) > 1:
+                groups = [
+                    remaining[start : start + fan_in] for start in range(0, len(remaining), fan_in)
+                ]
+                # A trailing single result is carried up rather than "merged" alone
+                remaining = [
+                    group.create_task(reduce(parts)) if len(parts) > 1 else parts[0]
+                    for parts in groups
+                ]
+        writer_document_chunks.observe(chunks)
+        return (remaining[0].result() if remaining else ""), chunks
+
+    async def stream(self, chain_of_thought: str, **kwargs: Any) -> AsyncIterator[str]:
+        """Streaming variant of act() yielding text chunks as they are generated.
+
+        Falls back to the same mock response as act() when Gemini fails before
+        producing any text; failures mid-stream are re-raised so callers do
+        not mistake a truncated answer for a complete one. A long ``document``
+        is reduced as in act() and yielded as one chunk.
+        """
+        if kwargs.get("document") is not None:
+            yield await self.act(chain_of_thought, **kwargs)
+            return
+
+        prompt = kwargs.get("prompt", chain_of_thought)
+        temperature = kwargs.get("temperature", 0.7)
+        stage = kwargs.get("stage", "writer")
+        max_tokens = kwargs.get("max_tokens") or tuned_max_tokens(stage, 1024)
+        system_instruction = kwargs.get("system_instruction")
+
+        chunks: list[str] = []
+        model: Optional[str] = None
+        error: Optional[Exception] = None
+        try:
+            llm = self.llm
+            model = llm.model_for(stage)
+            async for chunk in llm.stream_content(
+                prompt=prompt,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                system_instruction=system_instruction,
+                stage=stage,
+            ):
+                chunks.append(chunk)
+                yield chunk
+        except Exception as exc:
+            logger.error("WriterAgent stream failed", error=str(exc))
+            if chunks:
+                await self.memory.add({"generated": "".join(chunks), "error": str(exc)})
+                raise
+            error = exc
+
+        if error is not None:
+            result = f"{WRITER_FALLBACK_PREFIX} Generated content for: {prompt}"
+            await self.memory.add({"generated": result, "error": str(error)})
+            yield result
+            return
+
+        await self.memory.add(
+            {
+                "generated": "".join(chunks),
+                "prompt": prompt,
+                "model": model,
+                "streamed": True,
+            }
+        )
+
 
 class FlightAgent(BaseAgent):
     """Flight booking specialist with mock API integration."""
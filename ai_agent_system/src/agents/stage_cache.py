@@ -0,0 +1,83 @@
+"""Memoization of orchestrator stage outputs keyed by the inputs they consumed."""
+
+from __future__ import annotations
+
+import copy
+import hashlib
+import json
+import threading
+from collections import defaultdict
+from typing import Any, Awaitable, Callable, DefaultDict, Dict, Mapping, Optional, TypeVar
+
+from cachetools import TTLCache
+
+from src.utils.metrics import orchestrator_stage_cache_requests
+
+T = TypeVar("T")
+
+
+def stage_key(stage: str, inputs: Mapping[str, Any]) -> str:
+    """Stable hash of a stage name and the inputs it reads."""
+    payload = json.dumps({"stage": stage, "inputs": inputs}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class StageCache:
+    """TTL/LRU cache of stage outputs.
+
+    Each stage is keyed by exactly what it consumed (task, plan text,
+    weather payload, model and generation config), so when one input
+    changes only the stages downstream of it miss. ``cacheable`` lets a
+    caller keep fallback outputs out of the cache.
+    """
+
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        self._entries: TTLCache[str, Any] = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._lock = threading.Lock()
+        self.hits: DefaultDict[str, int] = defaultdict(int)
+        self.misses: DefaultDict[str, int] = defaultdict(int)
+
+    def get(self, stage: str, inputs: Mapping[str, Any]) -> Optional[Any]:
+        with self._lock:
+            value = self._entries.get(stage_key(stage, inputs))
+        if value is None:
+            self.misses[stage] += 1
+            orchestrator_stage_cache_requests.labels(stage=stage, result="miss").inc()
+            return None
+        self.hits[stage] += 1
+        orchestrator_stage_cache_requests.labels(stage=stage, result="hit").inc()
+        return copy.deepcopy(value)
+
+    def set(self, stage: str, inputs: Mapping[str, Any], value: Any) -> None:
+        with self._lock:
+            self._entries[stage_key(stage, inputs)] = copy.deepcopy(value)
+
+    async def get_or_compute(
+        self,
+        stage: str,
+        inputs: Mapping[str, Any],
+        compute: Callable[[], Awaitable[T]],
+        cacheable: Callable[[T], bool] = bool,
+    ) -> T:
+        cached = self.get(stage, inputs)
+        if cached is not None:
+            return cached
+        value = await compute()
+        if cacheable(value):
+            self.set(stage, inputs, value)
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        stages = set(self.hits) | set(self.misses)
+        return {
+            stage: {
+                "hits": self.hits[stage],
+                "misses": self.misses[stage],
+                "hit_rate": self.hits[stage] / ((self.hits[stage] + self.misses[stage]) or 1),
+            }
+            for stage in sorted(stages)
+        }
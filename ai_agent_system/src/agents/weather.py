@@ -7,11 +7,18 @@ from typing import Any, Dict, Optional
 from urllib.parse import urlencode
 from urllib.request import urlopen
 
+from cachetools import TTLCache
+
 from src.agents.base.agent import BaseAgent
 from src.config.logging_config import get_logger
+from src.utils.cassette import get_cassette
 
 logger = get_logger(component="weather_agent")
 
+# Place lookups barely change; intent routing and the lookup share them
+GEOCODE_CACHE_SIZE = 512
+GEOCODE_CACHE_TTL = 24 * 3600
+
 
 @dataclass
 class WeatherResult:
@@ -42,12 +49,35 @@ async def _fetch_json(url: str) -> Dict[str, Any]:
         with urlopen(url, timeout=10) as resp:
             return json.loads(resp.read().decode("utf-8"))
 
+    cassette = get_cassette()
+    if cassette is not None:
+        return await cassette.call("http", url, lambda: asyncio.to_thread(_blocking))
     return await asyncio.to_thread(_blocking)
 
 
 class WeatherAgent(BaseAgent):
     """Weather lookup agent using real Open-Meteo data (no API key required)."""
 
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self._places: TTLCache[str, Dict[str, Any]] = TTLCache(
+            maxsize=GEOCODE_CACHE_SIZE, ttl=GEOCODE_CACHE_TTL
+        )
+
+    async def geocode(self, location: str) -> Optional[Dict[str, Any]]:
+        """Best Open-Meteo geocoding match for ``location``, or None if unknown."""
+        key = location.strip().lower()
+        place = self._places.get(key)
+        if place is None:
+            geo_url = "https://geocoding-api.open-meteo.com/v1/search?" + urlencode(
+                {"name": location, "count": 1, "language": "en"}
+            )
+            geo = await _fetch_json(geo_url)
+            place = (geo.get("results") or [None])[0]
+            if place:
+                self._places[key] = place
+        return place
+
     async def think(self, task: str, **kwargs: Any) -> str:
         location = kwargs.get("location") or task
         return f"Weather lookup for: {location}"
@@ -58,11 +88,7 @@ class WeatherAgent(BaseAgent):
             if not location:
                 raise ValueError("Location is required")
 
-            geo_url = "https://geocoding-api.open-meteo.com/v1/search?" + urlencode(
-                {"name": location, "count": 1, "language": "en"}
-            )
-            geo = await _fetch_json(geo_url)
-            first = (geo.get("results") or [None])[0]
+            first = await self.geocode(location)
             if not first:
                 raise ValueError("Location not found")
 
@@ -1,20 +1,26 @@
 from __future__ import annotations
 
+import codecs
 import hashlib
 import json
-from typing import Any, Dict, List
+from typing import Any, AsyncIterator, Dict, List, Optional
 
-from fastapi import APIRouter, HTTPException, status, Depends
+from fastapi import APIRouter, HTTPException, Request, status, Depends
+from fastapi.responses import StreamingResponse
 from fastapi.security import HTTPBearer
 from pydantic import BaseModel
 
 from src.agents.orchestrator import OrchestratorAgent
 from src.agents.planner import PlannerAgent
-from src.agents.specialized import WriterAgent
+from src.agents.specialized import WRITER_FALLBACK_PREFIX, WriterAgent
 from src.agents.base.memory import ShortTermMemory
 from src.agents.weather import WeatherAgent
 from src.utils.firebase_cache import get_firestore_cache
 from src.api.middleware.auth_middleware import get_current_user
+from src.config.logging_config import get_logger
+from src.config.settings import settings
+
+logger = get_logger(component="agent_endpoints")
 
 router = APIRouter(prefix="/agents", tags=["agents"])
 security = HTTPBearer()
@@ -39,10 +45,36 @@ class AgentExecuteRequest(BaseModel):
 class WriterRequest(BaseModel):
     prompt: str
     temperature: float = 0.7
-    max_tokens: int = 1000
+    max_tokens: Optional[int] = None
     chain_of_thought: str = ""
 
 
+class PlannerBatchRequest(BaseModel):
+    tasks: List[str]
+
+
+# Request parameters a client may pass through to the orchestrator; anything
+# else (progress sinks, execution modes) stays server-side
+ORCHESTRATOR_PARAMETERS = frozenset({"location", "city"})
+
+
+def _orchestrator_params(parameters: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    return {
+        key: value for key, value in (parameters or {}).items() if key in ORCHESTRATOR_PARAMETERS
+    }
+
+
+def _writer_cache_key(request: WriterRequest) -> str:
+    cache_data = f"{request.prompt}:{request.temperature}:{request.max_tokens}"
+    return f"writer:{hashlib.md5(cache_data.encode()).hexdigest()}"
+
+
+def _sse(data: Any, event: Optional[str] = None) -> str:
+    """Format one Server-Sent Events frame."""
+    frame = f"event: {event}\n" if event else ""
+    return frame + f"data: {json.dumps(data)}\n\n"
+
+
 @router.get("", summary="List available agents")
 async def list_agents(user: Dict[str, Any] = Depends(get_current_user)) -> List[Dict[str, Any]]:
     return [
@@ -56,7 +88,11 @@ async def list_agents(user: Dict[str, Any] = Depends(get_current_user)) -> List[
 @router.get("/{agent_id}", summary="Get agent details")
 async def get_agent(agent_id: str, user: Dict[str, Any] = Depends(get_current_user)) -> Dict[str, Any]:
     agents = {
-        "orchestrator": {"id": "orchestrator", "role": orchestrator.role},
+        "orchestrator": {
+            "id": "orchestrator",
+            "role": orchestrator.role,
+            "stage_cache": orchestrator.stage_cache.stats() if orchestrator.stage_cache else None,
+        },
         "planner": {"id": "planner", "role": planner.role},
         "writer": {"id": "writer", "role": writer.role},
         "weather": {"id": "weather", "role": weather.role},
@@ -88,6 +124,7 @@ async def execute_agent(payload: AgentExecuteRequest, user: Dict[str, Any] = Dep
     params = payload.parameters or {}
     if payload.agent_id == "orchestrator":
         # Orchestrator needs think() first to get chain of thought
+        params = _orchestrator_params(params)
         chain_of_thought = await orchestrator.think(payload.task, **params)
         result = await orchestrator.act(chain_of_thought, task=payload.task, **params)
     elif payload.agent_id == "planner":
@@ -97,8 +134,9 @@ async def execute_agent(payload: AgentExecuteRequest, user: Dict[str, Any] = Dep
     else:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Agent not found")
     
-    # Cache the result for 1 hour
-    await cache.set_json(cache_key, result, ttl=3600)
+    # Cache the result for 1 hour; degraded answers are not worth keeping
+    if not (isinstance(result, dict) and result.get("degraded")):
+        await cache.set_json(cache_key, result, ttl=3600)
     
     return {
         "agent_id": payload.agent_id,
@@ -109,6 +147,72 @@ async def execute_agent(payload: AgentExecuteRequest, user: Dict[str, Any] = Dep
     }
 
 
+@router.post("/execute/stream", summary="Stream orchestrator progress as Server-Sent Events")
+async def stream_execute(
+    payload: AgentExecuteRequest, user: Dict[str, Any] = Depends(get_current_user)
+) -> StreamingResponse:
+    """
+    Run the orchestrator and stream typed events as each stage finishes.
+
+    Events: `plan` (steps ready), `writer`, `weather`, `synthesis` (one
+    `{"text": ...}` frame per chunk) and `done` carrying the same result as
+    `/agents/execute`, or `error`. The result is cached under the same key as
+    `/agents/execute`; a cached result is sent as a single `done` event.
+    Only `agent_id=orchestrator` is supported, and only the `location` and
+    `city` parameters are forwarded.
+    """
+    if payload.agent_id != "orchestrator":
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Streaming is only available for the orchestrator",
+        )
+
+    cache_key = f"agent:{payload.agent_id}:{hashlib.md5(payload.task.encode()).hexdigest()}"
+    cache = get_firestore_cache()
+    cached_result = await cache.get_json(cache_key)
+
+    async def events() -> AsyncIterator[str]:
+        if cached_result:
+            yield _sse({"result": cached_result, "cached": True}, event="done")
+            return
+
+        async for event, data in orchestrator.stream(
+            payload.task, **_orchestrator_params(payload.parameters)
+        ):
+            if event == "done":
+                if not data.get("degraded"):
+                    await cache.set_json(cache_key, data, ttl=3600)
+                data = {"result": data, "cached": False}
+            yield _sse(data, event=event)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.post("/planner/batch", summary="Plan many tasks in batched Gemini requests")
+async def plan_batch(
+    payload: PlannerBatchRequest, user: Dict[str, Any] = Depends(get_current_user)
+) -> Dict[str, Any]:
+    if not payload.tasks:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="tasks must not be empty"
+        )
+    if len(payload.tasks) > settings.PLANNER_BATCH_MAX_TASKS:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"at most {settings.PLANNER_BATCH_MAX_TASKS} tasks per request",
+        )
+    results = await planner.plan_batch(payload.tasks)
+    return {
+        "agent_id": "planner",
+        "status": "completed",
+        "results": results,
+    }
+
+
 @router.post("/writer", summary="Execute WriterAgent for content generation")
 async def execute_writer(request: WriterRequest, user: Dict[str, Any] = Depends(get_current_user)) -> Dict[str, Any]:
     """
@@ -116,12 +220,11 @@ async def execute_writer(request: WriterRequest, user: Dict[str, Any] = Depends(
 
     - **prompt**: The content prompt or question
     - **temperature**: Creativity level (0.0-1.0)
-    - **max_tokens**: Maximum response length
+    - **max_tokens**: Maximum response length (tuned from observed answers when omitted)
     - **chain_of_thought**: Optional reasoning prefix
     """
     # Generate cache key from prompt and parameters
-    cache_data = f"{request.prompt}:{request.temperature}:{request.max_tokens}"
-    cache_key = f"writer:{hashlib.md5(cache_data.encode()).hexdigest()}"
+    cache_key = _writer_cache_key(request)
     
     # Try to get from cache
     cache = get_firestore_cache()
@@ -144,8 +247,9 @@ async def execute_writer(request: WriterRequest, user: Dict[str, Any] = Depends(
         max_tokens=request.max_tokens,
     )
     
-    # Cache the result for 1 hour
-    await cache.set_json(cache_key, result, ttl=3600)
+    # Cache the result for 1 hour; the offline fallback must not stick
+    if not result.startswith(WRITER_FALLBACK_PREFIX):
+        await cache.set_json(cache_key, result, ttl=3600)
     
     return {
         "agent_id": "writer",
@@ -154,3 +258,94 @@ async def execute_writer(request: WriterRequest, user: Dict[str, Any] = Depends(
         "result": result,
         "cached": False
     }
+
+
+@router.post("/writer/document", summary="Apply a WriterAgent prompt to a long document")
+async def execute_writer_document(
+    request: Request,
+    prompt: str,
+    temperature: float = 0.7,
+    max_tokens: Optional[int] = None,
+    user: Dict[str, Any] = Depends(get_current_user),
+) -> Dict[str, Any]:
+    """
+    Apply a prompt to a document sent as the raw (UTF-8 text) request body.
+
+    - **prompt**: What to do with the document, e.g. "Summarize the errors"
+    - **temperature**: Creativity level (0.0-1.0)
+    - **max_tokens**: Maximum length of the merged answer
+
+    The body is read as it arrives and split into WRITER_CHUNK_TOKENS
+    chunks that are processed concurrently and merged, so multi-megabyte
+    documents are never held in memory whole. Results are not cached: the
+    key would depend on a body that is only seen once.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+
+    async def body() -> AsyncIterator[str]:
+        async for data in request.stream():
+            yield decoder.decode(data)
+        yield decoder.decode(b"", final=True)
+
+    result = await writer.act(
+        "", prompt=prompt, temperature=temperature, max_tokens=max_tokens, document=body()
+    )
+    return {
+        "agent_id": "writer",
+        "prompt": prompt,
+        "status": "completed",
+        "result": result,
+        "cached": False,
+    }
+
+
+@router.post("/writer/stream", summary="Stream WriterAgent output as Server-Sent Events")
+async def stream_writer(
+    request: WriterRequest, user: Dict[str, Any] = Depends(get_current_user)
+) -> StreamingResponse:
+    """
+    Stream content from the WriterAgent as it is generated.
+
+    Emits `data: {"text": ...}` frames for each chunk, then an `event: done`
+    frame. The assembled text is written to the same cache entry as
+    `/agents/writer` once the stream completes; a failed stream, including
+    one that only produced the offline fallback, emits `event: error` and is
+    not cached.
+    """
+    cache_key = _writer_cache_key(request)
+    cache = get_firestore_cache()
+    cached_result = await cache.get_json(cache_key)
+
+    async def events() -> AsyncIterator[str]:
+        if cached_result:
+            yield _sse({"text": cached_result})
+            yield _sse({"cached": True}, event="done")
+            return
+
+        chunks: list[str] = []
+        try:
+            async for chunk in writer.stream(
+                request.chain_of_thought,
+                prompt=request.prompt,
+                temperature=request.temperature,
+                max_tokens=request.max_tokens,
+            ):
+                if not chunks and chunk.startswith(WRITER_FALLBACK_PREFIX):
+                    # Gemini failed before producing anything; that's an error, not content
+                    yield _sse({"error": chunk}, event="error")
+                    return
+                chunks.append(chunk)
+                yield _sse({"text": chunk})
+        except Exception as exc:  # noqa: BLE001
+            logger.error("writer stream failed", error=str(exc))
+            yield _sse({"error": str(exc)}, event="error")
+            return
+
+        await cache.set_json(cache_key, "".join(chunks), ttl=3600)
+        yield _sse({"cached": False}, event="done")
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
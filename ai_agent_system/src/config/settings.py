@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from typing import List, Literal, Optional
+from typing import Dict, List, Literal, Optional
 
 from pydantic import AnyHttpUrl, Field, PostgresDsn, RedisDsn, field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -22,9 +22,195 @@ class Settings(BaseSettings):
     ANTHROPIC_API_KEY: Optional[str] = Field(
         None, description="Anthropic API Key"
     )
+    LLM_PROVIDER: Literal["gemini", "fake"] = Field(
+        "gemini", description="LLM backend; 'fake' is an offline stand-in for load testing"
+    )
     GEMINI_API_KEY: Optional[str] = Field(
         None, description="Google Gemini API Key"
     )
+    GEMINI_API_KEYS: List[str] = Field(
+        default_factory=list,
+        description="Pool of Gemini API keys as a JSON list; overrides GEMINI_API_KEY when set",
+    )
+    GEMINI_KEY_SELECTION: Literal["least_loaded", "round_robin"] = Field(
+        "least_loaded", description="How calls are spread over GEMINI_API_KEYS"
+    )
+    GEMINI_KEY_QUARANTINE_SECONDS: float = Field(
+        60.0, description="Seconds a key is skipped after it is throttled (429)"
+    )
+    GEMINI_DEFAULT_MODEL: str = Field(
+        "gemini-2.5-flash", description="Gemini model for stages without a configured tier"
+    )
+    GEMINI_STAGE_MODELS: Dict[str, str] = Field(
+        default_factory=dict,
+        description=(
+            'Model tier per agent stage as JSON (e.g. {"planner": "gemini-2.5-flash-lite"})'
+        ),
+    )
+    GEMINI_ESCALATION_MODEL: Optional[str] = Field(
+        "gemini-2.5-flash",
+        description="Model that retries empty or safety-blocked cheaper-tier answers",
+    )
+    GEMINI_MAX_CONCURRENCY: int = Field(
+        32, description="Maximum concurrent in-flight Gemini calls per process and API key"
+    )
+    GEMINI_MIN_CONCURRENCY: int = Field(
+        2, description="Floor for the adaptive Gemini concurrency limit"
+    )
+    GEMINI_INITIAL_CONCURRENCY: int = Field(
+        16, description="Starting value for the adaptive Gemini concurrency limit"
+    )
+    GEMINI_COALESCE_REQUESTS: bool = Field(
+        True, description="Share one upstream call among identical concurrent requests"
+    )
+    GEMINI_RESPONSE_CACHE_ENABLED: bool = Field(
+        True, description="Cache low-temperature Gemini responses in process memory"
+    )
+    GEMINI_RESPONSE_CACHE_SIZE: int = Field(
+        1024, description="Maximum number of cached Gemini responses (LRU eviction)"
+    )
+    GEMINI_RESPONSE_CACHE_TTL: float = Field(
+        600.0, description="Lifetime of a cached Gemini response in seconds"
+    )
+    GEMINI_RESPONSE_CACHE_MAX_TEMPERATURE: float = Field(
+        0.3, description="Only requests at or below this temperature are cached"
+    )
+    GEMINI_MODEL_CACHE_SIZE: int = Field(
+        32, description="Maximum memoized Gemini models (one per distinct system instruction)"
+    )
+    GEMINI_CHAT_SESSION_MAX: int = Field(
+        1000, description="Maximum live chat sessions kept per model"
+    )
+    GEMINI_CHAT_SESSION_IDLE_SECONDS: float = Field(
+        900.0, description="Idle seconds after which a pooled chat session is evicted"
+    )
+    GEMINI_CIRCUIT_FAILURE_THRESHOLD: int = Field(
+        5, description="Consecutive Gemini failures that open the circuit"
+    )
+    GEMINI_CIRCUIT_RECOVERY_SECONDS: float = Field(
+        30.0, description="Seconds the circuit stays open before probing Gemini again"
+    )
+    GEMINI_CIRCUIT_PROBES: int = Field(
+        2, description="Successful half-open probe calls needed to close the circuit"
+    )
+    GEMINI_HEDGE_STAGES: List[str] = Field(
+        default_factory=list,
+        description=(
+            'Agent stages that hedge slow calls, as a JSON list (e.g. ["planner", "synthesis"])'
+        ),
+    )
+    GEMINI_HEDGE_PERCENTILE: float = Field(
+        0.9, description="Recent-latency percentile after which a duplicate call is fired"
+    )
+    GEMINI_HEDGE_BUDGET: float = Field(
+        0.05, description="Maximum hedged calls as a fraction of all calls"
+    )
+    GEMINI_HEDGE_MIN_SAMPLES: int = Field(
+        20, description="Latency samples required per model and stage before hedging"
+    )
+    LLM_STAGE_TOKEN_BUDGETS: Dict[str, int] = Field(
+        default_factory=lambda: {"synthesis": 3000, "synthesis_map_reduce": 8000},
+        description=(
+            "Prompt token budget per agent stage as a JSON object; "
+            "lower-priority sections are trimmed to fit"
+        ),
+    )
+    LLM_MAX_TOKENS_AUTOTUNE: bool = Field(
+        True,
+        description=(
+            "Derive max_tokens per stage from observed completion lengths "
+            "when callers don't pin it"
+        ),
+    )
+    LLM_MAX_TOKENS_PERCENTILE: float = Field(
+        0.95, description="Completion length percentile the tuned max_tokens is based on"
+    )
+    LLM_MAX_TOKENS_HEADROOM: float = Field(
+        1.25, description="Multiplier applied to the observed percentile"
+    )
+    LLM_MAX_TOKENS_MIN_SAMPLES: int = Field(
+        50, description="Completions needed for a stage before its max_tokens is tuned"
+    )
+    LLM_MAX_TOKENS_FLOOR: int = Field(64, description="Lowest tuned max_tokens")
+    LLM_MAX_TOKENS_CEILING: int = Field(8192, description="Highest tuned max_tokens")
+    FAKE_LLM_LATENCY_MS: float = Field(
+        800.0, description="Fake provider latency: median (lognormal) or mean of each call"
+    )
+    FAKE_LLM_LATENCY_DISTRIBUTION: Literal[
+        "fixed", "uniform", "normal", "lognormal", "exponential"
+    ] = Field("lognormal", description="Fake provider latency distribution")
+    FAKE_LLM_LATENCY_SPREAD: float = Field(
+        0.5,
+        description="Fake provider latency spread (lognormal sigma, relative stddev or half-width)",
+    )
+    FAKE_LLM_COMPLETION_TOKENS: int = Field(
+        200, description="Tokens the fake provider generates per call before max_tokens"
+    )
+    FAKE_LLM_ERROR_RATE: float = Field(0.0, description="Fraction of fake provider calls that fail")
+    FAKE_LLM_STREAM_CHUNK_TOKENS: int = Field(
+        16, description="Tokens per chunk when the fake provider streams"
+    )
+    FAKE_LLM_SEED: Optional[int] = Field(
+        None, description="Seed for fake provider latency and errors"
+    )
+    CASSETTE_MODE: Literal["off", "record", "replay"] = Field(
+        "off",
+        description="Record Gemini/Open-Meteo responses to CASSETTE_PATH or replay them offline",
+    )
+    CASSETTE_PATH: str = Field(
+        "cassettes/upstream.jsonl", description="Cassette file used by CASSETTE_MODE"
+    )
+    CASSETTE_REPLAY_LATENCY: Literal["recorded", "none"] = Field(
+        "recorded", description="Replay at the recorded latency or instantly"
+    )
+    ORCHESTRATOR_STAGE_TIMEOUTS: Dict[str, float] = Field(
+        default_factory=lambda: {"writer": 45.0, "weather": 15.0},
+        description="Seconds each orchestrator contributor stage may take, as a JSON object",
+    )
+    ORCHESTRATOR_PIPELINED: bool = Field(
+        False, description="Stream the plan and start the writer before planning finishes"
+    )
+    ORCHESTRATOR_PIPELINE_MIN_STEPS: int = Field(
+        3, description="Plan steps received before the pipelined writer starts"
+    )
+    ORCHESTRATOR_EVENT_QUEUE_SIZE: int = Field(
+        64, description="Buffered progress events per streaming orchestration before it pauses"
+    )
+    ORCHESTRATOR_STAGE_CACHE_ENABLED: bool = Field(
+        True,
+        description="Memoize planner, writer and synthesis outputs by the inputs they consumed",
+    )
+    ORCHESTRATOR_STAGE_CACHE_SIZE: int = Field(
+        512, description="Maximum memoized orchestrator stage outputs"
+    )
+    ORCHESTRATOR_STAGE_CACHE_TTL: float = Field(
+        600.0, description="Seconds a memoized orchestrator stage output stays valid"
+    )
+    ORCHESTRATOR_MAP_REDUCE: bool = Field(
+        False,
+        description="Expand each plan step with its own writer call and let synthesis merge them",
+    )
+    ORCHESTRATOR_MAP_REDUCE_CONCURRENCY: int = Field(
+        4, description="Maximum concurrent writer calls in map-reduce mode"
+    )
+    ORCHESTRATOR_INTENT_ROUTING: bool = Field(
+        False, description="Classify requests locally and skip orchestrator stages they don't need"
+    )
+    WRITER_CHUNK_TOKENS: int = Field(
+        2000, description="Tokens per chunk when the writer processes a long input"
+    )
+    WRITER_MAX_FAN_OUT: int = Field(
+        4, description="Maximum concurrent LLM calls while the writer processes a long input"
+    )
+    WRITER_REDUCE_FAN_IN: int = Field(
+        8, description="Partial results merged per reduce call for long writer inputs"
+    )
+    PLANNER_BATCH_SIZE: int = Field(
+        10, description="Maximum number of tasks packed into one batched planner request"
+    )
+    PLANNER_BATCH_MAX_TASKS: int = Field(
+        100, description="Maximum number of tasks accepted by one /planner/batch call"
+    )
     FIREBASE_CREDENTIALS_PATH: Optional[str] = Field(
         None, description="Path to Firebase service account credentials JSON"
     )
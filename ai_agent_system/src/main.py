@@ -37,6 +37,7 @@ from src.utils.clients import client_manager
 from src.utils.tracing import initialize_tracing, TracingMiddleware
 from src.utils.firebase_auth import get_firebase_auth
 from src.utils.firebase_cache import get_firestore_cache
+from src.tools.llm import close_gemini_client
 
 
 @asynccontextmanager
@@ -57,6 +58,7 @@ async def lifespan(app: FastAPI) -> AsyncIterator[None]:
     finally:
         logger.info("shutting down application")
         await client_manager.close()
+        await close_gemini_client()
 
 
 middleware_stack = [
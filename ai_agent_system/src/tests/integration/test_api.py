@@ -36,3 +36,110 @@ def test_agents_list_with_auth():
     resp = client.get("/api/v1/agents", headers={"Authorization": f"Bearer {token}"})
     assert resp.status_code == 200
     assert isinstance(resp.json(), list)
+
+
+class DictCache:
+    def __init__(self):
+        self.entries = {}
+
+    async def get_json(self, key):
+        return self.entries.get(key)
+
+    async def set_json(self, key, value, ttl=None):
+        self.entries[key] = value
+        return True
+
+
+# Passes the API key middleware; the user dependency itself is overridden
+BEARER = {"Authorization": "Bearer test"}
+
+
+@pytest.fixture
+def authed(monkeypatch):
+    from src.api.endpoints import agent_endpoints
+    from src.api.middleware.auth_middleware import get_current_user
+
+    cache = DictCache()
+    monkeypatch.setattr(agent_endpoints, "get_firestore_cache", lambda: cache)
+    app.dependency_overrides[get_current_user] = lambda: {"uid": "test"}
+    yield agent_endpoints, cache
+    app.dependency_overrides.pop(get_current_user, None)
+
+
+def test_execute_stream_forwards_only_whitelisted_parameters(authed, monkeypatch):
+    agent_endpoints, _ = authed
+    seen = {}
+
+    async def fake_stream(task, **kwargs):
+        seen.update(kwargs)
+        yield "done", {"task": task}
+
+    monkeypatch.setattr(agent_endpoints.orchestrator, "stream", fake_stream)
+    resp = client.post(
+        "/api/v1/agents/execute/stream",
+        headers=BEARER,
+        json={
+            "agent_id": "orchestrator",
+            "task": "Plan a day out",
+            "parameters": {
+                "location": "Lisbon",
+                "progress": "x",
+                "map_reduce": True,
+                "pipelined": True,
+            },
+        },
+    )
+
+    assert resp.status_code == 200
+    assert "event: done" in resp.text
+    assert seen == {"location": "Lisbon"}
+
+
+def test_writer_stream_reports_fallback_as_error_without_caching(authed, monkeypatch):
+    agent_endpoints, cache = authed
+
+    async def unavailable(chain_of_thought, **kwargs):
+        yield f"{agent_endpoints.WRITER_FALLBACK_PREFIX} Generated content for: {kwargs['prompt']}"
+
+    monkeypatch.setattr(agent_endpoints.writer, "stream", unavailable)
+    resp = client.post("/api/v1/agents/writer/stream", headers=BEARER, json={"prompt": "Hello"})
+
+    assert resp.status_code == 200
+    assert "event: error" in resp.text and "event: done" not in resp.text
+    assert cache.entries == {}
+
+
+def test_writer_document_is_streamed_into_the_chunker(authed, monkeypatch):
+    agent_endpoints, cache = authed
+    received = {}
+
+    async def fake_act(chain_of_thought, **kwargs):
+        received["text"] = "".join([piece async for piece in kwargs["document"]])
+        return "summary"
+
+    monkeypatch.setattr(agent_endpoints.writer, "act", fake_act)
+    document = "".join(f"line {n}: ok\n" for n in range(1000))
+    resp = client.post(
+        "/api/v1/agents/writer/document",
+        params={"prompt": "Summarize"},
+        headers={**BEARER, "Content-Type": "text/plain"},
+        content=(
+            document[start : start + 4096].encode() for start in range(0, len(document), 4096)
+        ),
+    )
+
+    assert resp.status_code == 200
+    assert resp.json()["result"] == "summary"
+    assert received["text"] == document
+    assert cache.entries == {}
+
+
+def test_planner_batch_rejects_too_many_tasks(authed, monkeypatch):
+    agent_endpoints, _ = authed
+    monkeypatch.setattr(agent_endpoints.settings, "PLANNER_BATCH_MAX_TASKS", 3)
+
+    resp = client.post(
+        "/api/v1/agents/planner/batch", headers=BEARER, json={"tasks": ["a", "b", "c", "d"]}
+    )
+
+    assert resp.status_code == 422
@@ -0,0 +1,85 @@
+import pytest
+
+from src.agents.intent import GENERAL, WEATHER, WRITING, classify_intent, resolve_intent
+
+
+@pytest.mark.parametrize(
+    "task, location",
+    [
+        ("What's the weather in Lisbon today?", "Lisbon"),
+        ("Will it rain in New York Tomorrow", "New York"),
+        ("Is it going to be sunny in Porto on Saturday?", "Porto"),
+        ("forecast for San Francisco", "San Francisco"),
+        ("weather in paris", "paris"),
+    ],
+)
+def test_weather_questions_route_to_weather(task, location):
+    intent = classify_intent(task)
+    assert intent.kind == WEATHER
+    assert intent.location == location
+
+
+@pytest.mark.parametrize(
+    "task",
+    [
+        "Write a warm thank-you note for my colleague in Berlin",
+        "Write a short poem about rain in Seattle",
+        "Draft an email to the sales team in Madrid about cold calling",
+    ],
+)
+def test_writing_requests_mentioning_weather_words_and_places_stay_writing(task):
+    assert classify_intent(task).kind == WRITING
+
+
+@pytest.mark.parametrize(
+    "task",
+    [
+        "What is the hot topic in AI right now?",
+        "Is it cold at Night?",
+        "Plan a rainy day in London",
+        "forecast revenue for Q3 in Europe",
+        "Explain weather patterns in Asia",
+        "Compare weather in Paris and London",
+        "What's the weather in Paris and London?",
+    ],
+)
+def test_non_weather_questions_stay_general(task):
+    assert classify_intent(task).kind == GENERAL
+
+
+async def geocode(location):
+    known = {"lisbon", "paris", "new york"}
+    return {"name": location} if location.lower() in known else None
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "task",
+    [
+        "What is the forecast for Apple stock in May?",
+        "forecast revenue for Q3 in Europe",
+        "Explain weather patterns in Asia",
+        "Compare weather in Paris and London",
+        "weather in Atlantis",
+    ],
+)
+async def test_weather_routing_needs_a_place_that_geocodes(task):
+    assert (await resolve_intent(task, None, geocode)).kind == GENERAL
+
+
+@pytest.mark.asyncio
+async def test_resolved_weather_question_keeps_its_location():
+    intent = await resolve_intent("weather in paris", None, geocode)
+    assert intent.kind == WEATHER and intent.location == "paris"
+
+
+@pytest.mark.asyncio
+async def test_geocoding_errors_fall_back_to_general():
+    async def failing(location):
+        raise OSError("network down")
+
+    assert (await resolve_intent("weather in paris", None, failing)).kind == GENERAL
+
+
+def test_given_location_is_used_for_weather_questions():
+    assert classify_intent("Do I need an umbrella today?", location="Oslo").location == "Oslo"
@@ -0,0 +1,673 @@
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from src.agents.orchestrator import OrchestratorAgent
+from src.agents.planner import PlannerAgent
+from src.agents.specialized import WriterAgent
+from src.config.settings import settings
+from src.tools.llm.autotune import MaxTokensTuner
+from src.tools.llm.circuit_breaker import CircuitBreaker, CircuitState
+from src.tools.llm.fake import FakeLLMProvider
+from src.tools.llm.gemini_client import GeminiClient
+from src.tools.llm.hedging import HedgeBudget, Hedger, LatencyTracker
+from src.tools.llm.key_pool import ApiKeyPool
+from src.tools.llm.limiter import AdaptiveConcurrencyLimiter
+from src.tools.llm.pool import LLMCallPool
+from src.tools.llm.router import ModelRouter
+from src.tools.llm.response_cache import ResponseCache, get_llm_response_cache
+from src.tools.llm.singleflight import SingleFlight
+from src.tools.llm.tokens import PromptSection, count_tokens, fit_sections, response_usage
+from src.utils.cassette import Cassette
+from src.utils.exceptions import CassetteMissError, CircuitOpenError
+
+
+def make_client(generate, **kwargs) -> GeminiClient:
+    """GeminiClient whose SDK model is replaced by ``generate``."""
+    client = GeminiClient(
+        api_key="test-key", pool=LLMCallPool(max_concurrency=8, name="test"), **kwargs
+    )
+    client.model = SimpleNamespace(generate_content=generate)
+    return client
+
+
+def fake_response(text: str) -> SimpleNamespace:
+    return SimpleNamespace(text=text, candidates=[])
+
+
+@pytest.mark.asyncio
+async def test_call_pool_caps_in_flight_calls():
+    pool = LLMCallPool(max_concurrency=2, name="test")
+    active = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def blocking_call(value: int) -> int:
+        nonlocal active, peak
+        with lock:
+            active += 1
+            peak = max(peak, active)
+        time.sleep(0.05)
+        with lock:
+            active -= 1
+        return value * 2
+
+    results = await asyncio.gather(*(pool.run(blocking_call, i) for i in range(6)))
+    pool.shutdown()
+    assert results == [0, 2, 4, 6, 8, 10]
+    assert peak == 2
+    assert pool.stats()["in_flight"] == 0
+
+
+@pytest.mark.asyncio
+async def test_call_pool_does_not_block_event_loop():
+    pool = LLMCallPool(max_concurrency=1, name="test")
+    call = asyncio.ensure_future(pool.run(time.sleep, 0.2))
+    start = time.perf_counter()
+    await asyncio.sleep(0.01)
+    assert time.perf_counter() - start < 0.1
+    await call
+    pool.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_call_pool_stream_yields_items_in_order():
+    pool = LLMCallPool(max_concurrency=1, name="test")
+
+    def produce(n: int):
+        for i in range(n):
+            time.sleep(0.01)
+            yield i
+
+    items = [item async for item in pool.stream(produce, 4)]
+    await asyncio.sleep(0.05)
+    pool.shutdown()
+    assert items == [0, 1, 2, 3]
+    assert pool.stats()["in_flight"] == 0
+
+
+@pytest.mark.asyncio
+async def test_call_pool_stream_propagates_errors():
+    pool = LLMCallPool(max_concurrency=1, name="test")
+
+    def produce():
+        yield "partial"
+        raise RuntimeError("boom")
+
+    items = []
+    with pytest.raises(RuntimeError):
+        async for item in pool.stream(produce):
+            items.append(item)
+    pool.shutdown()
+    assert items == ["partial"]
+
+
+@pytest.mark.asyncio
+async def test_adaptive_limiter_backs_off_on_throttle_and_recovers():
+    limiter = AdaptiveConcurrencyLimiter(min_limit=1, max_limit=20, initial_limit=8, name="test")
+    await limiter.acquire()
+    limiter.release(error=RuntimeError("429 Resource has been exhausted"))
+    assert limiter.limit == 4
+    assert limiter.throttle_events == 1
+
+    for _ in range(40):
+        await limiter.acquire()
+        limiter.release(latency=0.1)
+    assert limiter.limit > 4
+
+
+@pytest.mark.asyncio
+async def test_adaptive_limiter_compares_latency_within_each_call_kind():
+    limiter = AdaptiveConcurrencyLimiter(
+        min_limit=1, max_limit=20, initial_limit=20, cooldown=0.0, name="test"
+    )
+    for _ in range(20):
+        for key, latency in ((("flash", "planner"), 0.2), (("flash", "writer"), 3.0)):
+            await limiter.acquire()
+            limiter.release(latency=latency, latency_key=key)
+    assert limiter.limit == 20
+
+    await limiter.acquire()
+    limiter.release(latency=9.0, latency_key=("flash", "writer"))
+    assert limiter.limit == 18
+
+
+@pytest.mark.asyncio
+async def test_adaptive_limiter_queues_callers_above_limit():
+    limiter = AdaptiveConcurrencyLimiter(min_limit=1, max_limit=1, name="test")
+    await limiter.acquire()
+    waiter = asyncio.ensure_future(limiter.acquire())
+    await asyncio.sleep(0)
+    assert limiter.waiting == 1 and not waiter.done()
+    limiter.release(latency=0.1)
+    await waiter
+    assert limiter.in_flight == 1
+    limiter.release(latency=0.1)
+
+
+@pytest.mark.asyncio
+async def test_singleflight_shares_one_call():
+    flight = SingleFlight(name="test")
+    calls = 0
+
+    async def upstream():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.02)
+        return {"text": "shared"}
+
+    results = await asyncio.gather(*(flight.do("key", upstream) for _ in range(5)))
+    assert calls == 1
+    assert all(result == {"text": "shared"} for result in results)
+    assert flight.stats() == {"in_flight": 0, "leaders": 1, "merged": 4}
+
+
+@pytest.mark.asyncio
+async def test_generate_content_coalesces_identical_requests():
+    calls = 0
+
+    def generate(prompt, **kwargs):
+        nonlocal calls
+        calls += 1
+        time.sleep(0.05)
+        return fake_response(f"answer to {prompt}")
+
+    client = make_client(generate)
+    results = await asyncio.gather(
+        client.generate_content("same", temperature=0.7),
+        client.generate_content("same", temperature=0.7),
+        client.generate_content("other", temperature=0.7),
+    )
+    client.pool.shutdown()
+    assert calls == 2
+    assert [r["text"] for r in results] == ["answer to same", "answer to same", "answer to other"]
+
+
+def test_response_cache_only_accepts_low_temperature():
+    cache = ResponseCache(maxsize=2, ttl=60, max_temperature=0.3)
+    assert cache.cacheable({"temperature": 0.25})
+    assert not cache.cacheable({"temperature": 0.7})
+
+
+def test_response_cache_evicts_least_recently_used():
+    cache = ResponseCache(maxsize=2, ttl=60, max_temperature=0.3)
+    cache.set("a", {"text": "A"})
+    cache.set("b", {"text": "B"})
+    assert cache.get("a") == {"text": "A"}
+    cache.set("c", {"text": "C"})
+    assert cache.get("b") is None
+    assert cache.get("a") == {"text": "A"}
+    cache.set("empty", {"text": ""})
+    assert cache.get("empty") is None
+
+
+@pytest.mark.asyncio
+async def test_generate_content_serves_repeated_low_temperature_calls_from_cache():
+    get_llm_response_cache().clear()
+    calls = 0
+
+    def generate(prompt, **kwargs):
+        nonlocal calls
+        calls += 1
+        return fake_response("plan")
+
+    client = make_client(generate)
+    first = await client.generate_content("plan this", temperature=0.25, max_tokens=600)
+    second = await client.generate_content("plan this", temperature=0.25, max_tokens=600)
+    await client.generate_content("plan this", temperature=0.9, max_tokens=600)
+    client.pool.shutdown()
+    assert calls == 2
+    assert second["text"] == first["text"] == "plan"
+    assert second["cached"] is True and "cached" not in first
+
+
+def test_models_are_memoized_per_system_instruction():
+    client = GeminiClient(api_key="test-key", pool=LLMCallPool(max_concurrency=1, name="test"))
+    planner_model = client._get_model("You are a planner.")
+    assert client._get_model("You are a planner.") is planner_model
+    assert client._get_model("You are a writer.") is not planner_model
+    assert client._get_model(None) is client.model
+    assert planner_model._system_instruction is not None
+    client.pool.shutdown()
+
+
+def test_circuit_breaker_opens_and_recovers_after_probes():
+    breaker = CircuitBreaker(failure_threshold=2, recovery_timeout=0.0, probe_count=2, name="test")
+    for _ in range(2):
+        breaker.acquire()
+        breaker.record_failure(RuntimeError("unavailable"))
+    assert breaker.state is CircuitState.OPEN
+
+    breaker.recovery_timeout = 60.0
+    with pytest.raises(CircuitOpenError):
+        breaker.acquire()
+
+    breaker.recovery_timeout = 0.0
+    breaker.acquire()
+    breaker.acquire()
+    assert breaker.state is CircuitState.HALF_OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.acquire()
+    breaker.record_success()
+    breaker.record_success()
+    assert breaker.state is CircuitState.CLOSED
+
+
+@pytest.mark.asyncio
+async def test_open_circuit_fails_fast_without_retries():
+    calls = 0
+
+    def generate(prompt, **kwargs):
+        nonlocal calls
+        calls += 1
+        return fake_response("never")
+
+    breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=60.0, name="test")
+    breaker.acquire()
+    breaker.record_failure(RuntimeError("unavailable"))
+    client = make_client(generate, breaker=breaker)
+    start = time.perf_counter()
+    with pytest.raises(CircuitOpenError):
+        await client.generate_content("hello", temperature=0.7)
+    client.pool.shutdown()
+    assert calls == 0
+    assert time.perf_counter() - start < 0.5
+
+
+def test_hedge_budget_caps_extra_calls():
+    budget = HedgeBudget(ratio=0.05)
+    for _ in range(40):
+        budget.record_call()
+    assert budget.try_spend() and budget.try_spend()
+    assert not budget.try_spend()
+
+
+@pytest.mark.asyncio
+async def test_hedger_fires_duplicate_for_slow_call_and_cancels_loser():
+    tracker = LatencyTracker(min_samples=3)
+    for _ in range(5):
+        tracker.record(("model", "planner"), 0.01)
+    budget = HedgeBudget(ratio=1.0)
+    hedger = Hedger(tracker=tracker, budget=budget, percentile=0.9)
+
+    attempts = 0
+    cancelled = asyncio.Event()
+
+    async def call():
+        nonlocal attempts
+        attempts += 1
+        if attempts == 1:
+            try:
+                await asyncio.sleep(5)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+            return "slow"
+        return "fast"
+
+    start = time.perf_counter()
+    assert await hedger.run(("model", "planner"), call) == "fast"
+    assert time.perf_counter() - start < 1
+    await asyncio.wait_for(cancelled.wait(), timeout=1)
+    assert budget.hedges == 1
+
+
+@pytest.mark.asyncio
+async def test_hedger_waits_for_primary_without_latency_history():
+    hedger = Hedger(
+        tracker=LatencyTracker(min_samples=3), budget=HedgeBudget(ratio=1.0), percentile=0.9
+    )
+
+    async def call():
+        await asyncio.sleep(0.01)
+        return "only"
+
+    assert await hedger.run(("model", "writer"), call) == "only"
+    assert hedger.budget.hedges == 0
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("samples", [0, 5])
+async def test_cancelling_a_hedged_caller_before_the_hedge_cancels_the_primary(samples):
+    tracker = LatencyTracker(min_samples=3)
+    for _ in range(samples):
+        tracker.record(("model", "planner"), 1.0)
+    hedger = Hedger(tracker=tracker, budget=HedgeBudget(ratio=1.0), percentile=0.9)
+    outcome = {"cancelled": 0, "finished": 0}
+
+    async def call():
+        try:
+            await asyncio.sleep(0.2)
+        except asyncio.CancelledError:
+            outcome["cancelled"] += 1
+            raise
+        outcome["finished"] += 1
+        return "late"
+
+    caller = asyncio.ensure_future(hedger.run(("model", "planner"), call))
+    await asyncio.sleep(0.05)
+    caller.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await caller
+    await asyncio.sleep(0.3)
+    assert outcome == {"cancelled": 1, "finished": 0}
+
+
+class RecordingClient:
+    def __init__(self, model, reply):
+        self.model = model
+        self.reply = reply
+        self.calls = []
+
+    async def generate_content(self, prompt, **kwargs):
+        self.calls.append(kwargs.get("stage"))
+        return {
+            "text": self.reply,
+            "model": self.model,
+            "usage": {"prompt_tokens": 3, "completion_tokens": 5},
+        }
+
+
+@pytest.mark.asyncio
+async def test_router_sends_stages_to_tiers_and_escalates_empty_answers():
+    clients = {
+        "lite": RecordingClient("lite", ""),
+        "full": RecordingClient("full", "full answer"),
+    }
+    router = ModelRouter(
+        stage_models={"planner": "lite"},
+        default_model="full",
+        escalation_model="full",
+        client_factory=clients.__getitem__,
+    )
+
+    synthesis = await router.generate_content("blend", stage="synthesis")
+    assert synthesis["model"] == "full" and "escalated_from" not in synthesis
+
+    plan = await router.generate_content("plan", stage="planner")
+    assert plan["text"] == "full answer"
+    assert plan["escalated_from"] == "lite"
+    assert clients["lite"].calls == ["planner"]
+    assert clients["full"].calls == ["synthesis", "planner"]
+
+
+@pytest.mark.asyncio
+async def test_cancelled_call_holds_its_slot_until_the_thread_returns():
+    pool = LLMCallPool(max_concurrency=2, name="test")
+    finished = []
+    call = asyncio.ensure_future(pool.run(time.sleep, 0.2, on_done=finished.append))
+    await asyncio.sleep(0.05)
+
+    call.cancel()
+    await asyncio.sleep(0.01)
+    # The caller is gone but the SDK thread is still running
+    assert pool.in_flight == 1 and finished == []
+
+    await asyncio.sleep(0.25)
+    pool.shutdown()
+    assert pool.in_flight == 0 and finished == [None]
+
+
+@pytest.mark.asyncio
+async def test_stream_consumer_stopping_early_holds_the_key_until_the_thread_returns():
+    pool = LLMCallPool(max_concurrency=2, name="test")
+    finished = []
+
+    def produce():
+        yield "first"
+        time.sleep(0.2)
+        yield "second"
+
+    stream = pool.stream(produce, on_done=finished.append)
+    assert await stream.__anext__() == "first"
+    await stream.aclose()
+    await asyncio.sleep(0.05)
+    # The consumer is gone but the producer thread is still mid-stream
+    assert pool.in_flight == 1 and finished == []
+
+    await asyncio.sleep(0.25)
+    pool.shutdown()
+    assert pool.in_flight == 0 and finished == [None]
+
+
+def test_key_pool_prefers_least_loaded_and_quarantines_throttled_keys():
+    pool = ApiKeyPool(["k0", "k1", "k2"], quarantine_seconds=60)
+    first, second, third = pool.acquire(), pool.acquire(), pool.acquire()
+    assert {first.label, second.label, third.label} == {"key-0", "key-1", "key-2"}
+
+    pool.release(first, error=RuntimeError("429 Too Many Requests"))
+    pool.release(second)
+    pool.release(third)
+    picks = set()
+    for _ in range(4):
+        state = pool.acquire()
+        picks.add(state.label)
+        pool.release(state)
+    assert "key-0" not in picks
+
+
+def test_key_pool_rate_window_stays_bounded_under_round_robin(monkeypatch):
+    clock = [0.0]
+    monkeypatch.setattr(time, "monotonic", lambda: clock[0])
+    pool = ApiKeyPool(["k0", "k1"], strategy="round_robin")
+    for _ in range(1000):
+        clock[0] += 1.0
+        pool.release(pool.acquire())
+    # One call per second, alternating keys: ~30 per key in the last minute
+    assert all(len(state.recent) <= 31 for state in pool.keys)
+
+
+def test_secondary_keys_get_their_own_service_client():
+    keys = ApiKeyPool(["primary-key", "secondary-key"])
+    client = GeminiClient(pool=LLMCallPool(max_concurrency=1, name="test"), keys=keys)
+    assert client._get_model(None, keys.keys[0]) is client.model
+    secondary = client._get_model(None, keys.keys[1])
+    assert secondary is not client.model
+    assert secondary._client is client._service_clients["key-1"]
+    assert client._get_model(None, keys.keys[1]) is secondary
+    client.pool.shutdown()
+
+
+class FakeChat:
+    def __init__(self, history):
+        self.history = list(history)
+        self.sent = []
+
+    def send_message(self, message, **kwargs):
+        self.sent.append(message)
+        self.history += [{"role": "user", "parts": [message]}, {"role": "model", "parts": ["ok"]}]
+        return fake_response("ok")
+
+
+@pytest.mark.asyncio
+async def test_chat_reuses_pooled_session_per_conversation():
+    chats = []
+
+    def start_chat(history):
+        chats.append(FakeChat(history))
+        return chats[-1]
+
+    client = make_client(None)
+    client.model = SimpleNamespace(start_chat=start_chat)
+
+    await client.chat([{"role": "user", "content": "hi"}], conversation_id="c1")
+    await client.chat([{"role": "user", "content": "again"}], conversation_id="c1")
+    full = [
+        {"role": "user", "content": "hi"},
+        {"role": "assistant", "content": "ok"},
+        {"role": "user", "content": "again"},
+        {"role": "assistant", "content": "ok"},
+        {"role": "user", "content": "third"},
+    ]
+    await client.chat(full, conversation_id="c1")
+    await client.chat([{"role": "user", "content": "other"}], conversation_id="c2")
+
+    assert len(chats) == 2
+    assert chats[0].sent == ["hi", "again", "third"]
+    assert client.chat_sessions.stats()["reused"] == 2
+    assert client.chat_sessions.stats()["created"] == 2
+
+
+@pytest.mark.asyncio
+async def test_fake_provider_is_deterministic_and_honors_max_tokens():
+    provider = FakeLLMProvider(
+        latency_ms=1, latency_distribution="fixed", completion_tokens=30, seed=1
+    )
+
+    first = await provider.generate_content("plan a trip", stage="planner")
+    again = await provider.generate_content("plan a trip", stage="planner")
+    capped = await provider.generate_content("plan a trip", max_tokens=5, stage="planner")
+    chunks = [chunk async for chunk in provider.stream_content("plan a trip", stage="planner")]
+
+    assert first["text"] == again["text"] and first["text"].startswith("1. ")
+    assert first["usage"]["completion_tokens"] == 30
+    assert capped["finish_reason"] == "MAX_TOKENS" and capped["usage"]["completion_tokens"] == 5
+    assert "".join(chunks) == first["text"]
+
+
+@pytest.mark.asyncio
+async def test_fake_provider_injects_errors():
+    provider = FakeLLMProvider(latency_ms=0, latency_distribution="fixed", error_rate=1.0)
+    with pytest.raises(Exception, match="injected failure"):
+        await provider.generate_content("hello")
+
+
+@pytest.mark.asyncio
+async def test_orchestrator_runs_offline_on_fake_provider():
+    provider = FakeLLMProvider(latency_ms=1, latency_distribution="fixed", completion_tokens=24)
+    planner = PlannerAgent(
+        name="planner", role="Task decomposition", capabilities=["plan"], llm=provider
+    )
+    writer = WriterAgent(
+        name="writer", role="Content Generator", capabilities=["write"], llm=provider
+    )
+    orchestrator = OrchestratorAgent(planner=planner, writer=writer, llm=provider)
+
+    result = await orchestrator.execute("Plan a team offsite")
+
+    assert result["status"] == "completed"
+    assert result["plan"]["steps"] and result["writer"] and result["synthesis"]
+    assert provider.calls == 3
+
+
+def test_response_usage_reads_usage_metadata():
+    response = SimpleNamespace(
+        text="hi", usage_metadata=SimpleNamespace(prompt_token_count=12, candidates_token_count=3)
+    )
+    assert response_usage(response, "prompt", "hi") == {"prompt_tokens": 12, "completion_tokens": 3}
+    assert (
+        response_usage(fake_response("hello there"), "a prompt", "hello there")["prompt_tokens"] > 0
+    )
+
+
+def test_fit_sections_trims_lowest_priority_first():
+    sections = [
+        PromptSection("task", "Plan a trip", priority=None),
+        PromptSection("writer", "word " * 300, priority=2, min_tokens=50),
+        PromptSection("weather", "sunny " * 300, priority=0, min_tokens=20),
+    ]
+    total = sum(section.tokens for section in sections)
+
+    untouched = fit_sections(sections, budget=total)
+    trimmed = fit_sections(sections, budget=total - 200)
+    squeezed = fit_sections(sections, budget=200)
+
+    assert untouched["weather"] == sections[2].text
+    assert trimmed["writer"] == sections[1].text
+    assert count_tokens(trimmed["weather"]) < count_tokens(sections[2].text)
+    assert squeezed["task"] == "Plan a trip"
+    assert count_tokens(squeezed["writer"]) < 300 and count_tokens(squeezed["weather"]) <= 25
+
+
+def test_max_tokens_tuner_uses_p95_with_headroom_after_warmup():
+    tuner = MaxTokensTuner(percentile=0.95, headroom=1.25, min_samples=20, floor=64, ceiling=1000)
+    for length in range(10, 30):
+        tuner.record("planner", length * 10)
+    assert tuner.max_tokens("writer", 400) == 400
+    assert tuner.max_tokens("planner", 600) == 363
+
+    for _ in range(500):
+        tuner.record_response(
+            "planner", {"usage": {"completion_tokens": 900}, "finish_reason": "MAX_TOKENS"}
+        )
+    assert tuner.max_tokens("planner", 600) == 1000
+
+
+def test_max_tokens_tuner_records_truncated_answers_at_the_cap_used():
+    tuner = MaxTokensTuner(percentile=0.95, headroom=1.25, min_samples=20, floor=64, ceiling=4000)
+    # Thinking used most of the 400-token budget; only 120 visible tokens came back
+    truncated = {"usage": {"completion_tokens": 120}, "finish_reason": "MAX_TOKENS"}
+    for _ in range(20):
+        tuner.record_response("writer", truncated, max_tokens=400)
+    assert tuner.max_tokens("writer", 400) == 500
+
+    for _ in range(20):
+        tuner.record_response(
+            "synthesis",
+            {"usage": {"completion_tokens": 200, "thoughts_tokens": 300}, "finish_reason": "STOP"},
+        )
+    assert tuner.max_tokens("synthesis", 700) == 625
+
+
+@pytest.mark.asyncio
+async def test_cassette_records_then_replays_without_upstream(tmp_path):
+    path = tmp_path / "upstream.jsonl"
+    calls = 0
+
+    async def upstream():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return {"text": "recorded"}
+
+    async def chunks():
+        for chunk in ("a", "b"):
+            yield chunk
+
+    recorder = Cassette(str(path), mode="record")
+    assert await recorder.call("gemini", "k1", upstream) == {"text": "recorded"}
+    assert [c async for c in recorder.stream("gemini_stream", "k2", chunks)] == ["a", "b"]
+
+    replay = Cassette(str(path), mode="replay", replay_latency="none")
+    start = time.perf_counter()
+    assert await replay.call("gemini", "k1", upstream) == {"text": "recorded"}
+    assert time.perf_counter() - start < 0.05
+    assert [c async for c in replay.stream("gemini_stream", "k2", chunks)] == ["a", "b"]
+    assert calls == 1
+
+    timed = Cassette(str(path), mode="replay")
+    start = time.perf_counter()
+    await timed.call("gemini", "k1", upstream)
+    assert time.perf_counter() - start >= 0.04
+    with pytest.raises(CassetteMissError):
+        await timed.call("gemini", "unknown", upstream)
+
+
+@pytest.mark.asyncio
+async def test_cassette_replay_needs_no_api_key(tmp_path, monkeypatch):
+    from src.tools.llm import key_pool
+    from src.utils import cassette as cassette_module
+
+    path = tmp_path / "upstream.jsonl"
+    monkeypatch.setattr(settings, "CASSETTE_PATH", str(path))
+    monkeypatch.setattr(settings, "CASSETTE_REPLAY_LATENCY", "none")
+    monkeypatch.setattr(settings, "CASSETTE_MODE", "record")
+    monkeypatch.setattr(cassette_module, "_cassette", None)
+    recorder = make_client(lambda prompt, **kwargs: fake_response(f"answer to {prompt}"))
+    await recorder.generate_content("offline?", temperature=0.7)
+    recorder.pool.shutdown()
+
+    monkeypatch.setattr(settings, "CASSETTE_MODE", "replay")
+    monkeypatch.setattr(cassette_module, "_cassette", None)
+    monkeypatch.setattr(settings, "GEMINI_API_KEY", None)
+    monkeypatch.setattr(settings, "GEMINI_API_KEYS", [])
+    monkeypatch.setattr(key_pool, "_api_key_pool", None)
+    client = GeminiClient(pool=LLMCallPool(max_concurrency=2, name="test"))
+
+    response = await client.generate_content("offline?", temperature=0.7)
+    client.pool.shutdown()
+    assert client.keys is None
+    assert response["text"] == "answer to offline?"
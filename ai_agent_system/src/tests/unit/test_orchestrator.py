@@ -0,0 +1,375 @@
+import asyncio
+import time
+
+import pytest
+
+from src.agents.base.agent import BaseAgent
+from src.agents.orchestrator import OrchestratorAgent
+from src.agents.planner import PlannerAgent
+from src.agents.specialized import WriterAgent
+from src.config.settings import settings
+from src.tools.llm.fake import FakeLLMProvider
+
+
+class SlowAgent(BaseAgent):
+    def __init__(self, name: str, delay: float, result):
+        super().__init__(name=name, role="stub", capabilities=[name])
+        self.delay = delay
+        self.result = result
+        self.calls = 0
+
+    async def act(self, chain_of_thought, **kwargs):  # type: ignore[override]
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return self.result
+
+
+class WeatherStub(SlowAgent):
+    known = {"lisbon", "porto"}
+
+    async def geocode(self, location):
+        return {"name": location} if location.lower() in self.known else None
+
+
+def make_orchestrator(writer_delay=0.2, weather_delay=0.2):
+    provider = FakeLLMProvider(latency_ms=0, latency_distribution="fixed", completion_tokens=12)
+    planner = PlannerAgent(
+        name="planner", role="Task decomposition", capabilities=["plan"], llm=provider
+    )
+    writer = SlowAgent("writer", writer_delay, "written")
+    weather = WeatherStub("weather", weather_delay, {"location": "Lisbon", "temperature_c": 21})
+    return (
+        OrchestratorAgent(planner=planner, writer=writer, weather=weather, llm=provider),
+        writer,
+        weather,
+    )
+
+
+@pytest.mark.asyncio
+async def test_writer_and_weather_run_concurrently():
+    orchestrator, _, _ = make_orchestrator()
+    plan = await orchestrator.think("Plan a day out")
+
+    start = time.perf_counter()
+    result = await orchestrator.act(plan, task="Plan a day out", location="Lisbon")
+
+    assert time.perf_counter() - start < 0.35
+    assert result["writer"] == "written"
+    assert result["weather"]["location"] == "Lisbon"
+    assert set(result) >= {
+        "status",
+        "task",
+        "plan",
+        "writer",
+        "weather",
+        "synthesis",
+        "coordination_summary",
+    }
+
+
+@pytest.mark.asyncio
+async def test_stage_timeout_falls_back_without_failing_the_request(monkeypatch):
+    monkeypatch.setitem(settings.ORCHESTRATOR_STAGE_TIMEOUTS, "weather", 0.05)
+    orchestrator, _, _ = make_orchestrator(writer_delay=0.0, weather_delay=1.0)
+    plan = await orchestrator.think("Plan a day out")
+
+    result = await orchestrator.act(plan, task="Plan a day out", city="Lisbon")
+
+    assert result["writer"] == "written"
+    assert result["weather"]["error"] == "Weather lookup timed out"
+    assert result["synthesis"]
+
+
+@pytest.mark.asyncio
+async def test_weather_prefetch_overlaps_planning():
+    orchestrator, _, weather = make_orchestrator(writer_delay=0.0, weather_delay=0.2)
+    orchestrator.planner._llm = FakeLLMProvider(
+        latency_ms=200, latency_distribution="fixed", completion_tokens=12
+    )
+
+    start = time.perf_counter()
+    plan = await orchestrator.think("Plan a day out", location="Lisbon")
+    result = await orchestrator.act(plan, task="Plan a day out", location="Lisbon")
+
+    assert time.perf_counter() - start < 0.35
+    assert weather.calls == 1
+    assert result["weather"]["location"] == "Lisbon"
+    assert "_prefetched" not in result["plan"]
+
+
+@pytest.mark.asyncio
+async def test_weather_prefetched_for_another_location_is_fetched_again():
+    orchestrator, _, weather = make_orchestrator(writer_delay=0.0, weather_delay=5.0)
+    plan = await orchestrator.think("Plan a day out", location="Lisbon")
+    prefetch = plan["_prefetched"]["weather"].task
+    weather.delay = 0.0
+    weather.result = {"location": "Porto", "temperature_c": 18}
+
+    result = await orchestrator.act(plan, task="Plan a day out", location="Porto")
+    await asyncio.sleep(0)
+
+    assert prefetch.cancelled()
+    assert weather.calls == 2
+    assert result["weather"]["location"] == "Porto"
+
+
+@pytest.mark.asyncio
+async def test_unused_weather_prefetch_is_cancelled():
+    orchestrator, _, _ = make_orchestrator(writer_delay=0.0, weather_delay=5.0)
+    plan = await orchestrator.think("Plan a day out", city="Lisbon")
+    prefetch = plan["_prefetched"]["weather"].task
+
+    result = await orchestrator.act(plan, task="Plan a day out")
+    await asyncio.sleep(0)
+
+    assert result["weather"] is None
+    assert prefetch.cancelled()
+
+
+class StreamingPlannerLLM(FakeLLMProvider):
+    """Streams one plan step per chunk, a step every 50ms."""
+
+    async def stream_content(
+        self, prompt, temperature=0.7, max_tokens=None, *, stage=None, **kwargs
+    ):
+        for index in range(6):
+            await asyncio.sleep(0.05)
+            yield f"{index + 1}. step {index + 1}\n"
+
+
+@pytest.mark.asyncio
+async def test_pipelined_mode_starts_writer_before_plan_finishes():
+    orchestrator, writer, _ = make_orchestrator(writer_delay=0.2)
+    orchestrator.planner._llm = StreamingPlannerLLM(latency_ms=0, latency_distribution="fixed")
+
+    start = time.perf_counter()
+    plan = await orchestrator.think("Plan a day out", pipelined=True)
+    result = await orchestrator.act(plan, task="Plan a day out")
+
+    # Writer starts after 3 of 6 steps (150ms) and overlaps the remaining 150ms
+    assert time.perf_counter() - start < 0.45
+    assert writer.calls == 1
+    assert result["plan"]["steps"] == [f"{i}. step {i}" for i in range(1, 7)]
+    assert result["writer"] == "written"
+
+
+@pytest.mark.asyncio
+async def test_stream_emits_typed_events_in_stage_order():
+    orchestrator, _, _ = make_orchestrator(writer_delay=0.05, weather_delay=0.0)
+
+    events = [
+        (event, data)
+        async for event, data in orchestrator.stream("Plan a day out", location="Lisbon")
+    ]
+    names = [event for event, _ in events]
+
+    assert names[0] == "plan" and "_prefetched" not in events[0][1]
+    assert names.index("weather") < names.index("writer") < names.index("synthesis")
+    assert names[-1] == "done"
+    synthesis = "".join(data["text"] for event, data in events if event == "synthesis")
+    assert events[-1][1]["synthesis"] == synthesis
+
+
+@pytest.mark.asyncio
+async def test_stream_queue_is_bounded(monkeypatch):
+    monkeypatch.setattr(settings, "ORCHESTRATOR_EVENT_QUEUE_SIZE", 1)
+    orchestrator, _, _ = make_orchestrator(writer_delay=0.0, weather_delay=0.0)
+    orchestrator.llm.stream_chunk_tokens = 1
+
+    stream = orchestrator.stream("Plan a day out")
+    assert (await stream.__anext__())[0] == "plan"
+    await asyncio.sleep(0.05)
+    # Producer is parked on the full queue rather than buffering every chunk
+    assert await orchestrator.memory.get_recent() == []
+    await stream.aclose()
+
+    # Closing the stream stops the producer instead of leaving it parked
+    running = [getattr(task.get_coro(), "__qualname__", "") for task in asyncio.all_tasks()]
+    assert not [name for name in running if name.endswith("stream.<locals>.run")]
+
+
+@pytest.mark.asyncio
+async def test_stage_cache_recomputes_only_downstream_of_changed_input():
+    orchestrator, writer, weather = make_orchestrator(writer_delay=0.0, weather_delay=0.0)
+    provider = orchestrator.llm
+
+    await orchestrator.execute("Plan a day out", location="Lisbon")
+    calls_after_first = provider.calls
+    await orchestrator.execute("Plan a day out", location="Lisbon")
+    assert provider.calls == calls_after_first  # planner and synthesis both memoized
+
+    weather.result = {"location": "Porto", "temperature_c": 18}
+    await orchestrator.execute("Plan a day out", location="Porto")
+
+    assert provider.calls == calls_after_first + 1  # only synthesis saw a new input
+    assert writer.calls == 1
+    stats = orchestrator.stage_cache.stats()
+    assert stats["planner"]["hits"] == 2 and stats["writer"]["hits"] == 2
+    assert stats["synthesis"] == {"hits": 1, "misses": 2, "hit_rate": 1 / 3}
+
+
+class FailingSynthesisLLM(FakeLLMProvider):
+    async def generate_content(
+        self, prompt, temperature=0.7, max_tokens=None, *, stage=None, **kwargs
+    ):
+        if stage == "synthesis":
+            self.calls += 1
+            raise RuntimeError("upstream down")
+        return await super().generate_content(
+            prompt, temperature, max_tokens, stage=stage, **kwargs
+        )
+
+
+@pytest.mark.asyncio
+async def test_failed_synthesis_degrades_without_extra_upstream_calls():
+    orchestrator, _, _ = make_orchestrator(writer_delay=0.0, weather_delay=0.0)
+    provider = FailingSynthesisLLM(latency_ms=0, latency_distribution="fixed", completion_tokens=12)
+    orchestrator._llm = orchestrator.planner._llm = provider
+
+    plan = await orchestrator.think("Plan a day out")
+    calls_after_plan = provider.calls
+    result = await orchestrator.act(plan, task="Plan a day out", location="Lisbon")
+
+    assert provider.calls == calls_after_plan + 1  # the failed synthesis only; planner not re-run
+    assert result["degraded"] is True
+    assert result["intent"] == "general"
+    assert result["plan"]["steps"] == plan["steps"]
+    assert result["writer"] == "written" and result["weather"]["location"] == "Lisbon"
+    assert "written" in result["synthesis"] and "Lisbon" in result["synthesis"]
+
+
+@pytest.mark.asyncio
+async def test_weather_query_skips_planner_writer_and_llm_synthesis(monkeypatch):
+    monkeypatch.setattr(settings, "ORCHESTRATOR_INTENT_ROUTING", True)
+    orchestrator, writer, weather = make_orchestrator(writer_delay=0.0, weather_delay=0.0)
+
+    result = await orchestrator.execute("What's the weather in Lisbon today?")
+
+    assert orchestrator.llm.calls == 0
+    assert writer.calls == 0 and weather.calls == 1
+    assert result["intent"] == "weather"
+    assert result["synthesis"].startswith("Weather for Lisbon")
+    assert "21" in result["synthesis"]
+
+
+@pytest.mark.asyncio
+async def test_weather_question_about_an_unknown_place_runs_every_stage(monkeypatch):
+    monkeypatch.setattr(settings, "ORCHESTRATOR_INTENT_ROUTING", True)
+    orchestrator, writer, weather = make_orchestrator(writer_delay=0.0, weather_delay=0.0)
+
+    result = await orchestrator.execute("What is the forecast for Apple stock?")
+
+    assert result["intent"] == "general"
+    assert writer.calls == 1 and weather.calls == 0
+    assert orchestrator.llm.calls == 2  # planner and synthesis
+
+
+@pytest.mark.asyncio
+async def test_writing_task_skips_planner_and_synthesis(monkeypatch):
+    monkeypatch.setattr(settings, "ORCHESTRATOR_INTENT_ROUTING", True)
+    orchestrator, writer, _ = make_orchestrator(writer_delay=0.0, weather_delay=0.0)
+
+    result = await orchestrator.execute("Write a short thank-you note to my team")
+
+    assert orchestrator.llm.calls == 0
+    assert writer.calls == 1
+    assert result["intent"] == "writing"
+    assert result["plan"]["steps"] == []
+    assert result["synthesis"] == "written"
+
+
+@pytest.mark.asyncio
+async def test_intent_routing_is_off_by_default():
+    orchestrator, writer, _ = make_orchestrator(writer_delay=0.0, weather_delay=0.0)
+
+    result = await orchestrator.execute("Write a short thank-you note to my team")
+
+    assert result["intent"] == "general"
+    assert orchestrator.llm.calls == 2  # planner and synthesis
+
+
+@pytest.mark.asyncio
+async def test_map_reduce_expands_steps_concurrently_under_the_cap(monkeypatch):
+    monkeypatch.setattr(settings, "ORCHESTRATOR_MAP_REDUCE_CONCURRENCY", 3)
+    orchestrator, writer, _ = make_orchestrator(writer_delay=0.1, weather_delay=0.0)
+    active = peak = 0
+    act = writer.act
+
+    async def tracking_act(chain_of_thought, **kwargs):
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        try:
+            return await act(chain_of_thought, **kwargs)
+        finally:
+            active -= 1
+
+    writer.act = tracking_act
+    steps = [f"Step {n}" for n in range(1, 7)]
+    plan = {
+        "task": "Plan a day out",
+        "steps": steps,
+        "plan_details": "\n".join(steps),
+        "status": "completed",
+    }
+
+    start = time.perf_counter()
+    result = await orchestrator.act(plan, task="Plan a day out", map_reduce=True)
+
+    assert time.perf_counter() - start < 0.35  # two waves of three, not six in a row
+    assert writer.calls == 6 and peak == 3
+    assert result["writer"].index("Step 1:") < result["writer"].index("Step 6:")
+    assert result["synthesis"]
+
+
+@pytest.mark.asyncio
+async def test_map_reduce_synthesis_has_its_own_stage_budget_and_memo_keys():
+    orchestrator, _, _ = make_orchestrator(writer_delay=0.0, weather_delay=0.0)
+    calls = []
+
+    class RecordingLLM(FakeLLMProvider):
+        async def generate_content(
+            self, prompt, temperature=0.7, max_tokens=None, *, stage=None, **kwargs
+        ):
+            calls.append((stage, max_tokens, prompt))
+            return await super().generate_content(
+                prompt, temperature, max_tokens, stage=stage, **kwargs
+            )
+
+    orchestrator._llm = RecordingLLM(latency_ms=0, latency_distribution="fixed")
+    orchestrator.writer.result = "detail " * 1500  # ~2.6k tokens per step
+    steps = ["Step 1", "Step 2"]
+    plan = {"task": "Plan a day out", "steps": steps, "plan_details": "\n".join(steps)}
+
+    await orchestrator.act(plan, task="Plan a day out", map_reduce=True)
+
+    (stage, max_tokens, prompt), = calls
+    assert stage == "synthesis_map_reduce" and max_tokens == 1500
+    # Both expansions survive; the 3000-token single-pass budget would cut them
+    assert prompt.count("detail") > 2 * 1400
+    assert set(orchestrator.stage_cache.stats()) >= {"writer_step", "synthesis_map_reduce"}
+    assert "writer" not in orchestrator.stage_cache.stats()
+
+
+@pytest.mark.asyncio
+async def test_orchestrator_writer_is_tuned_as_its_own_stage():
+    orchestrator, _, _ = make_orchestrator(writer_delay=0.0, weather_delay=0.0)
+    stages = []
+
+    class StageRecordingLLM(FakeLLMProvider):
+        async def generate_content(
+            self, prompt, temperature=0.7, max_tokens=None, *, stage=None, **kwargs
+        ):
+            stages.append(stage)
+            return await super().generate_content(
+                prompt, temperature, max_tokens, stage=stage, **kwargs
+            )
+
+    provider = StageRecordingLLM(latency_ms=0, latency_distribution="fixed", completion_tokens=12)
+    orchestrator.writer = WriterAgent(
+        name="writer", role="stub", capabilities=["write"], llm=provider
+    )
+
+    await orchestrator.execute("Plan a day out")
+
+    assert "orchestrator_writer" in stages and "writer" not in stages
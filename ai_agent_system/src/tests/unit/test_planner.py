@@ -0,0 +1,122 @@
+import asyncio
+
+import pytest
+
+from src.agents.planner import FALLBACK_PLAN_DETAILS, PlannerAgent, _parse_batch_plans
+from src.utils.exceptions import CircuitOpenError
+
+
+class StubGemini:
+    def __init__(self, replies):
+        self.replies = list(replies)
+        self.prompts = []
+
+    async def generate_content(self, prompt, **kwargs):
+        self.prompts.append(prompt)
+        return {"text": self.replies.pop(0), "model": "stub", "usage": {}}
+
+
+def test_parse_batch_plans_skips_malformed_slices():
+    text = (
+        '```json\n[{"index": 0, "steps": ["1. a", "2. b"]}, '
+        '{"index": 1, "steps": "oops"}, {"index": 7, "steps": ["x"]}]\n```'
+    )
+    assert _parse_batch_plans(text, 2) == {0: ["1. a", "2. b"]}
+    assert _parse_batch_plans("not json", 2) == {}
+
+
+@pytest.mark.asyncio
+async def test_plan_batch_packs_tasks_and_falls_back_per_task():
+    stub = StubGemini(
+        [
+            '[{"index": 0, "steps": ["1. Book venue"]}, {"index": 2, "steps": ["1. Pick route"]}]',
+            "1. Write outline\n2. Draft",
+        ]
+    )
+    agent = PlannerAgent(name="planner", role="Task decomposition", capabilities=["plan"], llm=stub)
+
+    results = await agent.plan_batch(["Plan a party", "Write a report", "Plan a trip"])
+
+    assert len(stub.prompts) == 2
+    assert [r["task"] for r in results] == ["Plan a party", "Write a report", "Plan a trip"]
+    assert results[0]["steps"] == ["1. Book venue"]
+    assert results[1]["steps"] == ["1. Write outline", "2. Draft"]
+    assert all(set(r) >= {"task", "steps", "plan_details", "status"} for r in results)
+
+
+@pytest.mark.asyncio
+async def test_failed_batch_falls_back_without_a_request_per_task():
+    class Failing:
+        calls = 0
+
+        async def generate_content(self, prompt, **kwargs):
+            Failing.calls += 1
+            raise CircuitOpenError("gemini circuit is open")
+
+    agent = PlannerAgent(
+        name="planner", role="Task decomposition", capabilities=["plan"], llm=Failing()
+    )
+
+    results = await agent.plan_batch(["Plan a party", "Write a report", "Plan a trip"])
+
+    assert Failing.calls == 1
+    assert all(r["plan_details"] == FALLBACK_PLAN_DETAILS for r in results)
+    assert [r["task"] for r in results] == ["Plan a party", "Write a report", "Plan a trip"]
+
+
+@pytest.mark.asyncio
+async def test_plan_batch_runs_batches_concurrently():
+    class Slow:
+        active = peak = 0
+
+        async def generate_content(self, prompt, **kwargs):
+            Slow.active += 1
+            Slow.peak = max(Slow.peak, Slow.active)
+            await asyncio.sleep(0.05)
+            Slow.active -= 1
+            return {"text": '[{"index": 0, "steps": ["a"]}, {"index": 1, "steps": ["b"]}]'}
+
+    agent = PlannerAgent(
+        name="planner", role="Task decomposition", capabilities=["plan"], llm=Slow()
+    )
+
+    results = await agent.plan_batch([f"task {n}" for n in range(6)], batch_size=2)
+
+    assert Slow.peak == 3
+    assert [r["steps"] for r in results] == [["a"], ["b"]] * 3
+
+
+class StubStream:
+    def __init__(self, chunks, fail=False):
+        self.chunks = chunks
+        self.fail = fail
+
+    async def stream_content(self, prompt, **kwargs):
+        for chunk in self.chunks:
+            yield chunk
+        if self.fail:
+            raise RuntimeError("stream dropped")
+
+
+@pytest.mark.asyncio
+async def test_stream_steps_yields_each_completed_line():
+    agent = PlannerAgent(
+        name="planner",
+        role="Task decomposition",
+        capabilities=["plan"],
+        llm=StubStream(["1. Book ", "venue\n2. Send", " invites\n\n3. Cel", "ebrate"]),
+    )
+    assert [step async for step in agent.stream_steps("Plan a party")] == [
+        "1. Book venue",
+        "2. Send invites",
+        "3. Celebrate",
+    ]
+
+    failing = PlannerAgent(
+        name="planner",
+        role="Task decomposition",
+        capabilities=["plan"],
+        llm=StubStream([], fail=True),
+    )
+    steps = [step async for step in failing.stream_steps("Plan a party")]
+    assert steps[0] == "Analyze: Plan a party"
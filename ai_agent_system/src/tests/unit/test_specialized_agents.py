@@ -1,6 +1,16 @@
 import pytest
 
-from src.agents.specialized import WriterAgent, FlightAgent, WeatherAgent, CodeAgent
+from src.agents import weather as weather_module
+from src.agents.specialized import (
+    WRITER_FALLBACK_PREFIX,
+    WriterAgent,
+    FlightAgent,
+    WeatherAgent,
+    CodeAgent,
+)
+from src.config.settings import settings
+from src.tools.llm.fake import FakeLLMProvider
+from src.tools.llm.tokens import achunk_text, chunk_text, count_tokens
 
 
 @pytest.mark.asyncio
@@ -29,9 +39,120 @@ async def test_weather_agent():
     assert "condition" in result
 
 
+@pytest.mark.asyncio
+async def test_open_meteo_weather_agent_geocodes_each_place_once(monkeypatch):
+    urls = []
+
+    async def fetch(url):
+        urls.append(url)
+        if "geocoding" in url:
+            return {"results": [{"name": "Lisbon", "latitude": 38.7, "longitude": -9.1}]}
+        return {"current": {"temperature_2m": 21}, "daily": {}}
+
+    monkeypatch.setattr(weather_module, "_fetch_json", fetch)
+    agent = weather_module.WeatherAgent(name="weather", role="Weather", capabilities=["forecast"])
+
+    assert (await agent.geocode("Lisbon"))["name"] == "Lisbon"
+    result = await agent.act("weather", location="lisbon")
+
+    assert result["temperature_c"] == 21
+    assert sum("geocoding" in url for url in urls) == 1
+
+
 @pytest.mark.asyncio
 async def test_code_agent():
     agent = CodeAgent(name="code", role="Code Generator", capabilities=["generate", "execute"])
     result = await agent.execute("Generate code", code_task="write a function")
     assert result["task"] == "write a function"
     assert "generated_code" in result
+
+
+@pytest.mark.asyncio
+async def test_writer_agent_stream_fallback():
+    agent = WriterAgent(name="writer", role="Content Generator", capabilities=["write"])
+    chunks = [chunk async for chunk in agent.stream("Generate intro", prompt="Hello world")]
+    assert len(chunks) == 1
+    assert "Generated content for" in chunks[0]
+
+
+class CountingLLM(FakeLLMProvider):
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.stages = []
+        self.active = self.peak = 0
+
+    async def generate_content(
+        self, prompt, temperature=0.7, max_tokens=None, *, stage=None, **kwargs
+    ):
+        self.stages.append(stage)
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            return await super().generate_content(
+                prompt, temperature, max_tokens, stage=stage, **kwargs
+            )
+        finally:
+            self.active -= 1
+
+
+@pytest.mark.asyncio
+async def test_writer_reduces_long_document_hierarchically(monkeypatch):
+    monkeypatch.setattr(settings, "WRITER_REDUCE_FAN_IN", 3)
+    llm = CountingLLM(latency_ms=20, latency_distribution="fixed", completion_tokens=12)
+    agent = WriterAgent(name="writer", role="Content Generator", capabilities=["write"], llm=llm)
+    lines = (f"log line {n}: request served in {n % 97} ms\n" for n in range(200))
+
+    result = await agent.act(
+        "", prompt="Summarize the log", document=lines, chunk_tokens=150, fan_out=2
+    )
+
+    chunks = llm.stages.count("writer_chunk")
+    assert chunks > 9  # enough parts for more than one level of reduction
+    # Every reduce merges up to three results: ceil((n - 1) / 2) merges for n leaves
+    assert llm.stages.count("writer_reduce") == -(-(chunks - 1) // 2)
+    assert llm.stages[-1] == "writer_reduce"
+    assert llm.peak <= 2
+    assert result and not result.startswith(WRITER_FALLBACK_PREFIX)
+
+
+@pytest.mark.asyncio
+async def test_writer_sends_a_document_that_fits_one_chunk_as_a_plain_prompt():
+    prompts = []
+
+    class RecordingLLM(CountingLLM):
+        async def generate_content(self, prompt, *args, **kwargs):
+            prompts.append(prompt)
+            return await super().generate_content(prompt, *args, **kwargs)
+
+    llm = RecordingLLM(latency_ms=0, latency_distribution="fixed", completion_tokens=12)
+    agent = WriterAgent(name="writer", role="Content Generator", capabilities=["write"], llm=llm)
+
+    await agent.act("", prompt="Summarize the log", document="one short line\n", chunk_tokens=150)
+
+    assert llm.stages == ["writer"]
+    assert prompts == ["Summarize the log\n\none short line\n"]
+
+
+def test_chunk_text_bounds_chunks_and_keeps_all_text():
+    text = "".join(f"line {n} with a few words\n" for n in range(300)) + "x" * 900 + "-x" * 200
+
+    chunks = list(chunk_text(text, 50))
+
+    assert "".join(chunks) == text
+    assert all(count_tokens(chunk) <= 50 for chunk in chunks)
+
+
+@pytest.mark.asyncio
+async def test_achunk_text_rebuilds_lines_from_arbitrary_pieces():
+    lines = "".join(f"line {n} with a few words\n" for n in range(300))
+    text = lines + "y" * 900 + "-z" * 200 + " end"
+
+    async def body():
+        for start in range(0, len(text), 37):
+            yield text[start : start + 37]
+
+    chunks = [chunk async for chunk in achunk_text(body(), 50)]
+
+    assert "".join(chunks) == text
+    assert all(count_tokens(chunk) <= 50 for chunk in chunks)
+    assert chunks[: len(list(chunk_text(lines, 50)))] == list(chunk_text(lines, 50))
@@ -1,9 +1,37 @@
 """LLM client abstractions."""
 
 from src.tools.llm.gemini_client import GeminiClient, get_gemini_client, close_gemini_client
+from src.tools.llm.base import LLMProvider
+from src.tools.llm.circuit_breaker import CircuitBreaker, CircuitState, get_llm_circuit_breaker
+from src.tools.llm.key_pool import ApiKeyPool, get_api_key_pool
+from src.tools.llm.limiter import AdaptiveConcurrencyLimiter
+from src.tools.llm.fake import FakeLLMProvider
+from src.tools.llm.pool import LLMCallPool, get_llm_call_pool
+from src.tools.llm.providers import get_llm_provider
+from src.tools.llm.router import ModelRouter, get_model_router
+from src.tools.llm.response_cache import ResponseCache, get_llm_response_cache
+from src.tools.llm.sessions import ChatSessionPool
+from src.tools.llm.singleflight import SingleFlight
 
 __all__ = [
     "GeminiClient",
     "get_gemini_client",
     "close_gemini_client",
+    "AdaptiveConcurrencyLimiter",
+    "ApiKeyPool",
+    "get_api_key_pool",
+    "CircuitBreaker",
+    "CircuitState",
+    "get_llm_circuit_breaker",
+    "FakeLLMProvider",
+    "LLMCallPool",
+    "LLMProvider",
+    "get_llm_provider",
+    "get_llm_call_pool",
+    "ModelRouter",
+    "get_model_router",
+    "ResponseCache",
+    "get_llm_response_cache",
+    "ChatSessionPool",
+    "SingleFlight",
 ]
@@ -0,0 +1,102 @@
+"""Per-stage max_tokens caps learned from observed completion lengths."""
+
+from __future__ import annotations
+
+import math
+from collections import defaultdict, deque
+from typing import Any, DefaultDict, Deque, Dict, Optional
+
+from src.config.settings import settings
+from src.utils.metrics import llm_completion_tokens, llm_completions
+
+MAX_TOKENS_FINISH_REASON = "MAX_TOKENS"
+
+
+class MaxTokensTuner:
+    """Derives a ``max_tokens`` cap per stage from recent completions.
+
+    The cap is the ``percentile`` of the last ``window`` completion lengths
+    times ``headroom``, clamped to ``[floor, ceiling]``. Until ``min_samples``
+    completions have been seen for a stage the caller's default is used.
+    Answers cut off at the cap are recorded at the cap, so a stage whose
+    answers keep hitting it grows by ``headroom`` each time the window turns
+    over instead of staying stuck.
+    """
+
+    def __init__(
+        self,
+        percentile: float = 0.95,
+        headroom: float = 1.25,
+        min_samples: int = 50,
+        floor: int = 64,
+        ceiling: int = 8192,
+        window: int = 500,
+    ) -> None:
+        self.percentile = percentile
+        self.headroom = headroom
+        self.min_samples = min_samples
+        self.floor = floor
+        self.ceiling = ceiling
+        self._samples: DefaultDict[str, Deque[int]] = defaultdict(lambda: deque(maxlen=window))
+
+    def record(self, stage: str, completion_tokens: int, hit_cap: bool = False) -> None:
+        self._samples[stage].append(completion_tokens)
+        llm_completion_tokens.labels(stage=stage).observe(completion_tokens)
+        llm_completions.labels(stage=stage, hit_cap=str(hit_cap).lower()).inc()
+
+    def record_response(
+        self, stage: str, response: Dict[str, Any], max_tokens: Optional[int] = None
+    ) -> None:
+        """Record a generate_content result if it reports completion tokens.
+
+        Thinking tokens count too: they are spent from the same
+        ``max_tokens`` budget. A response cut off at ``max_tokens`` is
+        recorded at no less than that cap.
+        """
+        usage = response.get("usage") or {}
+        completion_tokens = (usage.get("completion_tokens") or 0) + (
+            usage.get("thoughts_tokens") or 0
+        )
+        hit_cap = response.get("finish_reason") == MAX_TOKENS_FINISH_REASON
+        if hit_cap and max_tokens:
+            completion_tokens = max(completion_tokens, max_tokens)
+        if completion_tokens:
+            self.record(stage, completion_tokens, hit_cap)
+
+    def max_tokens(self, stage: str, default: int) -> int:
+        samples = self._samples.get(stage)
+        if not samples or len(samples) < self.min_samples:
+            return default
+        ordered = sorted(samples)
+        observed = ordered[min(len(ordered) - 1, int(self.percentile * len(ordered)))]
+        return max(self.floor, min(self.ceiling, math.ceil(observed * self.headroom)))
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        return {
+            stage: {"samples": len(samples), "max_tokens": self.max_tokens(stage, 0)}
+            for stage, samples in self._samples.items()
+        }
+
+
+_max_tokens_tuner: Optional[MaxTokensTuner] = None
+
+
+def get_max_tokens_tuner() -> MaxTokensTuner:
+    """Get or create the process-wide max_tokens tuner."""
+    global _max_tokens_tuner
+    if _max_tokens_tuner is None:
+        _max_tokens_tuner = MaxTokensTuner(
+            percentile=settings.LLM_MAX_TOKENS_PERCENTILE,
+            headroom=settings.LLM_MAX_TOKENS_HEADROOM,
+            min_samples=settings.LLM_MAX_TOKENS_MIN_SAMPLES,
+            floor=settings.LLM_MAX_TOKENS_FLOOR,
+            ceiling=settings.LLM_MAX_TOKENS_CEILING,
+        )
+    return _max_tokens_tuner
+
+
+def tuned_max_tokens(stage: str, default: int) -> int:
+    """``max_tokens`` for a call whose caller did not pin one."""
+    if not settings.LLM_MAX_TOKENS_AUTOTUNE:
+        return default
+    return get_max_tokens_tuner().max_tokens(stage, default)
@@ -0,0 +1,56 @@
+"""Provider interface the agents depend on."""
+
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+
+class LLMProvider(ABC):
+    """Stage-aware text generation backend.
+
+    Responses are dicts with at least ``text``, ``model`` and ``usage``
+    (``prompt_tokens`` / ``completion_tokens``). ``stage`` names the agent
+    step making the call so providers can route, tune and account per stage.
+    """
+
+    @abstractmethod
+    def model_for(self, stage: Optional[str]) -> str:
+        """Name of the model that serves ``stage``."""
+
+    @abstractmethod
+    async def generate_content(
+        self,
+        prompt: str,
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = None,
+        *,
+        stage: Optional[str] = None,
+        **kwargs: Any,
+    ) -> Dict[str, Any]:
+        ...
+
+    @abstractmethod
+    def stream_content(
+        self,
+        prompt: str,
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = None,
+        *,
+        stage: Optional[str] = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[str]:
+        ...
+
+    @abstractmethod
+    async def chat(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = None,
+        *,
+        stage: Optional[str] = None,
+        conversation_id: Optional[str] = None,
+        **kwargs: Any,
+    ) -> Dict[str, Any]:
+        ...
@@ -0,0 +1,159 @@
+"""Circuit breaker that fails LLM calls fast while the upstream is down."""
+
+from __future__ import annotations
+
+import time
+from contextlib import contextmanager
+from enum import Enum
+from typing import Any, Dict, Iterator, Optional
+
+from google.api_core import exceptions as google_exceptions
+
+from src.config.settings import settings
+from src.config.logging_config import get_logger
+from src.utils.exceptions import CircuitOpenError
+from src.utils.metrics import llm_circuit_rejections, llm_circuit_state
+
+logger = get_logger(component="llm_circuit_breaker")
+
+
+class CircuitState(str, Enum):
+    CLOSED = "closed"
+    HALF_OPEN = "half_open"
+    OPEN = "open"
+
+
+_STATE_VALUES = {CircuitState.CLOSED: 0, CircuitState.HALF_OPEN: 1, CircuitState.OPEN: 2}
+
+
+class CircuitBreaker:
+    """Closed / open / half-open breaker driven by consecutive failures.
+
+    After ``failure_threshold`` consecutive failures the circuit opens and
+    calls raise CircuitOpenError immediately. Once ``recovery_timeout``
+    seconds have passed it goes half-open and lets up to ``probe_count``
+    calls through: that many successes close it, any failure reopens it.
+    Rejected bad requests (InvalidArgument) say nothing about upstream
+    health and are ignored.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        recovery_timeout: float = 30.0,
+        probe_count: int = 2,
+        name: str = "gemini",
+    ) -> None:
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.probe_count = probe_count
+        self.state = CircuitState.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        self._probes_in_flight = 0
+        self._probe_successes = 0
+        self.rejections = 0
+        llm_circuit_state.labels(breaker=self.name).set(0)
+
+    def acquire(self) -> None:
+        """Admit a call or raise CircuitOpenError."""
+        if self.state is CircuitState.OPEN:
+            if (
+                self.opened_at is not None
+                and time.monotonic() - self.opened_at >= self.recovery_timeout
+            ):
+                self._transition(CircuitState.HALF_OPEN)
+            else:
+                self._reject()
+        if self.state is CircuitState.HALF_OPEN:
+            if self._probes_in_flight + self._probe_successes >= self.probe_count:
+                self._reject()
+            self._probes_in_flight += 1
+
+    def record_success(self) -> None:
+        self.consecutive_failures = 0
+        if self.state is CircuitState.HALF_OPEN:
+            self._probes_in_flight = max(0, self._probes_in_flight - 1)
+            self._probe_successes += 1
+            if self._probe_successes >= self.probe_count:
+                self._transition(CircuitState.CLOSED)
+
+    def record_failure(self, error: BaseException) -> None:
+        if isinstance(error, (google_exceptions.InvalidArgument, CircuitOpenError)):
+            self.release()
+            return
+        self.consecutive_failures += 1
+        if (
+            self.state is CircuitState.HALF_OPEN
+            or self.consecutive_failures >= self.failure_threshold
+        ):
+            self._transition(CircuitState.OPEN, error=str(error))
+
+    def release(self) -> None:
+        """Return an admitted call that finished without a health signal."""
+        if self.state is CircuitState.HALF_OPEN:
+            self._probes_in_flight = max(0, self._probes_in_flight - 1)
+
+    @contextmanager
+    def guard(self) -> Iterator[None]:
+        """Admit one call and record its outcome."""
+        self.acquire()
+        try:
+            yield
+        except Exception as exc:
+            self.record_failure(exc)
+            raise
+        except BaseException:
+            # Cancellation: the call never completed, so it proves nothing
+            self.release()
+            raise
+        else:
+            self.record_success()
+
+    def _reject(self) -> None:
+        self.rejections += 1
+        llm_circuit_rejections.labels(breaker=self.name).inc()
+        raise CircuitOpenError(f"LLM circuit '{self.name}' is {self.state.value}; failing fast")
+
+    def _transition(self, state: CircuitState, error: Optional[str] = None) -> None:
+        previous = self.state
+        self.state = state
+        self._probes_in_flight = 0
+        self._probe_successes = 0
+        if state is CircuitState.OPEN:
+            self.opened_at = time.monotonic()
+        elif state is CircuitState.CLOSED:
+            self.opened_at = None
+            self.consecutive_failures = 0
+        llm_circuit_state.labels(breaker=self.name).set(_STATE_VALUES[state])
+        log = logger.warning if state is CircuitState.OPEN else logger.info
+        log(
+            "LLM circuit state changed",
+            breaker=self.name,
+            previous=previous.value,
+            state=state.value,
+            error=error,
+        )
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "state": self.state.value,
+            "consecutive_failures": self.consecutive_failures,
+            "rejections": self.rejections,
+        }
+
+
+_circuit_breaker: Optional[CircuitBreaker] = None
+
+
+def get_llm_circuit_breaker() -> CircuitBreaker:
+    """Get or create the process-wide LLM circuit breaker."""
+    global _circuit_breaker
+    if _circuit_breaker is None:
+        _circuit_breaker = CircuitBreaker(
+            failure_threshold=settings.GEMINI_CIRCUIT_FAILURE_THRESHOLD,
+            recovery_timeout=settings.GEMINI_CIRCUIT_RECOVERY_SECONDS,
+            probe_count=settings.GEMINI_CIRCUIT_PROBES,
+        )
+    return _circuit_breaker
@@ -0,0 +1,197 @@
+"""Offline LLM provider with synthetic latency, output and failures."""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import math
+import random
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from google.api_core import exceptions as google_exceptions
+
+from src.config.settings import settings
+from src.tools.llm.base import LLMProvider
+
+FAKE_MODEL = "fake-llm"
+
+_VOCABULARY = (
+    "review",
+    "draft",
+    "plan",
+    "check",
+    "confirm",
+    "outline",
+    "compare",
+    "schedule",
+    "budget",
+    "route",
+    "summary",
+    "detail",
+    "option",
+    "weather",
+    "venue",
+    "task",
+    "goal",
+    "step",
+    "risk",
+    "note",
+    "update",
+    "share",
+    "prepare",
+    "finalize",
+)
+
+
+class FakeLLMProvider(LLMProvider):
+    """Deterministic stand-in for Gemini for load tests and offline runs.
+
+    Latency is drawn from ``latency_distribution`` around ``latency_ms``
+    (``spread`` is the lognormal sigma, the relative standard deviation for
+    ``normal`` and the half-width fraction for ``uniform``). Output is
+    ``completion_tokens`` words in numbered lines, derived from the prompt so
+    identical requests get identical text; ``max_tokens`` truncates it and
+    reports ``MAX_TOKENS``. A fraction ``error_rate`` of calls fail with
+    ServiceUnavailable after their latency has elapsed. Streams yield
+    ``stream_chunk_tokens`` words per chunk with the latency spread over the
+    chunks.
+    """
+
+    def __init__(
+        self,
+        latency_ms: float = 800.0,
+        latency_distribution: str = "lognormal",
+        spread: float = 0.5,
+        completion_tokens: int = 200,
+        error_rate: float = 0.0,
+        stream_chunk_tokens: int = 16,
+        seed: Optional[int] = None,
+        model: str = FAKE_MODEL,
+    ) -> None:
+        if latency_distribution not in {"fixed", "uniform", "normal", "lognormal", "exponential"}:
+            raise ValueError(f"Unknown latency distribution: {latency_distribution}")
+        self.latency_ms = latency_ms
+        self.latency_distribution = latency_distribution
+        self.spread = spread
+        self.completion_tokens = completion_tokens
+        self.error_rate = error_rate
+        self.stream_chunk_tokens = max(1, stream_chunk_tokens)
+        self.model = model
+        self._random = random.Random(seed)
+        self.calls = 0
+
+    def model_for(self, stage: Optional[str]) -> str:
+        return self.model
+
+    def sample_latency(self) -> float:
+        """Draw one call latency in seconds."""
+        mean = self.latency_ms / 1000.0
+        if self.latency_distribution == "fixed":
+            value = mean
+        elif self.latency_distribution == "uniform":
+            value = self._random.uniform(mean * (1 - self.spread), mean * (1 + self.spread))
+        elif self.latency_distribution == "normal":
+            value = self._random.gauss(mean, mean * self.spread)
+        elif self.latency_distribution == "exponential":
+            value = self._random.expovariate(1 / mean) if mean > 0 else 0.0
+        else:
+            # latency_ms is the median of the lognormal
+            value = self._random.lognormvariate(math.log(mean), self.spread) if mean > 0 else 0.0
+        return max(0.0, value)
+
+    def _words(
+        self, prompt: str, stage: Optional[str], max_tokens: Optional[int]
+    ) -> tuple[List[str], str]:
+        digest = hashlib.sha256(f"{stage}:{prompt}".encode()).digest()
+        rng = random.Random(digest)
+        count = self.completion_tokens
+        finish_reason = "STOP"
+        if max_tokens is not None and max_tokens < count:
+            count, finish_reason = max_tokens, "MAX_TOKENS"
+        return [rng.choice(_VOCABULARY) for _ in range(count)], finish_reason
+
+    @staticmethod
+    def _lines(words: List[str]) -> List[str]:
+        return [
+            f"{index + 1}. {' '.join(words[offset:offset + 12])}"
+            for index, offset in enumerate(range(0, len(words), 12))
+        ]
+
+    def _maybe_fail(self) -> None:
+        if self.error_rate and self._random.random() < self.error_rate:
+            raise google_exceptions.ServiceUnavailable("fake provider injected failure")
+
+    def _response(self, prompt: str, words: List[str], finish_reason: str) -> Dict[str, Any]:
+        return {
+            "text": "\n".join(self._lines(words)),
+            "model": self.model,
+            "finish_reason": finish_reason,
+            "usage": {
+                "prompt_tokens": max(1, len(prompt) // 4),
+                "completion_tokens": len(words),
+            },
+        }
+
+    async def generate_content(
+        self,
+        prompt: str,
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = None,
+        *,
+        stage: Optional[str] = None,
+        **kwargs: Any,
+    ) -> Dict[str, Any]:
+        self.calls += 1
+        await asyncio.sleep(self.sample_latency())
+        self._maybe_fail()
+        words, finish_reason = self._words(prompt, stage, max_tokens)
+        return self._response(prompt, words, finish_reason)
+
+    async def stream_content(
+        self,
+        prompt: str,
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = None,
+        *,
+        stage: Optional[str] = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[str]:
+        self.calls += 1
+        words, _ = self._words(prompt, stage, max_tokens)
+        text = "\n".join(self._lines(words))
+        pieces = text.split(" ")
+        chunks = [
+            " ".join(pieces[offset : offset + self.stream_chunk_tokens])
+            for offset in range(0, len(pieces), self.stream_chunk_tokens)
+        ] or [""]
+        delay = self.sample_latency() / len(chunks)
+        for index, chunk in enumerate(chunks):
+            await asyncio.sleep(delay)
+            if index == 0:
+                self._maybe_fail()
+            yield chunk if index == len(chunks) - 1 else chunk + " "
+
+    async def chat(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = None,
+        *,
+        stage: Optional[str] = None,
+        conversation_id: Optional[str] = None,
+        **kwargs: Any,
+    ) -> Dict[str, Any]:
+        prompt = "\n".join(message["content"] for message in messages)
+        return await self.generate_content(prompt, temperature, max_tokens, stage=stage)
+
+
+def fake_provider_from_settings() -> FakeLLMProvider:
+    return FakeLLMProvider(
+        latency_ms=settings.FAKE_LLM_LATENCY_MS,
+        latency_distribution=settings.FAKE_LLM_LATENCY_DISTRIBUTION,
+        spread=settings.FAKE_LLM_LATENCY_SPREAD,
+        completion_tokens=settings.FAKE_LLM_COMPLETION_TOKENS,
+        error_rate=settings.FAKE_LLM_ERROR_RATE,
+        stream_chunk_tokens=settings.FAKE_LLM_STREAM_CHUNK_TOKENS,
+        seed=settings.FAKE_LLM_SEED,
+    )
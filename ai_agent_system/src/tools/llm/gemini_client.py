@@ -2,16 +2,35 @@
 
 from __future__ import annotations
 
-from typing import Any, Dict, List, Optional
+import functools
+import json
+import time
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
 
+import google.ai.generativelanguage as glm
 import google.generativeai as genai
-from tenacity import retry, stop_after_attempt, wait_exponential
+from tenacity import retry, retry_if_not_exception_type, stop_after_attempt, wait_random_exponential
 
 from src.config.settings import settings
 from src.config.logging_config import get_logger
+from src.tools.llm.circuit_breaker import CircuitBreaker, get_llm_circuit_breaker
+from src.tools.llm.hedging import get_llm_hedger
+from src.tools.llm.key_pool import ApiKeyPool, ApiKeyState, get_api_key_pool
+from src.tools.llm.keys import request_key
+from src.tools.llm.response_cache import get_llm_response_cache
+from src.tools.llm.sessions import ChatSessionPool, PooledChatSession
+from src.tools.llm.singleflight import SingleFlight
+from src.tools.llm.tokens import response_usage
+from src.tools.llm.pool import LLMCallPool, get_llm_call_pool, shutdown_llm_call_pool
+from src.utils.cassette import get_cassette
+from src.utils.exceptions import CircuitOpenError
+from src.utils.metrics import llm_call_latency, llm_model_cache_requests, llm_model_cache_size
 
 logger = get_logger(component="gemini_client")
 
+ModelKey = Tuple[str, str, Tuple[Tuple[str, str], ...], str]
+
 
 class GeminiClient:
     """Client for Google Gemini API using official SDK."""
@@ -21,26 +40,48 @@ class GeminiClient:
         api_key: Optional[str] = None,
         model: str = "gemini-2.5-flash",
         timeout: float = 60.0,
+        pool: Optional[LLMCallPool] = None,
+        breaker: Optional[CircuitBreaker] = None,
+        keys: Optional[ApiKeyPool] = None,
     ):
         """Initialize Gemini client.
         
         Args:
-            api_key: Gemini API key (defaults to settings)
+            api_key: Gemini API key (defaults to the shared key pool)
             model: Model name to use (gemini-pro, gemini-1.5-flash, etc.)
             timeout: Request timeout in seconds
+            pool: Call pool for blocking SDK calls (defaults to the shared pool)
+            breaker: Circuit breaker guarding upstream calls (defaults to the shared one)
+            keys: API key pool calls are spread over (defaults to the shared pool
+                built from GEMINI_API_KEYS / GEMINI_API_KEY)
         """
-        self.api_key = api_key or settings.GEMINI_API_KEY
-        if not self.api_key:
-            raise ValueError("GEMINI_API_KEY not found in settings or provided")
-        
-        # Configure the SDK
-        genai.configure(api_key=self.api_key)
+        # A replaying cassette answers every call, so offline runs (CI without
+        # GEMINI_API_KEY) skip key and SDK setup entirely
+        cassette = get_cassette()
+        self.replaying = cassette is not None and cassette.mode == "replay"
+        self.keys: Optional[ApiKeyPool] = None
+        self.api_key: Optional[str] = None
+        if not self.replaying:
+            if api_key:
+                keys = ApiKeyPool([api_key])
+            self.keys = keys or get_api_key_pool()
+            self.api_key = self.keys.primary.key
+            # Configure the SDK; the primary key backs the SDK's default clients
+            genai.configure(api_key=self.api_key)
         
         self.model_name = model
         self.timeout = timeout
+        self.pool = pool or get_llm_call_pool()
+        self.inflight = SingleFlight(name=model)
+        self.breaker = breaker or get_llm_circuit_breaker()
+        self.chat_sessions = ChatSessionPool(
+            max_sessions=settings.GEMINI_CHAT_SESSION_MAX,
+            idle_timeout=settings.GEMINI_CHAT_SESSION_IDLE_SECONDS,
+            name=model,
+        )
         
         # Configure safety settings to be more permissive
-        safety_settings = [
+        self.safety_settings = [
             {
                 "category": "HARM_CATEGORY_HARASSMENT",
                 "threshold": "BLOCK_NONE",
@@ -59,121 +100,347 @@ class GeminiClient:
             },
         ]
         
-        self.model = genai.GenerativeModel(
-            model,
-            safety_settings=safety_settings
+        self.model = (
+            None
+            if self.replaying
+            else genai.GenerativeModel(model, safety_settings=self.safety_settings)
         )
+        # Models carrying a system instruction or bound to a secondary key,
+        # most recently used last
+        self._models: OrderedDict[ModelKey, genai.GenerativeModel] = OrderedDict()
+        self._service_clients: Dict[str, glm.GenerativeServiceClient] = {}
         
         logger.info(
             "Gemini client initialized",
             model=model,
+            replaying=self.replaying,
         )
 
     async def close(self):
         """Close the client (no-op for SDK)."""
         pass
 
-    @retry(
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=2, max=10),
-        reraise=True,
-    )
+    def _service_client(self, api_key: ApiKeyState) -> glm.GenerativeServiceClient:
+        client = self._service_clients.get(api_key.label)
+        if client is None:
+            client = glm.GenerativeServiceClient(client_options={"api_key": api_key.key})
+            self._service_clients[api_key.label] = client
+        return client
+
+    def _get_model(
+        self, system_instruction: Optional[str], api_key: Optional[ApiKeyState] = None
+    ) -> genai.GenerativeModel:
+        """Return a model bound to ``system_instruction``, memoized per instruction.
+
+        Building a GenerativeModel is cheap but not free, and agents reuse a
+        handful of fixed instructions, so models are kept in a small LRU keyed
+        by (model name, instruction, safety settings, API key). Models for
+        secondary keys get their own service client, since the SDK's default
+        clients are bound to the primary key.
+        """
+        secondary = api_key is not None and api_key is not self.keys.primary
+        if not system_instruction and not secondary:
+            return self.model
+
+        key: ModelKey = (
+            self.model_name,
+            system_instruction or "",
+            tuple((item["category"], item["threshold"]) for item in self.safety_settings),
+            api_key.label if secondary and api_key is not None else "",
+        )
+        model = self._models.get(key)
+        if model is not None:
+            self._models.move_to_end(key)
+            llm_model_cache_requests.labels(client=self.model_name, result="hit").inc()
+            return model
+
+        llm_model_cache_requests.labels(client=self.model_name, result="miss").inc()
+        model = genai.GenerativeModel(
+            self.model_name,
+            safety_settings=self.safety_settings,
+            system_instruction=system_instruction or None,
+        )
+        if secondary and api_key is not None:
+            model._client = self._service_client(api_key)
+        self._models[key] = model
+        while len(self._models) > settings.GEMINI_MODEL_CACHE_SIZE:
+            self._models.popitem(last=False)
+        llm_model_cache_size.labels(client=self.model_name).set(len(self._models))
+        return model
+
+    def _generation_config(
+        self, temperature: float, max_tokens: Optional[int], extra: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        generation_config: Dict[str, Any] = {
+            "temperature": temperature,
+        }
+        if max_tokens:
+            generation_config["max_output_tokens"] = max_tokens
+        generation_config.update(extra)
+        return generation_config
+
     async def generate_content(
         self,
         prompt: str,
         temperature: float = 0.7,
         max_tokens: Optional[int] = None,
+        *,
+        stage: Optional[str] = None,
+        hedge: Optional[bool] = None,
         **kwargs: Any,
     ) -> Dict[str, Any]:
         """Generate content using Gemini API.
         
+        Identical concurrent requests (same model, prompt, system instruction
+        and generation config) share a single upstream call, and
+        low-temperature results are served from the in-process response
+        cache when enabled. While the circuit breaker is open, uncached calls
+        raise CircuitOpenError without retrying.
+
         Args:
             prompt: The prompt to generate from
             temperature: Sampling temperature (0.0 to 1.0)
             max_tokens: Maximum tokens to generate
+            stage: Calling agent stage (planner, writer, synthesis, ...) used
+                for latency tracking and per-stage policies
+            hedge: Hedge slow calls; defaults to whether ``stage`` is listed
+                in GEMINI_HEDGE_STAGES
             **kwargs: Additional parameters for the API
             
         Returns:
             Dict containing the generated text and metadata
         """
-        try:
-            # Configure generation parameters
-            generation_config = {
-                "temperature": temperature,
-            }
-            if max_tokens:
-                generation_config["max_output_tokens"] = max_tokens
-            
-            # Extract system_instruction if provided
-            # (not part of generation_config)
-            kwargs.pop("system_instruction", None)
+        # system_instruction is bound to the model, not generation_config
+        system_instruction = kwargs.pop("system_instruction", None)
+        generation_config = self._generation_config(temperature, max_tokens, kwargs)
 
-            generation_config.update(kwargs)
-            
-            # Generate content
-            response = self.model.generate_content(
+        key = request_key(self.model_name, prompt, system_instruction, generation_config)
+        cache = get_llm_response_cache()
+        if cache is not None and cache.cacheable(generation_config):
+            cached = cache.get(key)
+            if cached is not None:
+                cached["cached"] = True
+                return cached
+        else:
+            cache = None
+
+        stage = stage or "default"
+        if hedge is None:
+            hedge = stage in settings.GEMINI_HEDGE_STAGES
+
+        async def _call() -> Dict[str, Any]:
+            cassette = get_cassette()
+            upstream = functools.partial(
+                self._generate_content,
                 prompt,
-                generation_config=generation_config
+                generation_config,
+                system_instruction,
+                stage=stage,
+                hedge=hedge,
             )
+            result = await (cassette.call("gemini", key, upstream) if cassette else upstream())
+            if cache is not None:
+                cache.set(key, result)
+            return result
+
+        if not settings.GEMINI_COALESCE_REQUESTS:
+            return await _call()
+        return await self.inflight.do(key, _call)
+
+    # Retries re-enter the shared adaptive limiter, so after a 429 they queue
+    # behind the reduced limit; jitter keeps them from retrying in lockstep.
+    # An open circuit is final: retrying would only delay the caller's fallback.
+    @retry(
+        retry=retry_if_not_exception_type(CircuitOpenError),
+        stop=stop_after_attempt(3),
+        wait=wait_random_exponential(multiplier=1, min=2, max=10),
+        reraise=True,
+    )
+    async def _generate_content(
+        self,
+        prompt: str,
+        generation_config: Dict[str, Any],
+        system_instruction: Optional[str],
+        stage: str = "default",
+        hedge: bool = False,
+    ) -> Dict[str, Any]:
+        async def _call() -> Any:
+            api_key = self.keys.acquire()
+            try:
+                model = self._get_model(system_instruction, api_key)
+            except BaseException as exc:
+                self.keys.release(api_key, error=exc)
+                raise
+            # Generate content off the event loop. The key is released when
+            # the SDK call actually returns, not when a losing hedge is
+            # cancelled, so its in-flight count matches the running threads.
+            return await self.pool.run(
+                model.generate_content,
+                prompt,
+                generation_config=generation_config,
+                request_options={"timeout": self.timeout},
+                on_done=functools.partial(self.keys.release, api_key),
+                latency_key=(self.model_name, stage),
+            )
+
+        with self.breaker.guard():
+            try:
+                start = time.perf_counter()
+                if hedge:
+                    response = await get_llm_hedger().run((self.model_name, stage), _call)
+                else:
+                    response = await _call()
+                llm_call_latency.labels(model=self.model_name, stage=stage).observe(
+                    time.perf_counter() - start
+                )
             
-            # Handle safety filtering and empty responses
-            text = ""
-            if hasattr(response, 'text'):
-                try:
-                    text = response.text
-                except ValueError as e:
-                    # Safety filter or empty response
-                    logger.warning(
-                        "Response text unavailable",
-                        error=str(e),
-                        finish_reason=getattr(
-                            response.candidates[0]
-                            if response.candidates else None,
-                            'finish_reason',
-                            'unknown'
-                        )
-                    )
-                    if response.candidates and response.candidates[0].content.parts:
-                        # Try to get text from parts directly
-                        text = "".join(
-                            part.text
-                            for part in response.candidates[0].content.parts
-                            if hasattr(part, 'text')
-                        )
-            
-            if not text:
-                # Return empty text with safety info
-                text = ""
+                text = _extract_text(response)
             
-            logger.info(
-                "Content generated successfully",
-                model=self.model_name,
-                prompt_length=len(prompt),
-                response_length=len(text),
-            )
+                logger.info(
+                    "Content generated successfully",
+                    model=self.model_name,
+                    prompt_length=len(prompt),
+                    response_length=len(text),
+                )
             
-            return {
-                "text": text,
-                "model": self.model_name,
-                "usage": {
-                    "prompt_tokens": getattr(response, "prompt_token_count", 0),
-                    "completion_tokens": getattr(response, "candidates_token_count", 0) if hasattr(response, "candidates_token_count") else 0,
-                },
-            }
+                return {
+                    "text": text,
+                    "model": self.model_name,
+                    "finish_reason": _finish_reason(response),
+                    "usage": response_usage(response, prompt, text),
+                }
             
-        except Exception as e:
-            logger.error(
-                "Gemini API request failed",
-                error=str(e),
-                error_type=type(e).__name__,
-            )
-            raise
+            except Exception as e:
+                logger.error(
+                    "Gemini API request failed",
+                    error=str(e),
+                    error_type=type(e).__name__,
+                )
+                raise
+
+    async def stream_content(
+        self,
+        prompt: str,
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[str]:
+        """Stream generated text chunks as they arrive from Gemini.
+
+        Streams are not retried: once text has been yielded a retry would
+        duplicate it, so failures propagate to the caller. Raises
+        CircuitOpenError immediately while the circuit is open.
+
+        Args:
+            prompt: The prompt to generate from
+            temperature: Sampling temperature (0.0 to 1.0)
+            max_tokens: Maximum tokens to generate
+            **kwargs: Additional parameters for the API
+
+        Yields:
+            Text chunks in generation order
+        """
+        system_instruction = kwargs.pop("system_instruction", None)
+        generation_config = self._generation_config(temperature, max_tokens, kwargs)
+
+        cassette = get_cassette()
+        upstream = functools.partial(
+            self._stream_content, prompt, generation_config, system_instruction
+        )
+        if cassette is None:
+            chunks = upstream()
+        else:
+            key = request_key(self.model_name, prompt, system_instruction, generation_config)
+            chunks = cassette.stream("gemini_stream", key, upstream)
+        async for chunk in chunks:
+            yield chunk
+
+    async def _stream_content(
+        self,
+        prompt: str,
+        generation_config: Dict[str, Any],
+        system_instruction: Optional[str],
+    ) -> AsyncIterator[str]:
+        response_length = 0
+        with self.breaker.guard():
+            api_key = self.keys.acquire()
+            try:
+                model = self._get_model(system_instruction, api_key)
+            except BaseException as exc:
+                self.keys.release(api_key, error=exc)
+                raise
+            try:
+                # The key is released when the streaming thread finishes, not
+                # when the consumer stops reading, so it isn't handed to the
+                # next request while this stream is still running on it
+                async for chunk in self.pool.stream(
+                    model.generate_content,
+                    prompt,
+                    generation_config=generation_config,
+                    stream=True,
+                    request_options={"timeout": self.timeout},
+                    on_done=functools.partial(self.keys.release, api_key),
+                ):
+                    text = _extract_text(chunk)
+                    if text:
+                        response_length += len(text)
+                        yield text
+            except Exception as e:
+                logger.error(
+                    "Gemini streaming request failed",
+                    error=str(e),
+                    error_type=type(e).__name__,
+                )
+                raise
+
+        logger.info(
+            "Content streamed successfully",
+            model=self.model_name,
+            prompt_length=len(prompt),
+            response_length=response_length,
+        )
+
+    def _chat_session(
+        self,
+        conversation_id: Optional[str],
+        messages: List[Dict[str, str]],
+        system_instruction: Optional[str],
+    ) -> PooledChatSession:
+        """Return the pooled session for ``conversation_id`` or build a new one.
+
+        A pooled session is reused when it was built with the same system
+        instruction and ``messages`` is either just the new turn or the
+        session's history plus the new turn. Anything else rebuilds it.
+        """
+        if conversation_id is not None:
+            session = self.chat_sessions.get(conversation_id)
+            if (
+                session is not None
+                and session.system_instruction == system_instruction
+                and len(messages) in (1, session.turns + 1)
+            ):
+                self.chat_sessions.record(reused=True)
+                return session
+
+        session = PooledChatSession(
+            system_instruction=system_instruction,
+            initial_history=[
+                {"role": "user" if msg["role"] == "user" else "model", "parts": [msg["content"]]}
+                for msg in messages[:-1]
+            ],
+        )
+        if conversation_id is not None:
+            self.chat_sessions.record(reused=False)
+            self.chat_sessions.put(conversation_id, session)
+        return session
 
     async def chat(
         self,
         messages: List[Dict[str, str]],
         temperature: float = 0.7,
         max_tokens: Optional[int] = None,
+        *,
+        conversation_id: Optional[str] = None,
         **kwargs: Any,
     ) -> Dict[str, Any]:
         """Have a conversation using Gemini API.
@@ -182,38 +449,67 @@ class GeminiClient:
             messages: List of message dicts with 'role' and 'content'
             temperature: Sampling temperature (0.0 to 1.0)
             max_tokens: Maximum tokens to generate
+            conversation_id: Keeps the chat session alive across calls. A
+                follow-up turn may pass either the full history or only the
+                new message; only the new message is sent upstream.
             **kwargs: Additional parameters
             
         Returns:
             Dict containing the response and metadata
         """
+        system_instruction = kwargs.pop("system_instruction", None)
+        generation_config = self._generation_config(temperature, max_tokens, kwargs)
+
+        cassette = get_cassette()
+        upstream = functools.partial(
+            self._chat, messages, generation_config, system_instruction, conversation_id
+        )
+        if cassette is None:
+            return await upstream()
+        key = request_key(
+            self.model_name,
+            json.dumps([conversation_id, messages]),
+            system_instruction,
+            generation_config,
+        )
+        return await cassette.call("gemini_chat", key, upstream)
+
+    async def _chat(
+        self,
+        messages: List[Dict[str, str]],
+        generation_config: Dict[str, Any],
+        system_instruction: Optional[str],
+        conversation_id: Optional[str],
+    ) -> Dict[str, Any]:
         try:
-            # Configure generation parameters
-            generation_config = {
-                "temperature": temperature,
-            }
-            if max_tokens:
-                generation_config["max_output_tokens"] = max_tokens
+            session = self._chat_session(conversation_id, messages, system_instruction)
             
-            generation_config.update(kwargs)
-            
-            # Start chat session
-            chat = self.model.start_chat(history=[])
-            
-            # Add all but last message to history
-            for msg in messages[:-1]:
-                role = "user" if msg["role"] == "user" else "model"
-                chat.history.append({
-                    "role": role,
-                    "parts": [msg["content"]]
-                })
-            
-            # Send last message
+            # Send last message; turns of one conversation are serialized
+            # because the SDK session mutates its history in place
             last_message = messages[-1]["content"]
-            response = chat.send_message(
-                last_message,
-                generation_config=generation_config
-            )
+            async with session.lock:
+                api_key = self.keys.acquire(prefer=session.api_key)
+                if api_key is not session.api_key:
+                    # New session, or its key is quarantined: (re)bind the history
+                    session.chat = self._get_model(system_instruction, api_key).start_chat(
+                        history=session.history
+                    )
+                    session.api_key = api_key
+                try:
+                    with self.breaker.guard():
+                        response = await self.pool.run(
+                            session.chat.send_message,
+                            last_message,
+                            generation_config=generation_config,
+                            request_options={"timeout": self.timeout},
+                            latency_key=(self.model_name, "chat"),
+                        )
+                except BaseException as exc:
+                    self.keys.release(api_key, error=exc)
+                    if conversation_id is not None:
+                        self.chat_sessions.discard(conversation_id)
+                    raise
+                self.keys.release(api_key)
             
             text = response.text if response.text else ""
             
@@ -227,10 +523,7 @@ class GeminiClient:
             return {
                 "text": text,
                 "model": self.model_name,
-                "usage": {
-                    "prompt_tokens": getattr(response, "prompt_token_count", 0),
-                    "completion_tokens": getattr(response, "candidates_token_count", 0) if hasattr(response, "candidates_token_count") else 0,
-                },
+                "usage": response_usage(response, last_message, text),
             }
             
         except Exception as e:
@@ -242,28 +535,61 @@ class GeminiClient:
             raise
 
 
-# Global client instance
-_gemini_client: Optional[GeminiClient] = None
+def _extract_text(response: Any) -> str:
+    """Return response text, tolerating safety-filtered or empty candidates."""
+    try:
+        return response.text or ""
+    except ValueError as e:
+        # Safety filter or empty response
+        logger.warning(
+            "Response text unavailable",
+            error=str(e),
+            finish_reason=getattr(
+                response.candidates[0] if response.candidates else None, "finish_reason", "unknown"
+            ),
+        )
+        if response.candidates and response.candidates[0].content.parts:
+            # Try to get text from parts directly
+            return "".join(
+                part.text for part in response.candidates[0].content.parts if hasattr(part, "text")
+            )
+    return ""
+
+
+def _finish_reason(response: Any) -> Optional[str]:
+    """Return the first candidate's finish reason name (e.g. STOP, SAFETY)."""
+    candidates = getattr(response, "candidates", None)
+    if not candidates:
+        return None
+    reason = getattr(candidates[0], "finish_reason", None)
+    if reason is None:
+        return None
+    return getattr(reason, "name", None) or str(reason)
+
+
+# Global client instances, one per model
+_gemini_clients: Dict[str, GeminiClient] = {}
 
 
-def get_gemini_client(model: str = "gemini-2.5-flash") -> GeminiClient:
-    """Get or create global Gemini client instance.
+def get_gemini_client(model: Optional[str] = None) -> GeminiClient:
+    """Get or create the global Gemini client for a model.
     
     Args:
-        model: Model name to use
+        model: Model name to use (defaults to GEMINI_DEFAULT_MODEL)
         
     Returns:
         GeminiClient instance
     """
-    global _gemini_client
-    if _gemini_client is None:
-        _gemini_client = GeminiClient(model=model)
-    return _gemini_client
+    model = model or settings.GEMINI_DEFAULT_MODEL
+    client = _gemini_clients.get(model)
+    if client is None:
+        client = _gemini_clients[model] = GeminiClient(model=model)
+    return client
 
 
 async def close_gemini_client() -> None:
-    """Close global Gemini client."""
-    global _gemini_client
-    if _gemini_client:
-        await _gemini_client.close()
-        _gemini_client = None
+    """Close all global Gemini clients."""
+    for client in list(_gemini_clients.values()):
+        await client.close()
+    _gemini_clients.clear()
+    shutdown_llm_call_pool()
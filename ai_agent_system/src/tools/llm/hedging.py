@@ -0,0 +1,125 @@
+"""Hedged LLM requests: duplicate slow calls and keep the first answer."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import defaultdict, deque
+from typing import Any, Awaitable, Callable, DefaultDict, Deque, Dict, Optional, Tuple, TypeVar
+
+from src.config.settings import settings
+from src.config.logging_config import get_logger
+from src.utils.metrics import llm_hedged_calls
+
+logger = get_logger(component="llm_hedging")
+
+T = TypeVar("T")
+LatencyKey = Tuple[str, str]
+
+
+class LatencyTracker:
+    """Sliding window of recent call latencies per (model, stage)."""
+
+    def __init__(self, window: int = 200, min_samples: int = 20) -> None:
+        self.min_samples = min_samples
+        self._samples: DefaultDict[LatencyKey, Deque[float]] = defaultdict(
+            lambda: deque(maxlen=window)
+        )
+
+    def record(self, key: LatencyKey, latency: float) -> None:
+        self._samples[key].append(latency)
+
+    def percentile(self, key: LatencyKey, q: float) -> Optional[float]:
+        samples = self._samples.get(key)
+        if not samples or len(samples) < self.min_samples:
+            return None
+        ordered = sorted(samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class HedgeBudget:
+    """Caps hedges at ``ratio`` of all calls (e.g. 0.05 = at most 5% extra)."""
+
+    def __init__(self, ratio: float) -> None:
+        self.ratio = ratio
+        self.calls = 0
+        self.hedges = 0
+
+    def record_call(self) -> None:
+        self.calls += 1
+
+    def try_spend(self) -> bool:
+        if self.hedges + 1 > self.calls * self.ratio:
+            return False
+        self.hedges += 1
+        return True
+
+
+class Hedger:
+    """Fires a duplicate call once the primary outlives the tracked percentile.
+
+    Whichever call finishes first wins and the other is cancelled. A failed
+    call only loses if the other one is still running. Until enough
+    latencies have been observed for a (model, stage), calls are not hedged.
+    """
+
+    def __init__(self, tracker: LatencyTracker, budget: HedgeBudget, percentile: float) -> None:
+        self.tracker = tracker
+        self.budget = budget
+        self.percentile = percentile
+
+    async def run(self, key: LatencyKey, fn: Callable[[], Awaitable[T]]) -> T:
+        self.budget.record_call()
+        delay = self.tracker.percentile(key, self.percentile)
+        primary = asyncio.ensure_future(self._timed(key, fn))
+        calls = [primary]
+        try:
+            if delay is None:
+                return await primary
+
+            done, _ = await asyncio.wait({primary}, timeout=delay)
+            if done:
+                return primary.result()
+            if not self.budget.try_spend():
+                llm_hedged_calls.labels(stage=key[1], outcome="budget_exhausted").inc()
+                return await primary
+
+            hedge = asyncio.ensure_future(self._timed(key, fn))
+            calls.append(hedge)
+            pending = {primary, hedge}
+            while True:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                winner = done.pop()
+                if winner.exception() is None or not pending:
+                    outcome = "hedge_won" if winner is hedge else "primary_won"
+                    llm_hedged_calls.labels(stage=key[1], outcome=outcome).inc()
+                    return winner.result()
+        finally:
+            # The loser, or every call if the caller itself was cancelled
+            for call in calls:
+                if not call.done():
+                    call.cancel()
+
+    async def _timed(self, key: LatencyKey, fn: Callable[[], Awaitable[T]]) -> T:
+        start = time.perf_counter()
+        result = await fn()
+        self.tracker.record(key, time.perf_counter() - start)
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        return {"calls": self.budget.calls, "hedges": self.budget.hedges}
+
+
+_hedger: Optional[Hedger] = None
+
+
+def get_llm_hedger() -> Hedger:
+    """Get or create the process-wide hedger."""
+    global _hedger
+    if _hedger is None:
+        _hedger = Hedger(
+            tracker=LatencyTracker(min_samples=settings.GEMINI_HEDGE_MIN_SAMPLES),
+            budget=HedgeBudget(ratio=settings.GEMINI_HEDGE_BUDGET),
+            percentile=settings.GEMINI_HEDGE_PERCENTILE,
+        )
+    return _hedger
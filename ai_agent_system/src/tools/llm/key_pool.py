@@ -0,0 +1,162 @@
+"""Pool of Gemini API keys with per-key load tracking and quarantine."""
+
+from __future__ import annotations
+
+import itertools
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, List, Optional
+
+from src.config.settings import settings
+from src.config.logging_config import get_logger
+from src.tools.llm.limiter import is_throttle_error
+from src.utils.metrics import (
+    llm_key_calls,
+    llm_key_inflight,
+    llm_key_quarantined,
+    llm_key_throttles,
+)
+
+logger = get_logger(component="llm_key_pool")
+
+RATE_WINDOW_SECONDS = 60.0
+
+
+def configured_api_keys() -> List[str]:
+    """Return GEMINI_API_KEYS, falling back to the single GEMINI_API_KEY."""
+    keys = [key for key in settings.GEMINI_API_KEYS if key]
+    if not keys and settings.GEMINI_API_KEY:
+        keys = [settings.GEMINI_API_KEY]
+    return keys
+
+
+@dataclass(eq=False)
+class ApiKeyState:
+    """Usage of one API key. ``label`` is safe to log; ``key`` is not."""
+
+    key: str
+    label: str
+    in_flight: int = 0
+    calls: int = 0
+    throttles: int = 0
+    quarantined_until: float = 0.0
+    recent: Deque[float] = field(default_factory=deque)
+
+    def calls_per_minute(self, now: float) -> int:
+        self._prune(now)
+        return len(self.recent)
+
+    def record_call(self, now: float) -> None:
+        self.calls += 1
+        self.recent.append(now)
+        self._prune(now)
+
+    def _prune(self, now: float) -> None:
+        while self.recent and now - self.recent[0] > RATE_WINDOW_SECONDS:
+            self.recent.popleft()
+
+
+class ApiKeyPool:
+    """Spreads calls over several API keys.
+
+    ``least_loaded`` picks the key with the fewest calls in flight, then
+    the fewest calls in the last minute; ``round_robin`` rotates. A key
+    that gets a 429 is quarantined for ``quarantine_seconds``. If every
+    key is quarantined, the one released soonest is used rather than
+    failing the call.
+    """
+
+    def __init__(
+        self,
+        keys: List[str],
+        strategy: str = "least_loaded",
+        quarantine_seconds: float = 60.0,
+    ) -> None:
+        if not keys:
+            raise ValueError("GEMINI_API_KEY not found in settings or provided")
+        if strategy not in {"least_loaded", "round_robin"}:
+            raise ValueError(f"Unknown key selection strategy: {strategy}")
+        self.strategy = strategy
+        self.quarantine_seconds = quarantine_seconds
+        self.keys = [ApiKeyState(key=key, label=f"key-{index}") for index, key in enumerate(keys)]
+        self._rotation = itertools.cycle(range(len(self.keys)))
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    @property
+    def primary(self) -> ApiKeyState:
+        return self.keys[0]
+
+    def acquire(self, prefer: Optional[ApiKeyState] = None) -> ApiKeyState:
+        """Take a key for one call; ``prefer`` is used unless it is quarantined."""
+        now = time.monotonic()
+        available = [state for state in self.keys if state.quarantined_until <= now]
+        if prefer is not None and prefer in available:
+            state = prefer
+        elif not available:
+            state = min(self.keys, key=lambda s: s.quarantined_until)
+        elif self.strategy == "round_robin":
+            state = self._next_in_rotation(available)
+        else:
+            state = min(available, key=lambda s: (s.in_flight, s.calls_per_minute(now)))
+
+        state.in_flight += 1
+        # Pruned here too: only least_loaded selection reads the window
+        state.record_call(now)
+        llm_key_calls.labels(key=state.label).inc()
+        llm_key_inflight.labels(key=state.label).set(state.in_flight)
+        return state
+
+    def _next_in_rotation(self, available: List[ApiKeyState]) -> ApiKeyState:
+        for _ in range(len(self.keys)):
+            candidate = self.keys[next(self._rotation)]
+            if candidate in available:
+                return candidate
+        return available[0]
+
+    def release(self, state: ApiKeyState, error: Optional[BaseException] = None) -> None:
+        state.in_flight -= 1
+        llm_key_inflight.labels(key=state.label).set(state.in_flight)
+        if error is not None and is_throttle_error(error):
+            state.throttles += 1
+            state.quarantined_until = time.monotonic() + self.quarantine_seconds
+            llm_key_throttles.labels(key=state.label).inc()
+            llm_key_quarantined.labels(key=state.label).set(1)
+            logger.warning(
+                "API key quarantined after throttling",
+                key=state.label,
+                seconds=self.quarantine_seconds,
+            )
+        elif state.quarantined_until and state.quarantined_until <= time.monotonic():
+            state.quarantined_until = 0.0
+            llm_key_quarantined.labels(key=state.label).set(0)
+
+    def stats(self) -> List[Dict[str, Any]]:
+        now = time.monotonic()
+        return [
+            {
+                "key": state.label,
+                "in_flight": state.in_flight,
+                "calls_per_minute": state.calls_per_minute(now),
+                "throttles": state.throttles,
+                "quarantined": state.quarantined_until > now,
+            }
+            for state in self.keys
+        ]
+
+
+_api_key_pool: Optional[ApiKeyPool] = None
+
+
+def get_api_key_pool() -> ApiKeyPool:
+    """Get or create the process-wide API key pool."""
+    global _api_key_pool
+    if _api_key_pool is None:
+        _api_key_pool = ApiKeyPool(
+            configured_api_keys(),
+            strategy=settings.GEMINI_KEY_SELECTION,
+            quarantine_seconds=settings.GEMINI_KEY_QUARANTINE_SECONDS,
+        )
+    return _api_key_pool
@@ -0,0 +1,32 @@
+"""Canonical keys for LLM requests."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+from typing import Any, Mapping, Optional
+
+
+def request_key(
+    model: str,
+    prompt: str,
+    system_instruction: Optional[str],
+    generation_config: Mapping[str, Any],
+) -> str:
+    """Return a stable hash identifying an LLM request.
+
+    Dict ordering and float formatting are normalized through sorted-key JSON,
+    so logically identical requests always map to the same key.
+    """
+    payload = json.dumps(
+        {
+            "model": model,
+            "prompt": prompt,
+            "system_instruction": system_instruction or "",
+            "generation_config": dict(generation_config),
+        },
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
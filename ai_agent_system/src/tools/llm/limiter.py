@@ -0,0 +1,147 @@
+"""Adaptive (AIMD) concurrency limiting for outbound LLM calls."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import deque
+from typing import Deque, Dict, Hashable, Optional
+
+from google.api_core import exceptions as google_exceptions
+
+from src.config.logging_config import get_logger
+from src.utils.metrics import llm_concurrency_limit, llm_limit_decreases, llm_throttle_events
+
+logger = get_logger(component="llm_limiter")
+
+
+def is_throttle_error(exc: BaseException) -> bool:
+    """Return True if ``exc`` signals upstream rate limiting (HTTP 429)."""
+    if isinstance(exc, (google_exceptions.ResourceExhausted, google_exceptions.TooManyRequests)):
+        return True
+    message = str(exc).lower()
+    return "429" in message or "resource exhausted" in message or "resource_exhausted" in message
+
+
+def is_timeout_error(exc: BaseException) -> bool:
+    return isinstance(exc, (google_exceptions.DeadlineExceeded, asyncio.TimeoutError, TimeoutError))
+
+
+class AdaptiveConcurrencyLimiter:
+    """Additive-increase / multiplicative-decrease concurrency limit.
+
+    Every healthy completion raises the limit by ``1 / limit`` (roughly +1
+    per window of ``limit`` calls). Throttling cuts the limit by
+    ``throttle_backoff`` and latency spikes or timeouts by
+    ``latency_backoff``. Decreases are rate limited to one per ``cooldown``
+    seconds so a burst of concurrent 429s counts as a single congestion
+    signal instead of collapsing the limit to the floor.
+
+    A latency spike is judged against the baseline of the same
+    ``latency_key`` (e.g. model and stage), so a long writer call isn't
+    compared with short planner calls.
+    """
+
+    def __init__(
+        self,
+        min_limit: int,
+        max_limit: int,
+        initial_limit: Optional[int] = None,
+        throttle_backoff: float = 0.5,
+        latency_backoff: float = 0.9,
+        latency_spike_factor: float = 2.0,
+        cooldown: float = 1.0,
+        name: str = "gemini",
+    ) -> None:
+        if not 1 <= min_limit <= max_limit:
+            raise ValueError("limits must satisfy 1 <= min_limit <= max_limit")
+        self.name = name
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.throttle_backoff = throttle_backoff
+        self.latency_backoff = latency_backoff
+        self.latency_spike_factor = latency_spike_factor
+        self.cooldown = cooldown
+        self._limit = float(min(max(initial_limit or max_limit, min_limit), max_limit))
+        self._baseline_latency: Dict[Optional[Hashable], float] = {}
+        self._last_decrease = float("-inf")
+        self._waiters: Deque[asyncio.Future[None]] = deque()
+        self.in_flight = 0
+        self.throttle_events = 0
+        llm_concurrency_limit.labels(pool=self.name).set(self.limit)
+
+    @property
+    def limit(self) -> int:
+        return max(self.min_limit, int(self._limit))
+
+    @property
+    def waiting(self) -> int:
+        return len(self._waiters)
+
+    async def acquire(self) -> None:
+        if not self._waiters and self.in_flight < self.limit:
+            self.in_flight += 1
+            return
+
+        waiter: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # A slot was handed over just as we were cancelled; pass it on
+                self.in_flight -= 1
+                self._wake()
+            raise
+        finally:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+
+    def release(
+        self,
+        latency: Optional[float] = None,
+        error: Optional[BaseException] = None,
+        latency_key: Optional[Hashable] = None,
+    ) -> None:
+        """Return a slot and feed the call outcome into the limit."""
+        self.in_flight -= 1
+        if error is not None:
+            if is_throttle_error(error):
+                self.throttle_events += 1
+                llm_throttle_events.labels(pool=self.name).inc()
+                self._decrease(self.throttle_backoff, reason="throttle")
+            elif is_timeout_error(error):
+                self._decrease(self.latency_backoff, reason="timeout")
+        elif latency is not None:
+            baseline = self._baseline_latency.get(latency_key)
+            if baseline is not None and latency > baseline * self.latency_spike_factor:
+                self._decrease(self.latency_backoff, reason="latency")
+            else:
+                self._limit = min(float(self.max_limit), self._limit + 1.0 / self._limit)
+            self._baseline_latency[latency_key] = (
+                latency if baseline is None else baseline * 0.9 + latency * 0.1
+            )
+        llm_concurrency_limit.labels(pool=self.name).set(self.limit)
+        self._wake()
+
+    def _decrease(self, factor: float, reason: str) -> None:
+        now = time.monotonic()
+        if now - self._last_decrease < self.cooldown:
+            return
+        self._last_decrease = now
+        previous = self.limit
+        self._limit = max(float(self.min_limit), self._limit * factor)
+        llm_limit_decreases.labels(pool=self.name, reason=reason).inc()
+        logger.warning(
+            "LLM concurrency limit decreased",
+            reason=reason,
+            previous_limit=previous,
+            limit=self.limit,
+        )
+
+    def _wake(self) -> None:
+        while self._waiters and self.in_flight < self.limit:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self.in_flight += 1
+                waiter.set_result(None)
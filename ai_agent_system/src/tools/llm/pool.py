@@ -0,0 +1,232 @@
+"""Bounded execution pool for blocking LLM SDK calls."""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, AsyncIterator, Callable, Hashable, Iterable, Optional, TypeVar
+
+from src.config.settings import settings
+from src.config.logging_config import get_logger
+from src.tools.llm.key_pool import configured_api_keys
+from src.tools.llm.limiter import AdaptiveConcurrencyLimiter
+from src.utils.metrics import llm_inflight, llm_queue_depth, llm_queue_wait
+
+logger = get_logger(component="llm_pool")
+
+T = TypeVar("T")
+
+_DONE = object()
+
+
+class LLMCallPool:
+    """Runs synchronous SDK calls on a dedicated, sized thread pool.
+
+    An adaptive limiter caps the number of calls in flight; callers beyond
+    the cap wait on the event loop (not in the executor queue), so the time
+    spent waiting for a slot is observable and the loop itself never blocks.
+    The executor is sized for the limiter's ceiling.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int,
+        name: str = "gemini",
+        limiter: Optional[AdaptiveConcurrencyLimiter] = None,
+    ) -> None:
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_concurrency,
+            thread_name_prefix=f"{name}-llm",
+        )
+        self.limiter = limiter or AdaptiveConcurrencyLimiter(
+            min_limit=min(settings.GEMINI_MIN_CONCURRENCY, max_concurrency),
+            max_limit=max_concurrency,
+            initial_limit=settings.GEMINI_INITIAL_CONCURRENCY,
+            name=name,
+        )
+
+    @property
+    def in_flight(self) -> int:
+        return self.limiter.in_flight
+
+    @property
+    def waiting(self) -> int:
+        return self.limiter.waiting
+
+    async def _acquire(self) -> float:
+        start = time.perf_counter()
+        llm_queue_depth.labels(pool=self.name).set(self.waiting + 1)
+        try:
+            await self.limiter.acquire()
+        finally:
+            llm_queue_depth.labels(pool=self.name).set(self.waiting)
+        now = time.perf_counter()
+        llm_queue_wait.labels(pool=self.name).observe(now - start)
+        llm_inflight.labels(pool=self.name).set(self.in_flight)
+        return now
+
+    def _release(
+        self,
+        latency: Optional[float] = None,
+        error: Optional[BaseException] = None,
+        latency_key: Optional[Hashable] = None,
+    ) -> None:
+        self.limiter.release(latency=latency, error=error, latency_key=latency_key)
+        llm_inflight.labels(pool=self.name).set(self.in_flight)
+
+    async def run(
+        self,
+        fn: Callable[..., T],
+        *args: Any,
+        on_done: Optional[Callable[[Optional[BaseException]], None]] = None,
+        latency_key: Optional[Hashable] = None,
+        **kwargs: Any,
+    ) -> T:
+        """Run ``fn(*args, **kwargs)`` in the pool once a slot is free.
+
+        The slot is held until the worker thread returns, even if the caller
+        is cancelled first (e.g. a hedge that lost), so the limiter never
+        counts fewer calls than are really running. ``on_done`` is called on
+        the event loop at the same point with the call's error, or None.
+        ``latency_key`` names the kind of call (model, stage) whose latency
+        baseline the limiter compares this one against.
+        """
+        try:
+            started = await self._acquire()
+        except BaseException as exc:
+            if on_done is not None:
+                on_done(exc)
+            raise
+        loop = asyncio.get_running_loop()
+        future = self._executor.submit(functools.partial(fn, *args, **kwargs))
+
+        def _finished(done: Future[T]) -> None:
+            error = asyncio.CancelledError() if done.cancelled() else done.exception()
+            latency = None if error is not None else time.perf_counter() - started
+            try:
+                loop.call_soon_threadsafe(self._finish, latency, error, on_done, latency_key)
+            except RuntimeError:
+                # Event loop already closed; nobody is accounting anymore
+                pass
+
+        future.add_done_callback(_finished)
+        return await asyncio.wrap_future(future, loop=loop)
+
+    def _finish(
+        self,
+        latency: Optional[float],
+        error: Optional[BaseException],
+        on_done: Optional[Callable[[Optional[BaseException]], None]],
+        latency_key: Optional[Hashable] = None,
+    ) -> None:
+        self._release(latency=latency, error=error, latency_key=latency_key)
+        if on_done is not None:
+            on_done(error)
+
+    async def stream(
+        self,
+        fn: Callable[..., Iterable[T]],
+        *args: Any,
+        on_done: Optional[Callable[[Optional[BaseException]], None]] = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[T]:
+        """Drain the blocking iterator returned by ``fn`` in the pool.
+
+        Items are handed to the event loop as they arrive. The slot is held
+        until the producer thread finishes, even if the consumer stops early;
+        ``on_done`` is called on the event loop at that point, as in run().
+        """
+        try:
+            await self._acquire()
+        except BaseException as exc:
+            if on_done is not None:
+                on_done(exc)
+            raise
+        loop = asyncio.get_running_loop()
+        failure: list[BaseException] = []
+        queue: asyncio.Queue[tuple[Any, Optional[BaseException]]] = asyncio.Queue()
+        stopped = threading.Event()
+
+        def _put(item: Any, error: Optional[BaseException] = None) -> None:
+            try:
+                loop.call_soon_threadsafe(queue.put_nowait, (item, error))
+            except RuntimeError:
+                # Event loop already closed; nobody is listening anymore
+                stopped.set()
+
+        def _produce() -> None:
+            try:
+                for item in fn(*args, **kwargs):
+                    if stopped.is_set():
+                        return
+                    _put(item)
+            except BaseException as exc:  # noqa: BLE001
+                failure.append(exc)
+                _put(_DONE, exc)
+                return
+            _put(_DONE)
+
+        # Stream duration depends on output length, so only errors feed the limiter
+        future = loop.run_in_executor(self._executor, _produce)
+
+        def _finished(_: asyncio.Future[None]) -> None:
+            error = failure[0] if failure else None
+            self._release(error=error)
+            if on_done is not None:
+                on_done(error)
+
+        future.add_done_callback(_finished)
+        try:
+            while True:
+                item, error = await queue.get()
+                if item is _DONE:
+                    if error is not None:
+                        raise error
+                    return
+                yield item
+        finally:
+            stopped.set()
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "max_concurrency": self.max_concurrency,
+            "limit": self.limiter.limit,
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "throttle_events": self.limiter.throttle_events,
+        }
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+_call_pool: Optional[LLMCallPool] = None
+
+
+def get_llm_call_pool() -> LLMCallPool:
+    """Get or create the process-wide LLM call pool.
+
+    The ceiling scales with the number of configured API keys, since upstream
+    quota is enforced per key.
+    """
+    global _call_pool
+    if _call_pool is None:
+        key_count = max(1, len(configured_api_keys()))
+        _call_pool = LLMCallPool(max_concurrency=settings.GEMINI_MAX_CONCURRENCY * key_count)
+        logger.info("LLM call pool initialized", max_concurrency=_call_pool.max_concurrency)
+    return _call_pool
+
+
+def shutdown_llm_call_pool() -> None:
+    """Shut down the process-wide LLM call pool."""
+    global _call_pool
+    if _call_pool:
+        _call_pool.shutdown()
+        _call_pool = None
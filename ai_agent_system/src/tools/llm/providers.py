@@ -0,0 +1,32 @@
+"""Selection of the process-wide LLM provider."""
+
+from __future__ import annotations
+
+from typing import Optional
+
+from src.config.settings import settings
+from src.config.logging_config import get_logger
+from src.tools.llm.base import LLMProvider
+from src.tools.llm.fake import fake_provider_from_settings
+from src.tools.llm.router import get_model_router
+
+logger = get_logger(component="llm_provider")
+
+_fake_provider: Optional[LLMProvider] = None
+
+
+def get_llm_provider() -> LLMProvider:
+    """Return the provider selected by LLM_PROVIDER.
+
+    ``gemini`` is the stage-routed Gemini router; ``fake`` is the offline
+    FakeLLMProvider configured from the FAKE_LLM_* settings.
+    """
+    global _fake_provider
+    if settings.LLM_PROVIDER == "fake":
+        if _fake_provider is None:
+            _fake_provider = fake_provider_from_settings()
+            logger.warning(
+                "Using offline fake LLM provider", latency_ms=settings.FAKE_LLM_LATENCY_MS
+            )
+        return _fake_provider
+    return get_model_router()
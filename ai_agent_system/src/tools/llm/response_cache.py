@@ -0,0 +1,76 @@
+"""Bounded in-process cache for deterministic LLM responses."""
+
+from __future__ import annotations
+
+import copy
+import threading
+from typing import Any, Dict, Mapping, Optional
+
+from cachetools import TTLCache
+
+from src.config.settings import settings
+from src.utils.metrics import llm_response_cache_requests, llm_response_cache_size
+
+
+class ResponseCache:
+    """LRU cache with per-entry TTL for ``generate_content`` results.
+
+    Only low-temperature requests are cacheable by default: above
+    ``max_temperature`` callers expect varied samples, so a cached answer
+    would change behavior rather than just latency. Empty (e.g.
+    safety-blocked) responses are never stored.
+    """
+
+    def __init__(self, maxsize: int, ttl: float, max_temperature: float) -> None:
+        self.max_temperature = max_temperature
+        self._entries: TTLCache[str, Dict[str, Any]] = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def cacheable(self, generation_config: Mapping[str, Any]) -> bool:
+        temperature = generation_config.get("temperature")
+        return temperature is not None and float(temperature) <= self.max_temperature
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            value = self._entries.get(key)
+        if value is None:
+            self.misses += 1
+            llm_response_cache_requests.labels(result="miss").inc()
+            return None
+        self.hits += 1
+        llm_response_cache_requests.labels(result="hit").inc()
+        return copy.deepcopy(value)
+
+    def set(self, key: str, value: Dict[str, Any]) -> None:
+        if not value.get("text"):
+            return
+        with self._lock:
+            self._entries[key] = copy.deepcopy(value)
+            llm_response_cache_size.set(len(self._entries))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            llm_response_cache_size.set(0)
+
+    def stats(self) -> Dict[str, int]:
+        return {"size": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+_response_cache: Optional[ResponseCache] = None
+
+
+def get_llm_response_cache() -> Optional[ResponseCache]:
+    """Get the process-wide response cache, or None when disabled."""
+    global _response_cache
+    if not settings.GEMINI_RESPONSE_CACHE_ENABLED:
+        return None
+    if _response_cache is None:
+        _response_cache = ResponseCache(
+            maxsize=settings.GEMINI_RESPONSE_CACHE_SIZE,
+            ttl=settings.GEMINI_RESPONSE_CACHE_TTL,
+            max_temperature=settings.GEMINI_RESPONSE_CACHE_MAX_TEMPERATURE,
+        )
+    return _response_cache
@@ -0,0 +1,169 @@
+"""Stage-to-model routing with escalation to a stronger tier."""
+
+from __future__ import annotations
+
+import time
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
+
+from src.config.settings import settings
+from src.config.logging_config import get_logger
+from src.tools.llm.autotune import get_max_tokens_tuner
+from src.tools.llm.base import LLMProvider
+from src.tools.llm.gemini_client import GeminiClient, get_gemini_client
+from src.tools.llm.tokens import count_tokens
+from src.utils.metrics import llm_escalations, llm_tier_latency, llm_tier_tokens
+
+logger = get_logger(component="model_router")
+
+
+class ModelRouter(LLMProvider):
+    """Sends each agent stage to its configured model tier.
+
+    Stages without an explicit tier use ``default_model``. When a cheaper
+    tier returns an empty or safety-blocked answer the request is repeated
+    once on ``escalation_model``. Latency and token usage are recorded per
+    (stage, model) so routing can be tuned against real traffic.
+    """
+
+    def __init__(
+        self,
+        stage_models: Dict[str, str],
+        default_model: str,
+        escalation_model: Optional[str] = None,
+        client_factory: Callable[[str], GeminiClient] = get_gemini_client,
+    ) -> None:
+        self.stage_models = dict(stage_models)
+        self.default_model = default_model
+        self.escalation_model = escalation_model
+        self.client_factory = client_factory
+
+    def model_for(self, stage: Optional[str]) -> str:
+        return self.stage_models.get(stage or "", self.default_model)
+
+    def client_for(self, stage: Optional[str]) -> GeminiClient:
+        return self.client_factory(self.model_for(stage))
+
+    async def generate_content(
+        self,
+        prompt: str,
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = None,
+        *,
+        stage: Optional[str] = None,
+        escalate: bool = True,
+        **kwargs: Any,
+    ) -> Dict[str, Any]:
+        stage = stage or "default"
+        model = self.model_for(stage)
+        response = await self._generate(model, stage, prompt, temperature, max_tokens, dict(kwargs))
+
+        reason = _escalation_reason(response)
+        if escalate and reason and self.escalation_model and self.escalation_model != model:
+            llm_escalations.labels(stage=stage, reason=reason).inc()
+            logger.info(
+                "Escalating to stronger model",
+                stage=stage,
+                from_model=model,
+                to_model=self.escalation_model,
+                reason=reason,
+            )
+            response = await self._generate(
+                self.escalation_model, stage, prompt, temperature, max_tokens, dict(kwargs)
+            )
+            response["escalated_from"] = model
+        return response
+
+    async def _generate(
+        self,
+        model: str,
+        stage: str,
+        prompt: str,
+        temperature: float,
+        max_tokens: Optional[int],
+        kwargs: Dict[str, Any],
+    ) -> Dict[str, Any]:
+        start = time.perf_counter()
+        response = await self.client_factory(model).generate_content(
+            prompt=prompt,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            stage=stage,
+            **kwargs,
+        )
+        if not response.get("cached"):
+            llm_tier_latency.labels(stage=stage, model=model).observe(time.perf_counter() - start)
+            usage = response.get("usage") or {}
+            for kind in ("prompt_tokens", "completion_tokens"):
+                llm_tier_tokens.labels(stage=stage, model=model, kind=kind).inc(
+                    usage.get(kind) or 0
+                )
+            get_max_tokens_tuner().record_response(stage, response, max_tokens)
+        return response
+
+    async def stream_content(
+        self,
+        prompt: str,
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = None,
+        *,
+        stage: Optional[str] = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[str]:
+        """Stream from the stage's tier. Streams are never escalated."""
+        chunks: List[str] = []
+        async for chunk in self.client_for(stage).stream_content(
+            prompt=prompt,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            **kwargs,
+        ):
+            chunks.append(chunk)
+            yield chunk
+        # Streams carry no usage; estimate and treat reaching the cap as a hit
+        completion_tokens = count_tokens("".join(chunks))
+        get_max_tokens_tuner().record(
+            stage or "default",
+            completion_tokens,
+            hit_cap=max_tokens is not None and completion_tokens >= max_tokens,
+        )
+
+    async def chat(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = None,
+        *,
+        stage: Optional[str] = None,
+        conversation_id: Optional[str] = None,
+        **kwargs: Any,
+    ) -> Dict[str, Any]:
+        return await self.client_for(stage).chat(
+            messages,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            conversation_id=conversation_id,
+            **kwargs,
+        )
+
+
+def _escalation_reason(response: Dict[str, Any]) -> Optional[str]:
+    if response.get("finish_reason") == "SAFETY":
+        return "safety"
+    if not (response.get("text") or "").strip():
+        return "empty"
+    return None
+
+
+_model_router: Optional[ModelRouter] = None
+
+
+def get_model_router() -> ModelRouter:
+    """Get or create the process-wide model router."""
+    global _model_router
+    if _model_router is None:
+        _model_router = ModelRouter(
+            stage_models=settings.GEMINI_STAGE_MODELS,
+            default_model=settings.GEMINI_DEFAULT_MODEL,
+            escalation_model=settings.GEMINI_ESCALATION_MODEL,
+        )
+    return _model_router
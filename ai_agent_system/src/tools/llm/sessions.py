@@ -0,0 +1,103 @@
+"""Pool of live chat sessions keyed by conversation id."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from src.tools.llm.key_pool import ApiKeyState
+from src.utils.metrics import llm_chat_session_requests, llm_chat_sessions
+
+
+@dataclass(eq=False)
+class PooledChatSession:
+    """A live SDK ChatSession plus what it was built with.
+
+    ``chat`` and ``api_key`` are bound on the first turn, once a key has been
+    picked; ``history`` is the conversation so far.
+    """
+
+    system_instruction: Optional[str]
+    initial_history: List[Dict[str, Any]] = field(default_factory=list)
+    chat: Any = None
+    api_key: Optional[ApiKeyState] = None
+    last_used: float = field(default_factory=time.monotonic)
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+
+    @property
+    def history(self) -> List[Any]:
+        return list(self.chat.history) if self.chat is not None else list(self.initial_history)
+
+    @property
+    def turns(self) -> int:
+        return len(self.history)
+
+
+class ChatSessionPool:
+    """Bounded LRU of chat sessions with idle eviction.
+
+    Keeping the SDK session alive means a follow-up turn only sends the new
+    message instead of rebuilding the whole history on every call. Sessions
+    idle for longer than ``idle_timeout`` seconds are dropped, and the least
+    recently used session is evicted when the pool is full.
+    """
+
+    def __init__(self, max_sessions: int, idle_timeout: float, name: str = "gemini") -> None:
+        self.name = name
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self._sessions: OrderedDict[str, PooledChatSession] = OrderedDict()
+        self.reused = 0
+        self.created = 0
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def get(self, conversation_id: str) -> Optional[PooledChatSession]:
+        self.evict_idle()
+        session = self._sessions.get(conversation_id)
+        if session is not None:
+            self._sessions.move_to_end(conversation_id)
+            session.last_used = time.monotonic()
+        return session
+
+    def put(self, conversation_id: str, session: PooledChatSession) -> None:
+        self._sessions[conversation_id] = session
+        self._sessions.move_to_end(conversation_id)
+        while len(self._sessions) > self.max_sessions:
+            self._sessions.popitem(last=False)
+        llm_chat_sessions.labels(client=self.name).set(len(self._sessions))
+
+    def discard(self, conversation_id: str) -> None:
+        self._sessions.pop(conversation_id, None)
+        llm_chat_sessions.labels(client=self.name).set(len(self._sessions))
+
+    def record(self, reused: bool) -> None:
+        if reused:
+            self.reused += 1
+        else:
+            self.created += 1
+        llm_chat_session_requests.labels(
+            client=self.name, result="reused" if reused else "created"
+        ).inc()
+
+    def evict_idle(self) -> None:
+        cutoff = time.monotonic() - self.idle_timeout
+        while self._sessions:
+            conversation_id, oldest = next(iter(self._sessions.items()))
+            if oldest.last_used >= cutoff or oldest.lock.locked():
+                break
+            del self._sessions[conversation_id]
+        llm_chat_sessions.labels(client=self.name).set(len(self._sessions))
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.reused + self.created
+        return {
+            "size": len(self._sessions),
+            "reused": self.reused,
+            "created": self.created,
+            "reuse_rate": self.reused / total if total else 0.0,
+        }
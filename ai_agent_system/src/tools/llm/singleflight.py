@@ -0,0 +1,53 @@
+"""Coalescing of identical concurrent LLM requests."""
+
+from __future__ import annotations
+
+import asyncio
+import copy
+from typing import Any, Awaitable, Callable, Dict, TypeVar
+
+from src.utils.metrics import llm_coalesced_calls
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """Share one in-flight call among all concurrent callers with the same key.
+
+    The first caller (the leader) starts the call; callers arriving while it
+    is still running await the same task and receive a copy of its result or
+    exception. Cancelling one caller never cancels the shared call.
+    """
+
+    def __init__(self, name: str = "gemini") -> None:
+        self.name = name
+        self._calls: Dict[str, asyncio.Task[Any]] = {}
+        self.leaders = 0
+        self.merged = 0
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        task = self._calls.get(key)
+        if task is not None:
+            self.merged += 1
+            llm_coalesced_calls.labels(client=self.name, result="merged").inc()
+            return copy.deepcopy(await asyncio.shield(task))
+
+        self.leaders += 1
+        llm_coalesced_calls.labels(client=self.name, result="leader").inc()
+        task = asyncio.ensure_future(fn())
+        self._calls[key] = task
+        task.add_done_callback(lambda done: self._forget(key, done))
+        return await asyncio.shield(task)
+
+    def _forget(self, key: str, task: asyncio.Task[Any]) -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        if not task.cancelled():
+            # Mark the exception retrieved in case every caller was cancelled
+            task.exception()
+
+    def stats(self) -> Dict[str, int]:
+        return {"in_flight": len(self._calls), "leaders": self.leaders, "merged": self.merged}
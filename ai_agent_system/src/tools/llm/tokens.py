@@ -0,0 +1,262 @@
+"""Token estimation and prompt budgeting."""
+
+from __future__ import annotations
+
+import functools
+import math
+import re
+from collections.abc import AsyncIterable
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict, Iterable, Iterator, List, Optional, Sequence, Union
+
+from src.config.settings import settings
+from src.utils.metrics import llm_prompt_sections_trimmed, llm_prompt_tokens
+
+_PIECES = re.compile(r"\w+|[^\w\s]")
+_LINES = re.compile(r"[^\n]*\n|[^\n]+")
+_WORDS = re.compile(r"\S+\s*|\s+")
+
+# Fragments at most this long go through the memoized counter; longer text is
+# mostly one-off agent output and would only churn the cache
+CACHEABLE_FRAGMENT_CHARS = 4096
+
+TRUNCATION_MARKER = " …[truncated]"
+
+
+def _estimate(text: str) -> int:
+    # Roughly one token per 4 characters of a word, one per punctuation mark
+    return sum(math.ceil(len(piece) / 4) for piece in _PIECES.findall(text))
+
+
+@functools.lru_cache(maxsize=4096)
+def _estimate_cached(text: str) -> int:
+    return _estimate(text)
+
+
+def count_tokens(text: Optional[str]) -> int:
+    """Estimate the number of tokens in ``text`` without calling the API.
+
+    Short fragments such as system instructions and templates are repeated on
+    every call, so their counts are memoized.
+    """
+    if not text:
+        return 0
+    if len(text) <= CACHEABLE_FRAGMENT_CHARS:
+        return _estimate_cached(text)
+    return _estimate(text)
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Cut ``text`` to at most ``max_tokens`` tokens (marker included) on a word boundary."""
+    if count_tokens(text) <= max_tokens:
+        return text
+    max_tokens -= count_tokens(TRUNCATION_MARKER)
+    if max_tokens <= 0:
+        return ""
+    kept = 0
+    end = 0
+    for match in _PIECES.finditer(text):
+        kept += math.ceil(len(match.group()) / 4)
+        if kept > max_tokens:
+            break
+        end = match.end()
+    return text[:end].rstrip() + TRUNCATION_MARKER
+
+
+def _split_oversized(piece: str, max_tokens: int) -> Iterator[str]:
+    """Yield ``piece`` whole, or cut between words (then within them) if it is over budget."""
+    if _estimate(piece) <= max_tokens:
+        yield piece
+        return
+    for match in _WORDS.finditer(piece):
+        word = match.group()
+        if _estimate(word) <= max_tokens:
+            yield word
+        else:
+            yield from _split_word(word, max_tokens)
+
+
+def _split_word(word: str, max_tokens: int) -> Iterator[str]:
+    # Cut between estimator pieces; a run of word characters that is itself
+    # over budget is cut every max_tokens * 4 characters
+    step = max_tokens * 4
+    start = used = 0
+    for match in _PIECES.finditer(word):
+        tokens = math.ceil(len(match.group()) / 4)
+        if used + tokens <= max_tokens:
+            used += tokens
+            continue
+        if match.start() > start:
+            yield word[start : match.start()]
+        start, used = match.start(), tokens
+        while used > max_tokens:
+            yield word[start : start + step]
+            start += step
+            used = math.ceil((match.end() - start) / 4)
+    yield word[start:]
+
+
+class _Chunker:
+    """Packs text pieces into chunks of at most ``max_tokens`` tokens."""
+
+    def __init__(self, max_tokens: int) -> None:
+        if max_tokens < 1:
+            raise ValueError("max_tokens must be at least 1")
+        self.max_tokens = max_tokens
+        self._buffer: List[str] = []
+        self._used = 0
+
+    def feed(self, piece: str) -> Iterator[str]:
+        """Add ``piece``; yield every chunk it completes."""
+        if not piece:
+            return
+        for part in _split_oversized(piece, self.max_tokens):
+            # Not memoized: document text is one-off and would churn the cache
+            tokens = _estimate(part)
+            if self._buffer and self._used + tokens > self.max_tokens:
+                yield "".join(self._buffer)
+                self._buffer, self._used = [], 0
+            self._buffer.append(part)
+            self._used += tokens
+
+    def flush(self) -> Iterator[str]:
+        if self._buffer:
+            yield "".join(self._buffer)
+            self._buffer, self._used = [], 0
+
+
+def chunk_text(source: Union[str, Iterable[str]], max_tokens: int) -> Iterator[str]:
+    """Split text into consecutive chunks of at most ``max_tokens`` tokens.
+
+    ``source`` is a string or an iterable of text pieces such as the lines
+    of an open file. Pieces are consumed lazily and only the chunk being
+    built is held in memory. Lines stay whole unless one alone is over the
+    budget.
+    """
+    chunker = _Chunker(max_tokens)
+    pieces = (
+        (match.group() for match in _LINES.finditer(source)) if isinstance(source, str) else source
+    )
+    for piece in pieces:
+        yield from chunker.feed(piece)
+    yield from chunker.flush()
+
+
+async def achunk_text(
+    source: Union[str, Iterable[str], AsyncIterable[str]], max_tokens: int
+) -> AsyncIterator[str]:
+    """chunk_text() for text that arrives asynchronously, e.g. a request body.
+
+    Pieces of an async source may end mid-line or mid-word; they are
+    re-split on line breaks so chunks hold whole lines as they would for the
+    same text read from a file. A line with no break in sight is fed on once
+    it reaches a chunk's worth of characters, so one huge line doesn't
+    accumulate in memory.
+    """
+    if not isinstance(source, AsyncIterable):
+        for chunk in chunk_text(source, max_tokens):
+            yield chunk
+        return
+    chunker = _Chunker(max_tokens)
+    step = max_tokens * 4
+    carry = ""
+    async for text in source:
+        carry += text
+        complete, newline, carry = carry.rpartition("\n")
+        complete += newline
+        pieces = [match.group() for match in _LINES.finditer(complete)]
+        if len(carry) > step:
+            # Feed an over-long line up to its last space; with no space at
+            # all, feed it whole and let _split_oversized cut the word
+            cut = carry.rfind(" ") + 1 or len(carry)
+            pieces.extend(match.group() for match in _WORDS.finditer(carry[:cut]))
+            carry = carry[cut:]
+        for piece in pieces:
+            for chunk in chunker.feed(piece):
+                yield chunk
+    for chunk in chunker.feed(carry):
+        yield chunk
+    for chunk in chunker.flush():
+        yield chunk
+
+
+@dataclass
+class PromptSection:
+    """One named part of a prompt. Higher ``priority`` is trimmed last;
+    ``priority=None`` marks a section that is never trimmed."""
+
+    name: str
+    text: str
+    priority: Optional[int] = 0
+    min_tokens: int = 0
+
+    @property
+    def tokens(self) -> int:
+        return count_tokens(self.text)
+
+
+def stage_token_budget(stage: str) -> Optional[int]:
+    """Prompt token budget configured for ``stage``, if any."""
+    return settings.LLM_STAGE_TOKEN_BUDGETS.get(stage)
+
+
+def fit_sections(
+    sections: Sequence[PromptSection],
+    budget: Optional[int],
+    stage: str = "default",
+    overhead: int = 0,
+) -> Dict[str, str]:
+    """Return section texts trimmed so their total fits ``budget`` tokens.
+
+    ``overhead`` is the cost of the fixed template and system instruction.
+    The lowest-priority section is cut first, down to its ``min_tokens``,
+    before the next one is touched.
+    """
+    texts = {section.name: section.text for section in sections}
+    counts = {section.name: section.tokens for section in sections}
+    total = overhead + sum(counts.values())
+    if budget is not None and total > budget:
+        trimmable = sorted(
+            (section for section in sections if section.priority is not None),
+            key=lambda section: section.priority,
+        )
+        for section in trimmable:
+            excess = total - budget
+            if excess <= 0:
+                break
+            allowed = max(section.min_tokens, counts[section.name] - excess)
+            if allowed >= counts[section.name]:
+                continue
+            texts[section.name] = truncate_to_tokens(section.text, allowed)
+            new_count = count_tokens(texts[section.name])
+            total -= counts[section.name] - new_count
+            counts[section.name] = new_count
+            llm_prompt_sections_trimmed.labels(stage=stage, section=section.name).inc()
+    llm_prompt_tokens.labels(stage=stage).observe(total)
+    return texts
+
+
+def response_usage(response: Any, prompt: str = "", text: str = "") -> Dict[str, int]:
+    """Token usage reported by Gemini, estimated locally when it is missing.
+
+    ``thoughts_tokens`` (thinking models only) are left out of
+    ``completion_tokens`` but still spent from ``max_output_tokens``.
+    """
+    metadata = getattr(response, "usage_metadata", None)
+    prompt_tokens = getattr(metadata, "prompt_token_count", None)
+    completion_tokens = getattr(metadata, "candidates_token_count", None)
+    usage = {
+        "prompt_tokens": prompt_tokens if prompt_tokens is not None else count_tokens(prompt),
+        "completion_tokens": completion_tokens
+        if completion_tokens is not None
+        else count_tokens(text),
+    }
+    thoughts_tokens = getattr(metadata, "thoughts_token_count", None)
+    if thoughts_tokens:
+        usage["thoughts_tokens"] = thoughts_tokens
+    return usage
+
+
+def fragments_tokens(fragments: List[Optional[str]]) -> int:
+    """Total tokens of fixed prompt fragments (template, system instruction)."""
+    return sum(count_tokens(fragment) for fragment in fragments)
@@ -0,0 +1,133 @@
+"""Record/replay of upstream calls (Gemini, Open-Meteo) for reproducible benchmarks."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, AsyncIterator, Awaitable, Callable, DefaultDict, Dict, List, Optional
+
+from src.config.settings import settings
+from src.config.logging_config import get_logger
+from src.utils.exceptions import CassetteMissError
+
+logger = get_logger(component="cassette")
+
+
+class Cassette:
+    """JSON-lines file of upstream responses and how long they took.
+
+    In ``record`` mode every successful call is passed through and appended
+    to ``path`` with its latency (and, for streams, the offset of each
+    chunk). In ``replay`` mode calls are answered from the file without
+    touching the network, sleeping for the recorded latency when
+    ``replay_latency`` is ``recorded`` or not at all when it is ``none``.
+    Calls recorded several times under the same key are replayed in
+    rotation. A call missing from the cassette raises CassetteMissError.
+    """
+
+    def __init__(self, path: str, mode: str = "replay", replay_latency: str = "recorded") -> None:
+        if mode not in {"record", "replay"}:
+            raise ValueError(f"Unknown cassette mode: {mode}")
+        if replay_latency not in {"recorded", "none"}:
+            raise ValueError(f"Unknown replay latency: {replay_latency}")
+        self.path = Path(path)
+        self.mode = mode
+        self.replay_latency = replay_latency
+        self._entries: DefaultDict[str, List[Dict[str, Any]]] = defaultdict(list)
+        self._cursor: DefaultDict[str, int] = defaultdict(int)
+        self._write_lock = threading.Lock()
+        if mode == "replay":
+            self._load()
+        else:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+
+    def _load(self) -> None:
+        with self.path.open(encoding="utf-8") as handle:
+            for line in handle:
+                if line.strip():
+                    entry = json.loads(line)
+                    self._entries[f"{entry['kind']}:{entry['key']}"].append(entry)
+        logger.info(
+            "Cassette loaded",
+            path=str(self.path),
+            calls=sum(len(v) for v in self._entries.values()),
+        )
+
+    def _write(self, entry: Dict[str, Any]) -> None:
+        line = json.dumps(entry, ensure_ascii=False, default=str)
+        with self._write_lock, self.path.open("a", encoding="utf-8") as handle:
+            handle.write(line + "\n")
+
+    async def _append(self, entry: Dict[str, Any]) -> None:
+        # File I/O off the event loop; the lock keeps concurrent lines whole
+        await asyncio.to_thread(self._write, entry)
+
+    def _next(self, kind: str, key: str) -> Dict[str, Any]:
+        entries = self._entries.get(f"{kind}:{key}")
+        if not entries:
+            raise CassetteMissError(f"No {kind} recording for key {key} in {self.path}")
+        index = self._cursor[f"{kind}:{key}"]
+        self._cursor[f"{kind}:{key}"] = index + 1
+        return entries[index % len(entries)]
+
+    async def _sleep(self, seconds: float) -> None:
+        if self.replay_latency == "recorded" and seconds > 0:
+            await asyncio.sleep(seconds)
+
+    async def call(self, kind: str, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Replay or record one request/response call."""
+        if self.mode == "replay":
+            entry = self._next(kind, key)
+            await self._sleep(entry["latency"])
+            return entry["response"]
+
+        start = time.perf_counter()
+        response = await fn()
+        await self._append(
+            {"kind": kind, "key": key, "latency": time.perf_counter() - start, "response": response}
+        )
+        return response
+
+    async def stream(
+        self, kind: str, key: str, fn: Callable[[], AsyncIterator[str]]
+    ) -> AsyncIterator[str]:
+        """Replay or record a stream of text chunks with their timing."""
+        if self.mode == "replay":
+            entry = self._next(kind, key)
+            previous = 0.0
+            for offset, chunk in entry["chunks"]:
+                await self._sleep(offset - previous)
+                previous = offset
+                yield chunk
+            return
+
+        start = time.perf_counter()
+        chunks: List[List[Any]] = []
+        async for chunk in fn():
+            chunks.append([time.perf_counter() - start, chunk])
+            yield chunk
+        await self._append(
+            {"kind": kind, "key": key, "latency": time.perf_counter() - start, "chunks": chunks}
+        )
+
+
+_cassette: Optional[Cassette] = None
+
+
+def get_cassette() -> Optional[Cassette]:
+    """Process-wide cassette, or None when CASSETTE_MODE is ``off``."""
+    global _cassette
+    if settings.CASSETTE_MODE == "off":
+        return None
+    if _cassette is None:
+        _cassette = Cassette(
+            settings.CASSETTE_PATH,
+            mode=settings.CASSETTE_MODE,
+            replay_latency=settings.CASSETTE_REPLAY_LATENCY,
+        )
+        logger.warning("Upstream cassette active", mode=_cassette.mode, path=str(_cassette.path))
+    return _cassette
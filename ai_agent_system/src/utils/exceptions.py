@@ -8,3 +8,11 @@ class AgentExecutionError(AgentSystemError):
 
 class ToolExecutionError(AgentSystemError):
     """Tool failed during execution."""
+
+
+class CircuitOpenError(AgentSystemError):
+    """Upstream dependency is failing; call rejected without being attempted."""
+
+
+class CassetteMissError(AgentSystemError):
+    """Replay cassette has no recording for the requested call."""
@@ -9,6 +9,7 @@ from sqlalchemy.ext.asyncio import create_async_engine
 
 from src.config.settings import settings
 from src.config.logging_config import get_logger
+from src.tools.llm.circuit_breaker import CircuitState, get_llm_circuit_breaker
 
 logger = get_logger(component="health")
 
@@ -36,10 +37,18 @@ async def check_database() -> Dict[str, Any]:
         return {"database": f"error: {exc}"}
 
 
+def check_llm_circuit() -> Dict[str, Any]:
+    breaker = get_llm_circuit_breaker()
+    summary: Dict[str, Any] = {"llm_circuit": breaker.state.value}
+    if breaker.state is not CircuitState.CLOSED:
+        summary["llm"] = f"error: circuit {breaker.state.value}"
+    return summary
+
+
 async def health_summary() -> Dict[str, Any]:
     redis_task = asyncio.create_task(check_redis())
     db_task = asyncio.create_task(check_database())
-    results = await asyncio.gather(redis_task, db_task)
+    results = [*await asyncio.gather(redis_task, db_task), check_llm_circuit()]
     summary: Dict[str, Any] = {"status": "ok"}
     for result in results:
         summary.update(result)
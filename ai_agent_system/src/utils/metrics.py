@@ -2,12 +2,161 @@ from __future__ import annotations
 
 from typing import Callable
 
-from prometheus_client import Counter, Histogram, CollectorRegistry, CONTENT_TYPE_LATEST, generate_latest
+from prometheus_client import (
+    Counter,
+    Gauge,
+    Histogram,
+    CollectorRegistry,
+    CONTENT_TYPE_LATEST,
+    generate_latest,
+)
 from fastapi import Response
 
 request_counter = Counter("api_requests_total", "Total API requests", ["method", "path", "status_code"])
 request_latency = Histogram("api_request_latency_seconds", "API request latency", ["method", "path"])
 
+orchestrator_stage_latency = Histogram(
+    "orchestrator_stage_latency_seconds", "Latency of orchestrator contributor stages", ["stage"]
+)
+orchestrator_stage_timeouts = Counter(
+    "orchestrator_stage_timeouts_total",
+    "Orchestrator stages abandoned after their timeout",
+    ["stage"],
+)
+orchestrator_intents = Counter(
+    "orchestrator_intents_total", "Orchestrator requests by locally classified intent", ["intent"]
+)
+orchestrator_stage_skips = Counter(
+    "orchestrator_stage_skips_total",
+    "Orchestrator stages skipped because the intent didn't need them",
+    ["stage", "intent"],
+)
+orchestrator_degraded = Counter(
+    "orchestrator_degraded_responses_total",
+    "Orchestrator answers assembled locally after a failure",
+    ["stage"],
+)
+orchestrator_stage_cache_requests = Counter(
+    "orchestrator_stage_cache_requests_total",
+    "Orchestrator stage memo lookups",
+    ["stage", "result"],
+)
+orchestrator_prefetch = Counter(
+    "orchestrator_prefetch_total",
+    "Stages started before planning finished, by outcome (used, mismatched or cancelled)",
+    ["stage", "outcome"],
+)
+orchestrator_map_reduce_steps = Histogram(
+    "orchestrator_map_reduce_steps",
+    "Plan steps expanded by parallel writer calls per request",
+    buckets=(1, 2, 3, 4, 5, 6, 8, 10),
+)
+orchestrator_pipeline_overlap = Histogram(
+    "orchestrator_pipeline_overlap_seconds", "Time the writer ran alongside the streaming planner"
+)
+writer_document_chunks = Histogram(
+    "writer_document_chunks",
+    "Chunks a long writer input was split into",
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256, 512),
+)
+
+llm_inflight = Gauge("llm_inflight_calls", "LLM calls currently executing", ["pool"])
+llm_queue_depth = Gauge("llm_queue_depth", "LLM calls waiting for a free slot", ["pool"])
+llm_queue_wait = Histogram(
+    "llm_queue_wait_seconds", "Time LLM calls wait for a free slot", ["pool"]
+)
+llm_concurrency_limit = Gauge(
+    "llm_concurrency_limit", "Current adaptive LLM concurrency limit", ["pool"]
+)
+llm_throttle_events = Counter(
+    "llm_throttle_events_total", "LLM calls rejected with 429/resource exhausted", ["pool"]
+)
+llm_coalesced_calls = Counter(
+    "llm_coalesced_calls_total",
+    "LLM calls by singleflight role (leader or merged)",
+    ["client", "result"],
+)
+llm_response_cache_requests = Counter(
+    "llm_response_cache_requests_total", "In-process LLM response cache lookups", ["result"]
+)
+llm_response_cache_size = Gauge(
+    "llm_response_cache_entries", "Entries in the in-process LLM response cache"
+)
+llm_model_cache_requests = Counter(
+    "llm_model_cache_requests_total",
+    "Lookups of memoized per-instruction LLM models",
+    ["client", "result"],
+)
+llm_model_cache_size = Gauge(
+    "llm_model_cache_entries", "Memoized per-instruction LLM models", ["client"]
+)
+llm_circuit_state = Gauge(
+    "llm_circuit_state", "LLM circuit breaker state (0=closed, 1=half_open, 2=open)", ["breaker"]
+)
+llm_circuit_rejections = Counter(
+    "llm_circuit_rejections_total", "LLM calls failed fast by an open circuit", ["breaker"]
+)
+llm_hedged_calls = Counter(
+    "llm_hedged_calls_total", "Hedged LLM calls by outcome", ["stage", "outcome"]
+)
+llm_call_latency = Histogram(
+    "llm_call_latency_seconds", "Upstream LLM call latency", ["model", "stage"]
+)
+llm_tier_latency = Histogram(
+    "llm_tier_latency_seconds", "LLM latency per routed stage and model tier", ["stage", "model"]
+)
+llm_tier_tokens = Counter(
+    "llm_tier_tokens_total",
+    "LLM tokens per routed stage and model tier",
+    ["stage", "model", "kind"],
+)
+llm_escalations = Counter(
+    "llm_escalations_total", "Requests re-run on the escalation model", ["stage", "reason"]
+)
+llm_key_calls = Counter("llm_key_calls_total", "LLM calls per pooled API key", ["key"])
+llm_key_throttles = Counter(
+    "llm_key_throttles_total", "Throttled (429) LLM calls per pooled API key", ["key"]
+)
+llm_key_inflight = Gauge(
+    "llm_key_inflight_calls", "In-flight LLM calls per pooled API key", ["key"]
+)
+llm_key_quarantined = Gauge(
+    "llm_key_quarantined", "Whether a pooled API key is quarantined (1) or not (0)", ["key"]
+)
+llm_chat_sessions = Gauge("llm_chat_sessions", "Live pooled chat sessions", ["client"])
+llm_chat_session_requests = Counter(
+    "llm_chat_session_requests_total",
+    "Chat turns by session outcome (reused or created)",
+    ["client", "result"],
+)
+llm_prompt_tokens = Histogram(
+    "llm_prompt_tokens",
+    "Estimated prompt tokens per call after budgeting",
+    ["stage"],
+    buckets=(64, 128, 256, 512, 1024, 2048, 4096, 8192, 16384, 32768),
+)
+llm_prompt_sections_trimmed = Counter(
+    "llm_prompt_sections_trimmed_total",
+    "Prompt sections cut to fit a stage token budget",
+    ["stage", "section"],
+)
+llm_completion_tokens = Histogram(
+    "llm_completion_tokens",
+    "Completion length per agent stage",
+    ["stage"],
+    buckets=(32, 64, 128, 256, 512, 1024, 2048, 4096, 8192),
+)
+llm_completions = Counter(
+    "llm_completions_total",
+    "Completions per stage, split by whether they hit max_tokens",
+    ["stage", "hit_cap"],
+)
+llm_limit_decreases = Counter(
+    "llm_concurrency_limit_decreases_total",
+    "Adaptive LLM concurrency limit cuts",
+    ["pool", "reason"],
+)
+
 
 def record_request(method: str, path: str, status_code: int, latency_seconds: float) -> None:
     request_counter.labels(method=method, path=path, status_code=str(status_code)).inc()